@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from applications.caching import get_or_set
+
+
+@dataclass(frozen=True)
+class AccessScope:
+    """Phạm vi dữ liệu của người dùng: vai trò, học sinh/lớp của mình, các lớp chủ nhiệm"""
+    user_id: object = None
+    role: str = None
+    student_id: object = None
+    classroom_id: object = None
+    homeroom_classroom_ids: tuple = ()
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def classroom_ids(self):
+        """Các lớp được xem: None = tất cả (admin), () = không lớp nào"""
+        if self.is_admin:
+            return None
+        if self.role == 'student':
+            return (self.classroom_id,) if self.classroom_id else ()
+        if self.role == 'teacher':
+            return self.homeroom_classroom_ids
+        return ()
+
+    def can_access_classroom(self, classroom_id):
+        ids = self.classroom_ids
+        return ids is None or str(classroom_id) in {str(value) for value in ids}
+
+    def filter(self, queryset, field='classroom_id'):
+        """Lọc queryset theo `field IN (các lớp được xem)`, không join sang bảng lớp/học sinh"""
+        ids = self.classroom_ids
+        if ids is None:
+            return queryset
+        if not ids:
+            return queryset.none()
+        return queryset.filter(**{f'{field}__in': ids})
+
+
+ANONYMOUS_SCOPE = AccessScope()
+
+
+def _compute_scope(user):
+    from applications.classroom.models import Classroom
+    from applications.student.models import Student
+
+    student_id = classroom_id = None
+    homeroom_classroom_ids = ()
+    if user.role == 'student':
+        row = Student.objects.filter(user_id=user.pk).values_list('id', 'classroom_id').first()
+        if row:
+            student_id, classroom_id = row
+    elif user.role == 'teacher':
+        homeroom_classroom_ids = tuple(
+            Classroom.objects.filter(homeroom_teacher_id=user.pk).order_by('id').values_list('id', flat=True)
+        )
+    return AccessScope(
+        user_id=user.pk,
+        role=user.role,
+        student_id=student_id,
+        classroom_id=classroom_id,
+        homeroom_classroom_ids=homeroom_classroom_ids,
+    )
+
+
+def resolve_scope(user):
+    """Phạm vi của user, cache ngắn hạn theo user và phiên bản 'roster' (đổi lớp/học sinh -> tính lại)"""
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_SCOPE
+    # Phạm vi lấy từ claim của JWT (ClaimsJWTAuthentication) khi còn hợp lệ: không truy vấn
+    token_scope = getattr(user, 'token_scope', None)
+    if token_scope is not None:
+        return token_scope
+    return get_or_set(
+        f'access_scope:{user.pk}',
+        ('roster',),
+        lambda: _compute_scope(user),
+        timeout=getattr(settings, 'ACCESS_SCOPE_TTL', 60),
+    )
+
+
+def get_scope(request):
+    """Phạm vi của request hiện tại (dùng kết quả của middleware nếu có)"""
+    scope = getattr(request, 'access_scope', None)
+    if scope is None:
+        return resolve_scope(getattr(request, 'user', None))
+    return scope
+
+
+class AccessScopeMiddleware:
+    """Gắn request.access_scope, chỉ tính khi view dùng đến.
+
+    Xác thực JWT của DRF chạy trong view (sau middleware) và gán lại
+    request.user trên HttpRequest, nên scope được tính lười để dùng đúng user
+    đã xác thực. Mỗi request tính tối đa một lần.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.access_scope = SimpleLazyObject(lambda: resolve_scope(getattr(request, 'user', None)))
+        return self.get_response(request)
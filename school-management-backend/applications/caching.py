@@ -0,0 +1,51 @@
+import time
+
+from django.core.cache import cache
+
+from applications.metrics import record_cache
+
+
+# Thời gian sống mặc định của dữ liệu thống kê trong cache (giây)
+DEFAULT_TIMEOUT = 300
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_version(namespace):
+    """Lấy phiên bản hiện tại của một nhóm dữ liệu (VD: 'roster')"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Khởi tạo bằng timestamp để không trùng với các key cũ nếu version bị evict
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*namespaces):
+    """Tăng phiên bản để vô hiệu hóa toàn bộ cache phụ thuộc vào nhóm dữ liệu"""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def versioned_key(name, namespaces):
+    """Tạo cache key gắn với phiên bản của các nhóm dữ liệu phụ thuộc"""
+    versions = ':'.join(f'{ns}@{get_version(ns)}' for ns in namespaces)
+    return f'{name}:{versions}'
+
+
+def get_or_set(name, namespaces, compute, timeout=DEFAULT_TIMEOUT):
+    """Trả về giá trị trong cache hoặc tính lại khi phiên bản dữ liệu thay đổi"""
+    key = versioned_key(name, namespaces)
+    value = cache.get(key)
+    record_cache(name, value is not None)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 09:46
+
+import applications.search.fields
+from django.db import migrations
+
+from applications.search.fields import fulltext_index_operation
+from applications.search.utils import build_search_text
+
+
+def backfill_search_text(apps, schema_editor):
+    Classroom = apps.get_model('classroom', 'Classroom')
+    classrooms = list(Classroom.objects.select_related('grade'))
+    for classroom in classrooms:
+        classroom.search_text = build_search_text(f"{classroom.grade.name}{classroom.name}", classroom.name)
+    Classroom.objects.bulk_update(classrooms, ['search_text'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0002_restore_student_event_permission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroom',
+            name='search_text',
+            field=applications.search.fields.SearchTextField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        fulltext_index_operation('classrooms', 'classrooms_search_text_ft'),
+    ]
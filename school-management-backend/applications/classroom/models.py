@@ -1,6 +1,9 @@
 from django.db import models
 import uuid
 
+from applications.search.fields import SearchTextField
+from applications.search.utils import build_search_text
+
 
 class Classroom(models.Model):
     """Lớp học"""
@@ -16,6 +19,7 @@ class Classroom(models.Model):
         limit_choices_to={'role': 'teacher'}
     )
     # Removed is_special field - no longer needed
+    search_text = SearchTextField(db_index=True)  # Tên lớp đầy đủ (12A1) và tên lớp (A1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -30,4 +34,13 @@ class Classroom(models.Model):
 
     @property
     def full_name(self):
-        return f"{self.grade.name}{self.name}" 
\ No newline at end of file
+        return f"{self.grade.name}{self.name}"
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'search_text'}
+        super().save(*args, **kwargs)
+
+    def build_search_text(self):
+        return build_search_text(self.full_name, self.name)
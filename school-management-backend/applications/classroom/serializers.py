@@ -91,9 +91,35 @@ class ClassroomListSerializer(serializers.ModelSerializer):
         ]
 
     def get_student_count(self, obj):
-        """Đếm số học sinh trong lớp"""
-        # Tạm thời trả về 0 vì chưa có model Student
-        return 0
+        """Đếm số học sinh trong lớp (dùng giá trị annotate sẵn trong classroom_list nếu có)"""
+        if hasattr(obj, 'student_count'):
+            return obj.student_count
+        return obj.students.count()
+
+
+class ClassroomListStatsSerializer(ClassroomListSerializer):
+    """Danh sách Classroom kèm số liệu trực tiếp (classroom_list?with=stats)"""
+    male_count = serializers.IntegerField(read_only=True)
+    female_count = serializers.IntegerField(read_only=True)
+    week_points = serializers.IntegerField(read_only=True)
+    pending_behavior_count = serializers.IntegerField(read_only=True)
+
+    class Meta(ClassroomListSerializer.Meta):
+        fields = ClassroomListSerializer.Meta.fields + [
+            'male_count', 'female_count', 'week_points', 'pending_behavior_count'
+        ]
+
+
+class ClassroomCompactSerializer(serializers.ModelSerializer):
+    """Serializer Classroom rút gọn (không lồng grade/homeroom_teacher)"""
+    full_name = serializers.CharField(read_only=True)
+    grade_id = serializers.UUIDField(read_only=True)
+    grade_name = serializers.CharField(source='grade.name', read_only=True)
+    homeroom_teacher_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = Classroom
+        fields = ['id', 'name', 'full_name', 'grade_id', 'grade_name', 'homeroom_teacher_id']
 
 
 class ClassroomCreateRequestSerializer(serializers.ModelSerializer):
@@ -3,39 +3,63 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import Q, Count, Sum, Subquery, OuterRef, IntegerField
+from django.db.models.functions import Coalesce
 
 from .models import Classroom
 from .serializers import (
     ClassroomSerializer, 
     ClassroomListSerializer,
+    ClassroomListStatsSerializer,
     ClassroomCreateRequestSerializer,
     ClassroomUpdateRequestSerializer
 )
+from applications.access_scope import get_scope
 from applications.grade.models import Grade
 from applications.user_management.models import User
+from applications.search.utils import search_q
+from applications.caching import get_or_set
+from applications.event.models import Event
+from applications.student.models import Student, BehaviorRecord
+from applications.event.school_year import period_range
+
+
+def _rollup(queryset, group_field, aggregate):
+    """Subquery tính một giá trị gộp theo lớp (OuterRef('pk')), không có dòng -> 0"""
+    subquery = queryset.filter(**{group_field: OuterRef('pk')}).order_by().values(group_field).annotate(
+        value=aggregate
+    ).values('value')
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), 0)
+
+
+def annotate_classroom_stats(queryset):
+    """Sĩ số, số nam/nữ, điểm thi đua tuần này và số vi phạm chờ duyệt của mỗi lớp (một truy vấn)"""
+    week_start, week_end = period_range('week')
+    return queryset.annotate(
+        male_count=_rollup(Student.objects.filter(gender='male'), 'classroom', Count('id')),
+        female_count=_rollup(Student.objects.filter(gender='female'), 'classroom', Count('id')),
+        week_points=_rollup(Event.objects.filter(date__range=(week_start, week_end)), 'classroom', Sum('points')),
+        pending_behavior_count=_rollup(
+            BehaviorRecord.objects.filter(status='pending'), 'student__classroom', Count('id')
+        ),
+    )
+
+
+def _visible_classrooms(request, queryset):
+    """Lọc lớp theo phạm vi (get_scope): học sinh - lớp mình, giáo viên - lớp chủ nhiệm và lớp chưa có chủ nhiệm"""
+    scope = get_scope(request)
+    if scope.role == 'student':
+        return queryset.filter(id=scope.classroom_id) if scope.classroom_id else queryset.none()
+    if scope.role == 'teacher':
+        return queryset.filter(Q(id__in=scope.homeroom_classroom_ids) | Q(homeroom_teacher__isnull=True))
+    return queryset
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def classroom_list(request):
     """API lấy danh sách lớp học"""
-    # Filter theo role của user
-    user = request.user
-    queryset = Classroom.objects.select_related('grade', 'homeroom_teacher')
-    
-    if user.role == 'student':
-        # Học sinh chỉ thấy lớp của mình
-        if hasattr(user, 'student'):
-            queryset = queryset.filter(id=user.student.classroom.id)
-        else:
-            queryset = queryset.none()
-    elif user.role == 'teacher':
-        # Giáo viên thấy lớp mình chủ nhiệm và tất cả lớp khác
-        queryset = queryset.filter(
-            Q(homeroom_teacher=user) | Q(homeroom_teacher__isnull=True)
-        )
-    # Admin thấy tất cả
+    queryset = _visible_classrooms(request, Classroom.objects.select_related('grade', 'homeroom_teacher'))
     
     # Apply filters
     grade = request.query_params.get('grade')
@@ -53,9 +77,7 @@ def classroom_list(request):
     # Search
     search = request.query_params.get('search')
     if search:
-        queryset = queryset.filter(
-            Q(name__icontains=search) | Q(grade__name__icontains=search)
-        )
+        queryset = queryset.filter(search_q(search))
     
     # Ordering
     ordering = request.query_params.get('ordering', 'grade__name')
@@ -64,6 +86,14 @@ def classroom_list(request):
     else:
         queryset = queryset.order_by('grade__name', 'name')
     
+    # Sĩ số tính bằng subquery trong cùng truy vấn
+    queryset = queryset.annotate(student_count=_rollup(Student.objects.all(), 'classroom', Count('id')))
+    
+    # ?with=stats: thêm số liệu trực tiếp thay cho việc gọi API theo từng lớp
+    if 'stats' in request.query_params.get('with', '').split(','):
+        serializer = ClassroomListStatsSerializer(annotate_classroom_stats(queryset), many=True)
+        return Response(serializer.data)
+    
     serializer = ClassroomListSerializer(queryset, many=True)
     return Response(serializer.data)
 
@@ -72,22 +102,7 @@ def classroom_list(request):
 @permission_classes([IsAuthenticated])
 def classroom_detail(request, id):
     """API lấy chi tiết lớp học"""
-    # Filter theo role của user
-    user = request.user
-    queryset = Classroom.objects.select_related('grade', 'homeroom_teacher')
-    
-    if user.role == 'student':
-        # Học sinh chỉ thấy lớp của mình
-        if hasattr(user, 'student'):
-            queryset = queryset.filter(id=user.student.classroom.id)
-        else:
-            queryset = queryset.none()
-    elif user.role == 'teacher':
-        # Giáo viên thấy lớp mình chủ nhiệm và tất cả lớp khác
-        queryset = queryset.filter(
-            Q(homeroom_teacher=user) | Q(homeroom_teacher__isnull=True)
-        )
-    # Admin thấy tất cả
+    queryset = _visible_classrooms(request, Classroom.objects.select_related('grade', 'homeroom_teacher'))
     
     classroom = get_object_or_404(queryset, id=id)
     serializer = ClassroomSerializer(classroom)
@@ -179,18 +194,41 @@ def get_teachers(request):
 @permission_classes([IsAuthenticated])
 def get_classroom_stats(request):
     """API lấy thống kê lớp học"""
-    total_classrooms = Classroom.objects.count()
-    special_classrooms = Classroom.objects.filter(is_special=True).count()
-    regular_classrooms = total_classrooms - special_classrooms
-    classrooms_with_teacher = Classroom.objects.filter(homeroom_teacher__isnull=False).count()
-    classrooms_without_teacher = total_classrooms - classrooms_with_teacher
+    # Cache theo phiên bản 'roster' (bump khi Classroom/Student thay đổi)
+    return Response(get_or_set('classroom_stats', ('roster',), compute_classroom_stats))
+
+
+def compute_classroom_stats():
+    """Thống kê lớp học từ một truy vấn GROUP BY theo khối"""
+    rows = Classroom.objects.values('grade_id', 'grade__name').annotate(
+        classrooms=Count('id', distinct=True),
+        with_teacher=Count('id', distinct=True, filter=Q(homeroom_teacher__isnull=False)),
+        students=Count('students')
+    ).order_by('grade__name')
+    
+    by_grade = []
+    total_classrooms = classrooms_with_teacher = total_students = 0
+    for row in rows:
+        total_classrooms += row['classrooms']
+        classrooms_with_teacher += row['with_teacher']
+        total_students += row['students']
+        by_grade.append({
+            'grade_id': row['grade_id'],
+            'grade_name': row['grade__name'],
+            'classroom_count': row['classrooms'],
+            'classrooms_with_teacher': row['with_teacher'],
+            'student_count': row['students'],
+            'average_class_size': round(row['students'] / row['classrooms'], 1),
+        })
     
-    stats = {
+    return {
         'total_classrooms': total_classrooms,
-        'special_classrooms': special_classrooms,
-        'regular_classrooms': regular_classrooms,
+        # Trường is_special đã bị bỏ khỏi model: giữ khóa cũ cho client hiện tại
+        'special_classrooms': 0,
+        'regular_classrooms': total_classrooms,
         'classrooms_with_teacher': classrooms_with_teacher,
-        'classrooms_without_teacher': classrooms_without_teacher,
-    }
-    
-    return Response(stats) 
\ No newline at end of file
+        'classrooms_without_teacher': total_classrooms - classrooms_with_teacher,
+        'total_students': total_students,
+        'average_class_size': round(total_students / total_classrooms, 1) if total_classrooms else 0,
+        'by_grade': by_grade,
+    } 
\ No newline at end of file
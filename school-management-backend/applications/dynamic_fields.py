@@ -0,0 +1,44 @@
+from rest_framework import serializers
+
+
+def requested_fields(request):
+    """Đọc ?fields=id,student_code,user.first_name thành danh sách, None nếu không truyền"""
+    value = request.query_params.get('fields')
+    if not value:
+        return None
+    return [field.strip() for field in value.split(',') if field.strip()]
+
+
+def is_compact(request):
+    return request.query_params.get('compact', '').lower() in ('1', 'true')
+
+
+class DynamicFieldsMixin:
+    """Cho phép chọn trường trả về: Serializer(..., fields=['id', 'user.first_name']).
+
+    Trường dạng "a.b" giữ trường b của serializer lồng a. Trường không tồn tại bị bỏ qua.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            return
+
+        selected = {}
+        for field in fields:
+            name, _, child = field.partition('.')
+            selected.setdefault(name, set())
+            if child:
+                selected[name].add(child)
+
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+                continue
+            nested = self.fields[name]
+            nested = getattr(nested, 'child', nested)
+            if selected[name] and isinstance(nested, serializers.Serializer):
+                for child_name in list(nested.fields):
+                    if child_name not in selected[name]:
+                        nested.fields.pop(child_name)
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class EventConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'applications.event' 
\ No newline at end of file
+    name = 'applications.event'
+
+    def ready(self):
+        from . import signals  # noqa: F401
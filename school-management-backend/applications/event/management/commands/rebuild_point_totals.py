@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from applications.event.points import rebuild_point_totals
+
+
+class Command(BaseCommand):
+    help = 'Tính lại bảng tổng điểm học sinh theo năm học từ bảng sự kiện'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school-year', type=int, help='Năm bắt đầu năm học (VD: 2025 = 2025-2026); bỏ trống = tất cả')
+
+    def handle(self, *args, **options):
+        count = rebuild_point_totals(options.get('school_year'))
+        self.stdout.write(self.style.SUCCESS(f'Đã tính lại {count} dòng tổng điểm'))
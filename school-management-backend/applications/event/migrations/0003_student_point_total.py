@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-19 09:56
+
+import django.db.models.deletion
+import uuid
+from collections import defaultdict
+from django.db import migrations, models
+
+from applications.event.school_year import school_year_of
+
+
+def backfill_point_totals(apps, schema_editor):
+    Event = apps.get_model('event', 'Event')
+    StudentPointTotal = apps.get_model('event', 'StudentPointTotal')
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    events = Event.objects.filter(student__isnull=False).values_list('student_id', 'date', 'points')
+    for student_id, day, points in events.iterator():
+        total = totals[(student_id, school_year_of(day))]
+        total[0] += max(points, 0)
+        total[1] += min(points, 0)
+        total[2] += points
+        total[3] += 1
+    StudentPointTotal.objects.bulk_create([
+        StudentPointTotal(
+            student_id=student_id, school_year=year, positive_points=positive,
+            negative_points=negative, net_points=net, event_count=count,
+        )
+        for (student_id, year), (positive, negative, net, count) in totals.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0002_restore_student_event_permission'),
+        ('student', '0005_behaviorrecord_search_text_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentPointTotal',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('school_year', models.PositiveSmallIntegerField()),
+                ('positive_points', models.IntegerField(default=0)),
+                ('negative_points', models.IntegerField(default=0)),
+                ('net_points', models.IntegerField(default=0)),
+                ('event_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='point_totals', to='student.student')),
+            ],
+            options={
+                'verbose_name': 'Tổng điểm học sinh',
+                'verbose_name_plural': 'Tổng điểm học sinh',
+                'db_table': 'student_point_totals',
+                'indexes': [models.Index(fields=['school_year', '-net_points'], name='point_total_year_net_idx')],
+                'unique_together': {('student', 'school_year')},
+            },
+        ),
+        migrations.RunPython(backfill_point_totals, migrations.RunPython.noop),
+    ]
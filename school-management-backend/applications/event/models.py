@@ -62,6 +62,42 @@ class Event(models.Model):
         target = self.student.user.get_full_name() if self.student else self.classroom.full_name
         return f"{self.event_type.name} - {target} - {self.date}"
 
+    # Cột cần giữ giá trị gốc để cập nhật bảng tổng điểm và cache xếp hạng khi sửa/xóa sự kiện
+    TRACKED_FIELDS = ('student_id', 'date', 'points', 'classroom_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Chỉ giữ các cột theo dõi, không copy cả dòng cho mọi sự kiện được load (danh sách, export...)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if name in cls.TRACKED_FIELDS
+        }
+        return instance
+
+
+class StudentPointTotal(models.Model):
+    """Tổng điểm thi đua của học sinh theo năm học (cập nhật bằng F() khi sự kiện thay đổi)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    student = models.ForeignKey('student.Student', on_delete=models.CASCADE, related_name='point_totals')
+    school_year = models.PositiveSmallIntegerField()  # Năm bắt đầu năm học (tháng 9), VD: 2025 = 2025-2026
+    positive_points = models.IntegerField(default=0)  # Tổng điểm cộng
+    negative_points = models.IntegerField(default=0)  # Tổng điểm trừ (số âm)
+    net_points = models.IntegerField(default=0)
+    event_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'student_point_totals'
+        verbose_name = 'Tổng điểm học sinh'
+        verbose_name_plural = 'Tổng điểm học sinh'
+        unique_together = ['student', 'school_year']
+        indexes = [
+            models.Index(fields=['school_year', '-net_points'], name='point_total_year_net_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.school_year}: {self.net_points}"
+
 
 class StudentEventPermission(models.Model):
     """Quyền cho phép học sinh được tạo sự kiện trong khoảng thời gian nhất định"""
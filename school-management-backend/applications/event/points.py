@@ -0,0 +1,159 @@
+from django.db import transaction
+from django.db.models import F, Sum, Count, Q, Min, Max, Window, FilteredRelation
+from django.db.models.functions import Coalesce, Rank
+
+from applications.caching import get_or_set, bump_version
+
+from .models import Event, StudentPointTotal
+from .school_year import school_year_of, school_year_range, period_range
+
+
+def points_namespace(classroom_id):
+    """Nhóm cache điểm thi đua của một lớp (bump khi sự kiện của lớp thay đổi)"""
+    return f'points:{classroom_id}'
+
+
+def _to_date(value):
+    return Event._meta.get_field('date').to_python(value)
+
+
+def event_contribution(student_id, date, points):
+    """(khóa (student_id, năm học), phần đóng góp) của một sự kiện; None nếu là sự kiện của cả lớp"""
+    if not student_id or date is None or points is None:
+        return None
+    points = int(points)
+    return (student_id, school_year_of(_to_date(date))), {
+        'positive_points': max(points, 0),
+        'negative_points': min(points, 0),
+        'net_points': points,
+        'event_count': 1,
+    }
+
+
+def apply_delta(key, delta, sign=1):
+    """Cộng (sign=1) hoặc trừ (sign=-1) phần đóng góp vào dòng tổng bằng F()"""
+    if not delta:
+        return
+    student_id, school_year = key
+    changes = {field: F(field) + sign * value for field, value in delta.items() if value}
+    if not changes:
+        return
+    totals = StudentPointTotal.objects.filter(student_id=student_id, school_year=school_year)
+    if sign < 0:
+        # Chỉ trừ khi đã có dòng tổng (không tạo dòng mới, VD: khi đang xóa cả học sinh)
+        totals.update(**changes)
+        return
+    with transaction.atomic():
+        StudentPointTotal.objects.get_or_create(student_id=student_id, school_year=school_year)
+        totals.update(**changes)
+
+
+def apply_change(old, new):
+    """Cập nhật tổng khi sự kiện đổi từ old sang new (mỗi bên là kết quả event_contribution hoặc None)"""
+    if old and new and old[0] == new[0]:
+        # Cùng học sinh và năm học: chỉ cộng phần chênh lệch
+        delta = {field: new[1][field] - old[1][field] for field in new[1]}
+        apply_delta(new[0], {field: value for field, value in delta.items() if value})
+        return
+    if old:
+        apply_delta(old[0], old[1], sign=-1)
+    if new:
+        apply_delta(new[0], new[1])
+
+
+def rebuild_point_totals(school_year=None):
+    """Tính lại bảng tổng điểm từ bảng events (một năm học hoặc tất cả). Trả về số dòng đã tạo"""
+    events = Event.objects.filter(student__isnull=False)
+    if school_year is not None:
+        years = [school_year]
+    else:
+        bounds = events.aggregate(first=Min('date'), last=Max('date'))
+        if bounds['first'] is None:
+            years = []
+        else:
+            years = list(range(school_year_of(bounds['first']), school_year_of(bounds['last']) + 1))
+
+    created = 0
+    with transaction.atomic():
+        if school_year is None:
+            StudentPointTotal.objects.all().delete()
+        for year in years:
+            StudentPointTotal.objects.filter(school_year=year).delete()
+            rows = events.filter(date__range=school_year_range(year)).values('student_id').annotate(
+                positive=Coalesce(Sum('points', filter=Q(points__gt=0)), 0),
+                negative=Coalesce(Sum('points', filter=Q(points__lt=0)), 0),
+                net=Sum('points'),
+                count=Count('id'),
+            )
+            totals = [
+                StudentPointTotal(
+                    student_id=row['student_id'],
+                    school_year=year,
+                    positive_points=row['positive'],
+                    negative_points=row['negative'],
+                    net_points=row['net'],
+                    event_count=row['count'],
+                )
+                for row in rows
+            ]
+            StudentPointTotal.objects.bulk_create(totals, batch_size=500)
+            created += len(totals)
+
+    from applications.classroom.models import Classroom
+    bump_version(*(points_namespace(classroom_id) for classroom_id in Classroom.objects.values_list('id', flat=True)))
+    return created
+
+
+def _leaderboard_rows(classroom_id, period, start_date, end_date):
+    from applications.student.models import Student
+
+    students = Student.objects.filter(classroom_id=classroom_id)
+    if period == 'year':
+        # Cả năm học: đọc bảng tổng điểm, không cần cộng lại sự kiện
+        students = students.annotate(
+            year_total=FilteredRelation('point_totals', condition=Q(point_totals__school_year=school_year_of(start_date)))
+        ).annotate(
+            total=Coalesce('year_total__net_points', 0),
+            positive=Coalesce('year_total__positive_points', 0),
+            negative=Coalesce('year_total__negative_points', 0),
+            count=Coalesce('year_total__event_count', 0),
+        )
+    else:
+        # Tuần/tháng: một GROUP BY theo học sinh (học sinh chưa có sự kiện = 0 điểm)
+        in_period = Q(events__date__gte=start_date, events__date__lte=end_date)
+        students = students.annotate(
+            total=Coalesce(Sum('events__points', filter=in_period), 0),
+            positive=Coalesce(Sum('events__points', filter=in_period & Q(events__points__gt=0)), 0),
+            negative=Coalesce(Sum('events__points', filter=in_period & Q(events__points__lt=0)), 0),
+            count=Count('events', filter=in_period),
+        )
+    rows = students.annotate(
+        rank=Window(Rank(), order_by=F('total').desc()),
+    ).values(
+        'id', 'student_code', 'user__first_name', 'user__last_name',
+        'rank', 'total', 'positive', 'negative', 'count',
+    ).order_by('rank', 'student_code')
+    return [
+        {
+            'rank': row['rank'],
+            'student_id': row['id'],
+            'student_code': row['student_code'],
+            'full_name': f"{row['user__first_name']} {row['user__last_name']}".strip(),
+            'total_points': row['total'],
+            'positive_points': row['positive'],
+            'negative_points': row['negative'],
+            'event_count': row['count'],
+        }
+        for row in rows
+    ]
+
+
+def classroom_leaderboard(classroom_id, period, day=None):
+    """Xếp hạng học sinh trong lớp theo điểm của tuần/tháng/năm học chứa ngày day (có cache)"""
+    start_date, end_date = period_range(period, day)
+    rows = get_or_set(
+        f'leaderboard:{classroom_id}:{period}:{start_date.isoformat()}',
+        ('roster', points_namespace(classroom_id)),
+        lambda: _leaderboard_rows(classroom_id, period, start_date, end_date),
+    )
+    return start_date, end_date, rows
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+
+# Năm học bắt đầu từ tháng 9
+SCHOOL_YEAR_START_MONTH = 9
+
+
+def school_year_of(day=None):
+    """Năm học chứa ngày day, tính theo năm bắt đầu (VD: 15/03/2026 -> 2025)"""
+    day = day or timezone.localdate()
+    return day.year if day.month >= SCHOOL_YEAR_START_MONTH else day.year - 1
+
+
+def school_year_range(year):
+    """(ngày đầu, ngày cuối) của năm học year"""
+    start = date(year, SCHOOL_YEAR_START_MONTH, 1)
+    end = date(year + 1, SCHOOL_YEAR_START_MONTH, 1) - timedelta(days=1)
+    return start, end
+
+
+PERIODS = ('week', 'month', 'year')
+
+
+def period_range(period, day=None):
+    """(ngày đầu, ngày cuối) của tuần (thứ 2 - CN), tháng hoặc năm học chứa ngày day"""
+    day = day or timezone.localdate()
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if period == 'month':
+        start = day.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    if period == 'year':
+        return school_year_range(school_year_of(day))
+    raise ValueError(f'Kỳ không hợp lệ: {period}')
@@ -0,0 +1,57 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from applications.caching import bump_version
+
+from .models import Event
+from .points import event_contribution, apply_change, points_namespace
+
+
+def _current(instance):
+    return event_contribution(instance.student_id, instance.date, instance.points)
+
+
+def _loaded(instance):
+    """Giá trị đang lưu trong DB của sự kiện (lấy từ lúc load, hoặc truy vấn nếu thiếu)"""
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None or not {'student_id', 'date', 'points'} <= loaded.keys():
+        loaded = Event.objects.filter(pk=instance.pk).values('student_id', 'date', 'points').first()
+        if loaded is None:
+            return None
+    return event_contribution(loaded['student_id'], loaded['date'], loaded['points'])
+
+
+def _bump_classrooms(*classroom_ids):
+    """Vô hiệu hóa cache bảng xếp hạng của các lớp có sự kiện thay đổi"""
+    bump_version(*{points_namespace(classroom_id) for classroom_id in classroom_ids if classroom_id})
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_points(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._previous_contribution = None
+        instance._previous_classroom_id = None
+    else:
+        instance._previous_contribution = _loaded(instance)
+        instance._previous_classroom_id = getattr(instance, '_loaded_values', {}).get('classroom_id')
+
+
+@receiver(post_save, sender=Event)
+def event_points_saved(sender, instance, created, raw=False, **kwargs):
+    """Sự kiện được tạo/sửa -> cập nhật tổng điểm học sinh theo năm học"""
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_previous_contribution', None)
+    apply_change(previous, _current(instance))
+    _bump_classrooms(instance.classroom_id, getattr(instance, '_previous_classroom_id', None))
+    instance._loaded_values = {
+        'student_id': instance.student_id, 'date': instance.date, 'points': instance.points,
+        'classroom_id': instance.classroom_id,
+    }
+
+
+@receiver(post_delete, sender=Event)
+def event_points_deleted(sender, instance, **kwargs):
+    """Sự kiện bị xóa -> trừ phần đóng góp khỏi tổng điểm"""
+    apply_change(_loaded(instance) if hasattr(instance, '_loaded_values') else _current(instance), None)
+    _bump_classrooms(instance.classroom_id)
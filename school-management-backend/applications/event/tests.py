@@ -0,0 +1,170 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from applications.classroom.models import Classroom
+from applications.event.models import Event, EventType, StudentPointTotal
+from applications.event.points import rebuild_point_totals
+from applications.grade.models import Grade
+from applications.student.models import Student
+from applications.user_management.models import User
+
+
+# 31/08/2025 thuộc năm học 2024, 01/09/2025 thuộc năm học 2025
+LAST_DAY_2024 = date(2025, 8, 31)
+FIRST_DAY_2025 = date(2025, 9, 1)
+
+TOTAL_FIELDS = ('positive_points', 'negative_points', 'net_points', 'event_count')
+
+
+def totals_snapshot():
+    """{(student_id, năm học): (cộng, trừ, tổng, số sự kiện)}, bỏ các dòng đã về 0"""
+    return {
+        (row[0], row[1]): row[2:]
+        for row in StudentPointTotal.objects.values_list('student_id', 'school_year', *TOTAL_FIELDS)
+        if any(row[2:])
+    }
+
+
+class EventPointTotalSignalTests(TestCase):
+    """Bảng tổng điểm cập nhật theo từng thay đổi sự kiện và khớp với rebuild_point_totals"""
+
+    @classmethod
+    def setUpTestData(cls):
+        grade = Grade.objects.create(name='10')
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.classroom = Classroom.objects.create(name='A1', grade=grade)
+        cls.other_classroom = Classroom.objects.create(name='A2', grade=grade)
+        cls.event_type = EventType.objects.create(name='Nề nếp')
+        cls.students = []
+        for index in range(2):
+            user = User.objects.create(username=f'hs{index}', role='student', first_name='Nguyễn', last_name=f'An {index}')
+            cls.students.append(Student.objects.create(
+                user=user, student_code=f'HS{index:02d}', classroom=cls.classroom,
+                date_of_birth=date(2009, 1, 1), gender='male'
+            ))
+
+    def setUp(self):
+        cache.clear()
+
+    def create_event(self, points, day=FIRST_DAY_2025, student=None, classroom=None, period=None):
+        return Event.objects.create(
+            event_type=self.event_type, classroom=classroom or self.classroom,
+            student=self.students[0] if student is None else student,
+            date=day, period=period, points=points, recorded_by=self.admin
+        )
+
+    def assertTotal(self, student, school_year, expected):
+        row = StudentPointTotal.objects.filter(student=student, school_year=school_year).values_list(*TOTAL_FIELDS).first()
+        self.assertEqual(row or (0, 0, 0, 0), expected)
+
+    def assertMatchesRebuild(self):
+        incremental = totals_snapshot()
+        rebuild_point_totals()
+        self.assertEqual(totals_snapshot(), incremental)
+
+    def test_create_adds_contribution(self):
+        self.create_event(5)
+        self.create_event(-2)
+        self.assertTotal(self.students[0], 2025, (5, -2, 3, 2))
+
+    def test_class_event_has_no_student_total(self):
+        Event.objects.create(
+            event_type=self.event_type, classroom=self.classroom, date=FIRST_DAY_2025, points=4, recorded_by=self.admin
+        )
+        self.assertFalse(StudentPointTotal.objects.exists())
+
+    def test_update_points_applies_difference(self):
+        event = self.create_event(5)
+        event = Event.objects.get(pk=event.pk)
+        event.points = -3
+        event.save()
+        self.assertTotal(self.students[0], 2025, (0, -3, -3, 1))
+        self.assertMatchesRebuild()
+
+    def test_move_date_across_school_year(self):
+        event = self.create_event(4, day=LAST_DAY_2024)
+        event = Event.objects.get(pk=event.pk)
+        event.date = FIRST_DAY_2025
+        event.save()
+        self.assertTotal(self.students[0], 2024, (0, 0, 0, 0))
+        self.assertTotal(self.students[0], 2025, (4, 0, 4, 1))
+        self.assertMatchesRebuild()
+
+    def test_change_student(self):
+        event = self.create_event(-1)
+        event = Event.objects.get(pk=event.pk)
+        event.student = self.students[1]
+        event.save()
+        self.assertTotal(self.students[0], 2025, (0, 0, 0, 0))
+        self.assertTotal(self.students[1], 2025, (0, -1, -1, 1))
+        self.assertMatchesRebuild()
+
+    def test_repeated_saves_of_same_instance(self):
+        event = self.create_event(2)
+        event.points = 6
+        event.save()
+        event.points = 1
+        event.save()
+        self.assertTotal(self.students[0], 2025, (1, 0, 1, 1))
+
+    def test_delete_subtracts_contribution(self):
+        kept = self.create_event(3)
+        removed = self.create_event(-4)
+        Event.objects.get(pk=removed.pk).delete()
+        self.assertTotal(self.students[0], 2025, (3, 0, 3, 1))
+        kept.delete()
+        self.assertTotal(self.students[0], 2025, (0, 0, 0, 0))
+        self.assertMatchesRebuild()
+
+    def test_queryset_delete_subtracts_contribution(self):
+        self.create_event(3)
+        self.create_event(-4)
+        Event.objects.filter(student=self.students[0]).delete()
+        self.assertTotal(self.students[0], 2025, (0, 0, 0, 0))
+
+    def test_sync_updates_and_deletes(self):
+        """Các thao tác của events_bulk_sync: load kèm select_related, save(update_fields) và delete từng sự kiện"""
+        self.create_event(2, period=1)
+        self.create_event(-5, period=1, student=self.students[1])
+        existing = list(
+            Event.objects.select_related('event_type', 'student__user')
+            .filter(classroom_id=str(self.classroom.id), date=FIRST_DAY_2025, period=1).order_by('points')
+        )
+        removed, updated = existing
+        updated.points = 7
+        updated.description = ''
+        updated.save(update_fields=['points', 'description', 'updated_at'])
+        removed.delete()
+        self.assertTotal(self.students[0], 2025, (7, 0, 7, 1))
+        self.assertTotal(self.students[1], 2025, (0, 0, 0, 0))
+        self.assertMatchesRebuild()
+
+    def test_mixed_changes_match_rebuild(self):
+        events = [
+            self.create_event(points, day=day, student=self.students[index % 2])
+            for index, (points, day) in enumerate([
+                (5, LAST_DAY_2024), (-2, FIRST_DAY_2025), (3, FIRST_DAY_2025), (-1, LAST_DAY_2024), (4, FIRST_DAY_2025),
+            ])
+        ]
+        events[0].date = FIRST_DAY_2025
+        events[0].save()
+        events[1].student = self.students[0]
+        events[1].points = 6
+        events[1].save()
+        events[2].classroom = self.other_classroom
+        events[2].save()
+        events[3].delete()
+        self.assertMatchesRebuild()
+
+    def test_loaded_values_keep_only_tracked_fields(self):
+        self.create_event(1)
+        event = Event.objects.get()
+        self.assertEqual(set(event._loaded_values), set(Event.TRACKED_FIELDS))
+        deferred = Event.objects.only('id', 'points').get()
+        self.assertEqual(set(deferred._loaded_values), {'points'})
+        # Thiếu cột khi load (only): signal đọc lại giá trị gốc từ database
+        deferred.points = 9
+        deferred.save()
+        self.assertTotal(self.students[0], 2025, (9, 0, 9, 1))
@@ -30,5 +30,6 @@ urlpatterns = [
     
     # Event Statistics and Reports (for school management)
     path('/statistics', views.event_statistics, name='event_statistics'),
+    path('/leaderboard/<uuid:classroom_id>', views.classroom_leaderboard, name='classroom_leaderboard'),
     path('/export', views.event_export, name='event_export'),
 ] 
\ No newline at end of file
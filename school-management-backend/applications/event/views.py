@@ -7,6 +7,8 @@ from django.db import transaction
 from datetime import datetime, timedelta
 
 from .models import Event, EventType, StudentEventPermission
+from .points import classroom_leaderboard as get_classroom_leaderboard
+from .school_year import PERIODS
 from .serializers import (
     EventCreateRequestSerializer, EventUpdateRequestSerializer, EventResponseSerializer,
     EventTypeResponseSerializer, EventBulkCreateRequestSerializer, EventBulkCreateResponseSerializer,
@@ -15,6 +17,7 @@ from .serializers import (
     StudentEventPermissionResponseSerializer
 )
 from applications.permissions import IsAdminOrTeacher
+from applications.access_scope import get_scope
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAdminOrTeacher])
 def events_bulk_approve(request):
@@ -43,7 +46,7 @@ def events_bulk_approve(request):
 
     # Only homeroom teacher of the classroom(s) or admin can approve
     if getattr(user, 'role', None) == 'teacher':
-        qs = qs.filter(classroom__homeroom_teacher=user)
+        qs = get_scope(request).filter(qs)
 
     approve = rejection_notes is None or rejection_notes == ''
     updated = 0
@@ -72,7 +75,7 @@ def events_pending(request):
     user = request.user
     qs = Event.objects.select_related('event_type', 'classroom', 'student__user', 'recorded_by').filter(status='pending')
     if getattr(user, 'role', None) == 'teacher':
-        qs = qs.filter(classroom__homeroom_teacher=user)
+        qs = get_scope(request).filter(qs)
     classroom_id = request.query_params.get('classroom_id')
     date = request.query_params.get('date')
     period = request.query_params.get('period')
@@ -172,10 +175,10 @@ def event_list(request):
         'event_type', 'classroom', 'student__user', 'recorded_by'
     ).all()
 
-    # Scope by role: teacher sees only their homeroom classes
+    # Scope by role: teacher sees only their homeroom classes (classroom_id IN, no join)
     user = request.user
     if getattr(user, 'role', None) == 'teacher':
-        events = events.filter(classroom__homeroom_teacher=user)
+        events = get_scope(request).filter(events)
     
     # Filter theo các tham số
     classroom_id = request.query_params.get('classroom_id', None)
@@ -240,33 +243,31 @@ def event_create(request):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Kiểm tra xem học sinh có quyền tạo sự kiện không
-            try:
-                from applications.student.models import Student
-                student = Student.objects.get(user=user)
-                if student.id != student_id.id:
-                    return Response(
-                        {'error': 'Bạn chỉ có thể tạo sự kiện cho chính mình'},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-                
-                # Kiểm tra quyền tạo sự kiện
-                permission = StudentEventPermission.objects.filter(
-                    student=student,
-                    classroom=serializer.validated_data['classroom'],
-                    is_active=True
-                ).first()
-                
-                if not permission or not permission.is_valid:
-                    return Response(
-                        {'error': 'Bạn không có quyền tạo sự kiện trong lớp này'},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except Student.DoesNotExist:
+            # Kiểm tra xem học sinh có quyền tạo sự kiện không (học sinh của user lấy từ phạm vi truy cập)
+            own_student_id = get_scope(request).student_id
+            if own_student_id is None:
                 return Response(
                     {'error': 'Không tìm thấy thông tin học sinh'},
                     status=status.HTTP_404_NOT_FOUND
                 )
+            if own_student_id != student_id.id:
+                return Response(
+                    {'error': 'Bạn chỉ có thể tạo sự kiện cho chính mình'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            
+            # Kiểm tra quyền tạo sự kiện
+            permission = StudentEventPermission.objects.filter(
+                student_id=own_student_id,
+                classroom=serializer.validated_data['classroom'],
+                is_active=True
+            ).first()
+            
+            if not permission or not permission.is_valid:
+                return Response(
+                    {'error': 'Bạn không có quyền tạo sự kiện trong lớp này'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
         
         # Students create as pending; teachers/admins approved
         status_value = 'pending' if user.role == 'student' else 'approved'
@@ -546,42 +547,39 @@ def event_bulk_create_student(request):
         
         # Kiểm tra quyền tạo sự kiện cho học sinh
         if user.role == 'student':
-            try:
-                from applications.student.models import Student
-                student = Student.objects.get(user=user)
-                
-                for event_data in events_data:
-                    # Kiểm tra quyền cho mỗi event
-                    classroom = event_data.get('classroom')
-                    if not classroom:
-                        return Response(
-                            {'error': 'Classroom là bắt buộc'},
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-                    
-                    # Kiểm tra quyền tạo sự kiện
-                    permission = StudentEventPermission.objects.filter(
-                        student=student,
-                        classroom=classroom,
-                        is_active=True
-                    ).first()
-                    
-                    if not permission or not permission.is_valid:
-                        return Response(
-                            {'error': 'Bạn không có quyền tạo sự kiện trong lớp này'},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
-                    
-                    # Tạo event
-                    event_data['recorded_by'] = user
-                    event = Event.objects.create(**event_data)
-                    created_events.append(event)
-                    
-            except Student.DoesNotExist:
+            student_id = get_scope(request).student_id
+            if student_id is None:
                 return Response(
                     {'error': 'Không tìm thấy thông tin học sinh'},
                     status=status.HTTP_404_NOT_FOUND
                 )
+            
+            for event_data in events_data:
+                # Kiểm tra quyền cho mỗi event
+                classroom = event_data.get('classroom')
+                if not classroom:
+                    return Response(
+                        {'error': 'Classroom là bắt buộc'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                
+                # Kiểm tra quyền tạo sự kiện
+                permission = StudentEventPermission.objects.filter(
+                    student_id=student_id,
+                    classroom=classroom,
+                    is_active=True
+                ).first()
+                
+                if not permission or not permission.is_valid:
+                    return Response(
+                        {'error': 'Bạn không có quyền tạo sự kiện trong lớp này'},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+                
+                # Tạo event
+                event_data['recorded_by'] = user
+                event = Event.objects.create(**event_data)
+                created_events.append(event)
         else:
             # Admin/Teacher có thể tạo bất kỳ event nào
             for event_data in events_data:
@@ -614,9 +612,7 @@ def student_event_permissions_list(request):
         permissions = StudentEventPermission.objects.all()
     elif user.role == 'teacher':
         # Giáo viên chỉ xem quyền của học sinh trong lớp họ chủ nhiệm
-        permissions = StudentEventPermission.objects.filter(
-            classroom__homeroom_teacher=user
-        )
+        permissions = get_scope(request).filter(StudentEventPermission.objects.all())
     else:
         return Response(
             {'error': 'Không có quyền truy cập'},
@@ -743,23 +739,20 @@ def student_event_permission_delete(request, pk):
 @permission_classes([IsAuthenticated])
 def check_student_event_permission(request, student_id):
     """Kiểm tra quyền tạo sự kiện của học sinh"""
-    user = request.user
+    scope = get_scope(request)
     
     # Học sinh chỉ có thể kiểm tra quyền của chính mình
-    if user.role == 'student':
-        try:
-            from applications.student.models import Student
-            student = Student.objects.get(user=user)
-            if student.id != student_id:
-                return Response(
-                    {'error': 'Không có quyền kiểm tra quyền của học sinh khác'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        except Student.DoesNotExist:
+    if scope.role == 'student':
+        if scope.student_id is None:
             return Response(
                 {'error': 'Không tìm thấy thông tin học sinh'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        if scope.student_id != student_id:
+            return Response(
+                {'error': 'Không có quyền kiểm tra quyền của học sinh khác'},
+                status=status.HTTP_403_FORBIDDEN
+            )
     
     # Kiểm tra quyền
     try:
@@ -846,6 +839,62 @@ def event_statistics(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def classroom_leaderboard(request, classroom_id):
+    """API xếp hạng học sinh trong lớp theo điểm thi đua của tuần, tháng hoặc năm học"""
+    from applications.classroom.models import Classroom
+
+    try:
+        classroom = Classroom.objects.select_related('grade').get(id=classroom_id)
+    except Classroom.DoesNotExist:
+        return Response(
+            {'error': 'Lớp học không tồn tại'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    # Kiểm tra quyền truy cập (giống danh sách học sinh theo lớp)
+    user = request.user
+    if user.role == 'student':
+        if not get_scope(request).can_access_classroom(classroom.id):
+            return Response(
+                {'error': 'Không có quyền truy cập lớp này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+    elif user.role == 'teacher':
+        if classroom.homeroom_teacher_id != user.id:
+            return Response(
+                {'error': 'Bạn không phải giáo viên chủ nhiệm của lớp này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+    
+    period = request.query_params.get('period', 'week')
+    if period not in PERIODS:
+        return Response(
+            {'error': f'period phải là một trong: {", ".join(PERIODS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    day = None
+    if request.query_params.get('date'):
+        try:
+            day = datetime.strptime(request.query_params['date'], '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'Ngày không hợp lệ (định dạng YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    start_date, end_date, rows = get_classroom_leaderboard(classroom.id, period, day)
+    return Response({
+        'classroom_id': classroom.id,
+        'classroom_name': classroom.full_name,
+        'period': period,
+        'start_date': start_date,
+        'end_date': end_date,
+        'results': rows,
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminOrTeacher])
 def event_export(request):
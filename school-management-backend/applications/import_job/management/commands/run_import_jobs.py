@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from applications.import_job.runner import fail_stale_jobs, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Xử lý các job import Excel đang chờ và đánh dấu thất bại job bị gián đoạn (dùng khi IMPORT_JOB_RUNNER=command)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Chạy liên tục, kiểm tra job mới định kỳ')
+        parser.add_argument('--interval', type=float, default=5, help='Số giây giữa hai lần kiểm tra (mặc định 5)')
+
+    def handle(self, *args, **options):
+        while True:
+            stale = fail_stale_jobs()
+            if stale:
+                self.stdout.write(self.style.WARNING(f'Đã đánh dấu thất bại {stale} job import bị gián đoạn'))
+            count = run_pending_jobs()
+            if count:
+                self.stdout.write(self.style.SUCCESS(f'Đã xử lý {count} job import'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
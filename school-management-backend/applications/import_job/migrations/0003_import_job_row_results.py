@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_job', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='row_results',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import models
+from django.utils import timezone
+import uuid
+
+from applications.user_management.models import User
+
+
+class ImportJob(models.Model):
+    """Job import Excel chạy nền"""
+    KIND_CHOICES = [
+        ('student', 'Học sinh'),
+        ('teacher', 'Giáo viên'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Đang chờ'),
+        ('running', 'Đang xử lý'),
+        ('completed', 'Hoàn thành'),
+        ('failed', 'Thất bại'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='imports/')
+    original_filename = models.CharField(max_length=255, blank=True)
+    options = models.JSONField(default=dict, blank=True)  # VD: mode, initial_password_hash (mật khẩu tạm đã băm)
+    total_rows = models.IntegerField(null=True, blank=True)  # Null nếu file không ghi kích thước
+    rows_done = models.IntegerField(default=0)  # Số dòng đã xử lý (kể cả lỗi)
+    rows_failed = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # Lỗi theo từng dòng
+    row_results = models.JSONField(default=list, blank=True)  # Upsert: {row, teacher_code, status, changed_fields}
+    message = models.TextField(blank=True)  # Lỗi chung khi job thất bại
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Lần ghi tiến độ gần nhất, dùng phát hiện job bị treo
+
+    class Meta:
+        db_table = 'import_jobs'
+        verbose_name = 'Import Job'
+        verbose_name_plural = 'Import Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.get_status_display()}"
+
+    @property
+    def rows_succeeded(self):
+        return self.rows_done - self.rows_failed
+
+    @property
+    def eta_seconds(self):
+        """Ước tính số giây còn lại theo tốc độ xử lý hiện tại"""
+        if self.status != 'running' or not self.started_at or not self.total_rows or not self.rows_done:
+            return None
+        elapsed = (timezone.now() - self.started_at).total_seconds()
+        remaining = max(self.total_rows - self.rows_done, 0)
+        return round(elapsed / self.rows_done * remaining, 1)
@@ -0,0 +1,72 @@
+import math
+
+from openpyxl import load_workbook
+
+
+def cell_value(record, column):
+    """Lấy giá trị ô dạng chuỗi, ô trống (None/NaN) trả về ''"""
+    value = record.get(column, '')
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # openpyxl/pandas trả số nguyên dạng float (VD: mã 1001.0)
+        value = int(value)
+    return str(value).strip()
+
+
+class ExcelReader:
+    """Đọc file Excel theo từng dòng, không nạp cả workbook vào bộ nhớ.
+
+    File .xlsx dùng openpyxl read_only + iter_rows; file .xls (openpyxl không hỗ trợ)
+    đọc bằng pandas/xlrd. Mỗi dòng trả về dạng (số dòng Excel, dict theo tiêu đề).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._workbook = None
+        self._frame = None
+        if str(path).endswith('.xls'):
+            import pandas as pd
+            self._frame = pd.read_excel(path, engine='xlrd')
+            self.columns = [str(column).strip() for column in self._frame.columns]
+            self.total_rows = len(self._frame)
+        else:
+            self._workbook = load_workbook(path, read_only=True, data_only=True)
+            self._sheet = self._workbook.active
+            header = next(self._sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            self.columns = [str(value).strip() if value is not None else '' for value in header]
+            # max_row lấy từ thẻ dimension của file, có thể không có
+            max_row = self._sheet.max_row
+            self.total_rows = max_row - 1 if max_row else None
+
+    def __iter__(self):
+        if self._frame is not None:
+            for index, record in enumerate(self._frame.to_dict('records')):
+                yield index + 2, record
+            return
+        for row_number, values in enumerate(self._sheet.iter_rows(min_row=2, values_only=True), start=2):
+            if all(value is None or value == '' for value in values):
+                continue
+            yield row_number, dict(zip(self.columns, values))
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_chunks(rows, size):
+    """Gom các dòng thành từng lô size phần tử"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,172 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from applications.student.importers import import_student_records, REQUIRED_COLUMNS as STUDENT_COLUMNS
+from applications.user_management.passwords import HashedPassword
+from applications.teacher.importers import (
+    import_teacher_records, upsert_teacher_records, new_upsert_state, REQUIRED_COLUMNS as TEACHER_COLUMNS
+)
+from .models import ImportJob
+from .readers import ExcelReader, iter_chunks
+
+
+logger = logging.getLogger(__name__)
+
+# Số dòng xử lý giữa hai lần ghi tiến độ
+CHUNK_SIZE = 200
+
+IMPORTERS = {
+    'student': (STUDENT_COLUMNS, import_student_records),
+    'teacher': (TEACHER_COLUMNS, import_teacher_records),
+}
+
+# Import theo chế độ upsert (options['mode'] == 'upsert'): password chỉ bắt buộc với bản ghi mới
+UPSERT_IMPORTERS = {
+    'teacher': ([col for col in TEACHER_COLUMNS if col != 'password'], upsert_teacher_records),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ImportJobError(Exception):
+    """Lỗi làm job thất bại toàn bộ (VD: thiếu cột bắt buộc)"""
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMPORT_JOB_WORKERS,
+                thread_name_prefix='import-job'
+            )
+        return _executor
+
+
+def enqueue(job):
+    """Đưa job vào hàng đợi sau khi transaction tạo job đã commit.
+
+    Với IMPORT_JOB_RUNNER='command', job chỉ nằm ở trạng thái queued và được
+    xử lý bởi `python manage.py run_import_jobs`.
+    """
+    if settings.IMPORT_JOB_RUNNER == 'thread':
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.id))
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def claim_job(job_id):
+    """Chuyển job queued -> running, chỉ một worker nhận được"""
+    now = timezone.now()
+    return ImportJob.objects.filter(id=job_id, status='queued').update(
+        status='running', started_at=now, updated_at=now
+    ) == 1
+
+
+def run_job(job_id):
+    """Xử lý một job import: đọc file theo từng dòng, import theo lô và ghi tiến độ"""
+    if not claim_job(job_id):
+        return
+    job = ImportJob.objects.get(id=job_id)
+    if job.options.get('mode') == 'upsert':
+        required_columns, import_records = UPSERT_IMPORTERS[job.kind]
+        # Kiểm tra trùng mã/username/email trên toàn bộ file, không chỉ trong từng lô
+        import_records = partial(import_records, seen=new_upsert_state())
+    else:
+        required_columns, import_records = IMPORTERS[job.kind]
+    initial_password_hash = job.options.get('initial_password_hash')
+    initial_password = HashedPassword(initial_password_hash) if initial_password_hash else None
+
+    try:
+        with ExcelReader(job.file.path) as reader:
+            missing_columns = [
+                col for col in required_columns
+                if col not in reader.columns and not (col == 'password' and initial_password)
+            ]
+            if missing_columns:
+                raise ImportJobError(f'Thiếu các cột bắt buộc: {", ".join(missing_columns)}')
+
+            job.total_rows = reader.total_rows
+            job.save(update_fields=['total_rows', 'updated_at'])
+
+            for chunk in iter_chunks(reader, CHUNK_SIZE):
+                result = import_records(chunk, initial_password)
+                job.rows_done += len(chunk)
+                job.rows_failed += result['error_count']
+                job.errors.extend(result['errors'])
+                # Kết quả từng dòng (created/updated/unchanged/failed) của chế độ upsert
+                job.row_results.extend(result.get('rows', []))
+                job.save(update_fields=['rows_done', 'rows_failed', 'errors', 'row_results', 'updated_at'])
+
+        job.status = 'completed'
+        # Kích thước ghi trong file có thể tính cả dòng trống
+        job.total_rows = job.rows_done
+    except ImportJobError as e:
+        job.status = 'failed'
+        job.message = str(e)
+    except Exception as e:
+        logger.exception('Import job %s failed', job_id)
+        job.status = 'failed'
+        job.message = f'Lỗi xử lý file: {str(e)}'
+    finally:
+        # Không giữ mật khẩu tạm và file upload sau khi job kết thúc
+        job.options.pop('initial_password_hash', None)
+        if job.file:
+            job.file.delete(save=False)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'total_rows', 'message', 'options', 'file', 'finished_at', 'updated_at'])
+    return job
+
+
+def fail_stale_jobs(stale_after=None):
+    """Đánh dấu thất bại các job running không ghi tiến độ quá stale_after giây.
+
+    Process xử lý job bị dừng giữa chừng (restart, OOM...) để lại job ở trạng thái
+    running mãi mãi. Job không được chạy lại vì các lô đã ghi vẫn còn trong database.
+    Trả về số job đã xử lý.
+    """
+    if stale_after is None:
+        stale_after = settings.IMPORT_JOB_STALE_AFTER
+    now = timezone.now()
+    stale_jobs = list(ImportJob.objects.filter(status='running', updated_at__lt=now - timedelta(seconds=stale_after)))
+    count = 0
+    for job in stale_jobs:
+        # Điều kiện updated_at: job vừa ghi tiến độ lại (vẫn đang chạy) thì bỏ qua
+        if not ImportJob.objects.filter(id=job.id, status='running', updated_at=job.updated_at).update(
+            status='failed', finished_at=now, updated_at=now,
+            message=f'Job bị gián đoạn: không có tiến độ trong {stale_after} giây (đã xử lý {job.rows_done} dòng)'
+        ):
+            continue
+        # Không giữ mật khẩu tạm và file upload của job đã dừng
+        job.options.pop('initial_password_hash', None)
+        if job.file:
+            job.file.delete(save=False)
+        ImportJob.objects.filter(id=job.id).update(options=job.options, file=job.file.name or '')
+        logger.warning('Import job %s marked failed: no progress for %s seconds', job.id, stale_after)
+        count += 1
+    return count
+
+
+def run_pending_jobs():
+    """Xử lý lần lượt các job đang chờ, job cũ trước. Trả về số job đã chạy"""
+    count = 0
+    job_ids = list(ImportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True))
+    for job_id in job_ids:
+        if run_job(job_id) is not None:
+            count += 1
+    return count
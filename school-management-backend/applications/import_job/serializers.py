@@ -0,0 +1,41 @@
+from rest_framework import serializers
+from .models import ImportJob
+
+
+class ImportJobCreateSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    initial_password = serializers.CharField(required=False, allow_blank=True, min_length=6)
+    mode = serializers.ChoiceField(choices=['create', 'upsert'], default='create')
+
+    def validate_file(self, value):
+        if not value.name.endswith(('.xlsx', '.xls')):
+            raise serializers.ValidationError('File phải là định dạng Excel (.xlsx hoặc .xls)')
+        return value
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    rows_succeeded = serializers.IntegerField(read_only=True)
+    eta_seconds = serializers.FloatField(read_only=True)
+    progress = serializers.SerializerMethodField()
+    created_by = serializers.CharField(source='created_by.username', read_only=True, default=None)
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'status', 'original_filename', 'total_rows', 'rows_done',
+            'rows_failed', 'rows_succeeded', 'progress', 'eta_seconds', 'message',
+            'created_by', 'created_at', 'started_at', 'finished_at'
+        ]
+
+    def get_progress(self, obj):
+        """Phần trăm hoàn thành (None nếu chưa biết tổng số dòng)"""
+        if obj.status == 'completed':
+            return 100.0
+        if not obj.total_rows:
+            return None
+        return round(min(obj.rows_done / obj.total_rows, 1) * 100, 1)
+
+
+class ImportJobDetailSerializer(ImportJobSerializer):
+    class Meta(ImportJobSerializer.Meta):
+        fields = ImportJobSerializer.Meta.fields + ['errors', 'row_results']
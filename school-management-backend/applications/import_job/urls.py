@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'import_job'
+
+urlpatterns = [
+    path('', views.import_job_list, name='import-job-list'),
+    path('/students', views.import_job_students, name='import-job-students'),
+    path('/teachers', views.import_job_teachers, name='import-job-teachers'),
+    path('/<uuid:id>', views.import_job_detail, name='import-job-detail'),
+]
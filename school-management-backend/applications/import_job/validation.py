@@ -0,0 +1,88 @@
+import pandas as pd
+
+
+# Định dạng email đơn giản để kiểm tra theo cột
+EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
+
+def text_column(df, column):
+    """Cột dạng chuỗi đã strip, ô trống -> ''. Cột số nguyên đọc thành float (1001.0) được trả về '1001'"""
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    series = df[column]
+    if pd.api.types.is_float_dtype(series):
+        non_null = series.dropna()
+        if (non_null == non_null.round()).all():
+            series = series.astype('Int64')
+    return series.astype(object).where(series.notna(), '').astype(str).str.strip()
+
+
+class FrameErrors:
+    """Gom lỗi kiểm tra theo cột (mask boolean) thành báo cáo theo từng dòng Excel"""
+
+    def __init__(self, df):
+        self.index = df.index
+        self._parts = []
+
+    def add(self, mask, field, message):
+        """Ghi lỗi cho các dòng có mask=True. message là chuỗi hoặc Series cùng index"""
+        mask = mask.fillna(False).astype(bool)
+        if not mask.any():
+            return
+        if isinstance(message, str):
+            messages = [message] * int(mask.sum())
+        else:
+            messages = list(message[mask])
+        self._parts.append(pd.DataFrame({
+            'row': self.index[mask.values] + 2,  # Excel row number (1-based + header)
+            'field': field,
+            'error': messages,
+        }))
+
+    def require(self, columns, values):
+        """Báo lỗi ô trống cho các cột bắt buộc"""
+        for column in columns:
+            self.add(values[column] == '', column, 'Không được để trống')
+
+    def max_length(self, column, values, limit):
+        self.add(values.str.len() > limit, column, f'Tối đa {limit} ký tự')
+
+    def email(self, column, values):
+        self.add((values != '') & ~values.str.match(EMAIL_PATTERN), column, 'Email không hợp lệ')
+
+    def duplicates(self, column, values, label):
+        """Giá trị trùng trong file: báo lỗi các dòng sau, kèm dòng xuất hiện đầu tiên"""
+        duplicated = (values != '') & values.duplicated(keep='first')
+        if not duplicated.any():
+            return
+        first_rows = pd.Series(self.index + 2, index=values.values)
+        first_rows = first_rows[~first_rows.index.duplicated(keep='first')]
+        messages = label + ' "' + values + '" bị trùng với dòng ' + values.map(first_rows).astype(str)
+        self.add(duplicated, column, messages)
+
+    def existing(self, column, values, existing_values, label):
+        """Giá trị đã tồn tại trong hệ thống (existing_values lấy bằng một truy vấn IN)"""
+        messages = label + ' "' + values + '" đã tồn tại'
+        self.add((values != '') & values.isin(list(existing_values)), column, messages)
+
+    def report(self):
+        """[{'row': 5, 'errors': {'email': ['...']}}] sắp xếp theo dòng"""
+        if not self._parts:
+            return []
+        frame = pd.concat(self._parts, ignore_index=True).sort_values('row', kind='stable')
+        report = {}
+        for row, field, error in frame.itertuples(index=False):
+            report.setdefault(int(row), {}).setdefault(field, []).append(error)
+        return [{'row': row, 'errors': errors} for row, errors in report.items()]
+
+
+def dry_run_result(df, errors):
+    """Kết quả dry run: không ghi gì vào database"""
+    report = errors.report()
+    return {
+        'dry_run': True,
+        'total_rows': len(df),
+        'valid_count': len(df) - len(report),
+        'error_count': len(report),
+        'errors': report,
+    }
@@ -0,0 +1,81 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.contrib.auth.hashers import make_password
+from django.shortcuts import get_object_or_404
+
+from .models import ImportJob
+from .serializers import ImportJobCreateSerializer, ImportJobSerializer, ImportJobDetailSerializer
+from .runner import enqueue, UPSERT_IMPORTERS
+
+
+def _create_job(request, kind):
+    """Lưu file upload, tạo job ở trạng thái queued và đưa vào hàng đợi"""
+    serializer = ImportJobCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    file = serializer.validated_data['file']
+    options = {}
+    if serializer.validated_data.get('initial_password'):
+        # Chỉ lưu bản băm: job có thể nằm trong hàng đợi lâu (runner 'command')
+        options['initial_password_hash'] = make_password(serializer.validated_data['initial_password'])
+    if serializer.validated_data['mode'] == 'upsert':
+        if kind not in UPSERT_IMPORTERS:
+            return Response(
+                {'error': 'Chế độ upsert chưa hỗ trợ loại import này'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        options['mode'] = 'upsert'
+
+    job = ImportJob.objects.create(
+        kind=kind,
+        file=file,
+        original_filename=file.name,
+        options=options,
+        created_by=request.user
+    )
+    enqueue(job)
+    return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_job_students(request):
+    """API tạo job import học sinh từ file Excel"""
+    return _create_job(request, 'student')
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_job_teachers(request):
+    """API tạo job import giáo viên từ file Excel"""
+    return _create_job(request, 'teacher')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def import_job_list(request):
+    """API lấy danh sách job import (admin xem tất cả, người khác xem job của mình)"""
+    jobs = ImportJob.objects.select_related('created_by')
+    if request.user.role != 'admin':
+        jobs = jobs.filter(created_by=request.user)
+
+    status_filter = request.query_params.get('status')
+    if status_filter:
+        jobs = jobs.filter(status=status_filter)
+
+    serializer = ImportJobSerializer(jobs[:50], many=True)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def import_job_detail(request, id):
+    """API lấy trạng thái job import: số dòng đã xử lý, lỗi, thời gian còn lại"""
+    jobs = ImportJob.objects.select_related('created_by')
+    if request.user.role != 'admin':
+        jobs = jobs.filter(created_by=request.user)
+    job = get_object_or_404(jobs, id=id)
+    return Response(ImportJobDetailSerializer(job).data)
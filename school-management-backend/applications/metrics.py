@@ -0,0 +1,175 @@
+import ipaddress
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.models import Count, Min
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from applications.query_budget import record_queries
+
+
+# Nhãn view của request không khớp URL nào (tránh mỗi đường dẫn lạ thành một series)
+UNMATCHED_VIEW = '<unmatched>'
+
+REQUEST_COUNT = Counter(
+    'school_http_requests_total', 'Số request theo view, method và mã trạng thái',
+    ['view', 'method', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'school_http_request_duration_seconds', 'Thời gian xử lý request (giây)',
+    ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSE_SIZE = Histogram(
+    'school_http_response_size_bytes', 'Kích thước body response (byte)',
+    ['view'],
+    buckets=(200, 1000, 5000, 20000, 100000, 500000, 2000000),
+)
+DB_QUERIES = Histogram(
+    'school_db_queries_per_request', 'Số truy vấn database mỗi request',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+DB_TIME = Histogram(
+    'school_db_time_per_request_seconds', 'Tổng thời gian database mỗi request (giây)',
+    ['view'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CACHE_REQUESTS = Counter(
+    'school_cache_requests_total', 'Số lần đọc cache thống kê (get_or_set) theo kết quả hit/miss',
+    ['name', 'result'],
+)
+
+
+def multiprocess_mode():
+    """Gom số liệu nhiều worker qua thư mục chung (PROMETHEUS_MULTIPROC_DIR)"""
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def record_cache(name, hit):
+    """Đếm hit/miss của cache; name bỏ phần định danh (VD: 'access_scope:<id>' -> 'access_scope')"""
+    CACHE_REQUESTS.labels(name.split(':', 1)[0], 'hit' if hit else 'miss').inc()
+
+
+class MetricsMiddleware:
+    """Ghi latency, mã trạng thái, kích thước response và số/thời gian truy vấn theo view.
+
+    Nhãn view là view name của URL (VD: 'student:student-list'), không dùng đường dẫn
+    để số series không tăng theo id. Tắt bằng METRICS_ENABLED=False.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        # Dùng chung recorder với QueryBudgetMiddleware (nếu bật): mỗi câu SQL chỉ bọc một lần
+        with record_queries(request) as counter:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else UNMATCHED_VIEW
+        REQUEST_COUNT.labels(view, request.method, str(response.status_code)).inc()
+        REQUEST_LATENCY.labels(view, request.method).observe(elapsed)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view).observe(len(response.content))
+        DB_QUERIES.labels(view).observe(counter.count)
+        DB_TIME.labels(view).observe(counter.duration)
+        return response
+
+
+class JobQueueCollector:
+    """Gauge hàng đợi import job, đọc từ database lúc scrape (đúng cho mọi worker)"""
+
+    def describe(self):
+        # Không truy vấn khi đăng ký collector
+        return [
+            GaugeMetricFamily('school_import_jobs', 'Số import job đang chờ/đang chạy', labels=['kind', 'status']),
+            GaugeMetricFamily('school_import_job_oldest_queued_seconds', 'Tuổi của job chờ lâu nhất (giây)'),
+        ]
+
+    def collect(self):
+        from applications.import_job.models import ImportJob
+
+        jobs = GaugeMetricFamily('school_import_jobs', 'Số import job đang chờ/đang chạy', labels=['kind', 'status'])
+        counts = {
+            (row['kind'], row['status']): row['count']
+            for row in ImportJob.objects.filter(status__in=['queued', 'running'])
+            .values('kind', 'status').annotate(count=Count('id'))
+        }
+        for kind, _ in ImportJob.KIND_CHOICES:
+            for status in ('queued', 'running'):
+                jobs.add_metric([kind, status], counts.get((kind, status), 0))
+        yield jobs
+
+        oldest = ImportJob.objects.filter(status='queued').aggregate(oldest=Min('created_at'))['oldest']
+        yield GaugeMetricFamily(
+            'school_import_job_oldest_queued_seconds', 'Tuổi của job chờ lâu nhất (giây)',
+            value=(timezone.now() - oldest).total_seconds() if oldest else 0,
+        )
+
+
+JOB_QUEUE_COLLECTOR = JobQueueCollector()
+if not multiprocess_mode():
+    REGISTRY.register(JOB_QUEUE_COLLECTOR)
+
+
+def mark_process_dead(pid):
+    """Gọi khi worker thoát (VD: hook child_exit của gunicorn) để dọn file số liệu của worker"""
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(pid)
+
+
+def _ip_allowed(address):
+    """REMOTE_ADDR nằm trong METRICS_ALLOWED_IPS (IP hoặc dải CIDR)"""
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    for network in settings.METRICS_ALLOWED_IPS:
+        try:
+            if address in ipaddress.ip_network(network, strict=False):
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def metrics_access_allowed(request):
+    """Đúng METRICS_TOKEN (Authorization: Bearer <token>) hoặc IP trong METRICS_ALLOWED_IPS; không cấu hình gì thì từ chối"""
+    if settings.METRICS_TOKEN and constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        return True
+    return _ip_allowed(request.META.get('REMOTE_ADDR', ''))
+
+
+def metrics_view(request):
+    """GET /metrics: số liệu dạng text của Prometheus.
+
+    Chỉ scraper có METRICS_TOKEN hoặc IP trong METRICS_ALLOWED_IPS được truy cập.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if not metrics_access_allowed(request):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+
+    if multiprocess_mode():
+        # Mỗi lần scrape dựng registry mới, cộng số liệu từ file của mọi worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(JOB_QUEUE_COLLECTOR)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,100 @@
+import base64
+import json
+
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Cursor không giải mã được hoặc không khớp thứ tự sắp xếp"""
+
+
+def page_size_from(request, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        page_size = int(request.query_params.get('page_size', default))
+    except ValueError:
+        page_size = default
+    return max(1, min(maximum, page_size))
+
+
+def resolve_ordering(request, orderings, default):
+    """Chỉ nhận ordering trong whitelist (mỗi ordering đều có index tương ứng)"""
+    ordering = request.query_params.get('ordering') or default
+    return ordering if ordering in orderings else None
+
+
+def _encode_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(row, ordering):
+    """Cursor = giá trị các trường sắp xếp của dòng cuối trang (base64 JSON)"""
+    values = [_encode_value(_lookup(row, field.lstrip('-'))) for field in ordering]
+    payload = json.dumps({'o': list(ordering), 'v': values}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        values = payload['v']
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor('Cursor không hợp lệ')
+    if payload.get('o') != list(ordering) or len(values) != len(ordering):
+        raise InvalidCursor('Cursor không khớp với thứ tự sắp xếp')
+    return values
+
+
+def _lookup(row, field):
+    """Lấy giá trị trường (kể cả dạng a__b) từ model instance hoặc dict của values()"""
+    if isinstance(row, dict):
+        return row[field]
+    value = row
+    for part in field.split('__'):
+        value = getattr(value, part)
+    return getattr(value, 'pk', value)
+
+
+def keyset_filter(ordering, values):
+    """Điều kiện lấy các dòng đứng sau cursor theo ordering (hỗ trợ trộn tăng/giảm).
+
+    VD ordering ('-created_at', 'id'): created_at < v0 OR (created_at = v0 AND id > v1)
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        operator = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{operator}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def paginate_keyset(queryset, request, ordering, default_page_size=DEFAULT_PAGE_SIZE):
+    """Phân trang theo cursor (keyset): chi phí mỗi trang O(page) dù lịch sử lớn đến đâu.
+
+    ordering phải có trường cuối là khóa duy nhất (VD: id). Trả về (items, meta),
+    raise InvalidCursor nếu cursor sai.
+    """
+    page_size = page_size_from(request, default_page_size)
+    queryset = queryset.order_by(*ordering)
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        queryset = queryset.filter(keyset_filter(ordering, decode_cursor(cursor, ordering)))
+
+    items = list(queryset[:page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    return items, {
+        'next_cursor': encode_cursor(items[-1], ordering) if has_more else None,
+        'has_more': has_more,
+        'page_size': page_size,
+    }
@@ -0,0 +1,141 @@
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# Số fingerprint SQL (nhóm câu lặp lại) ghi vào log cho mỗi request vượt ngân sách
+TOP_FINGERPRINTS = 10
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_VALUES_LIST = re.compile(r'(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+', re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Dạng chuẩn của câu SQL để gom các câu chỉ khác tham số.
+
+    VD: "... WHERE id IN (%s, %s, %s)" và "... WHERE id IN (%s)" -> "... WHERE id IN (...)"
+    """
+    sql = _IN_LIST.sub('(...)', sql)
+    sql = _VALUES_LIST.sub(r'\1, ...', sql)
+    sql = _LITERAL.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """execute_wrapper đếm số truy vấn, tổng thời gian database và gom theo fingerprint (nếu bật)"""
+
+    def __init__(self, track_fingerprints=False):
+        self.count = 0
+        self.duration = 0.0
+        self.track_fingerprints = track_fingerprints
+        self.fingerprints = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.track_fingerprints:
+                entry = self.fingerprints[fingerprint(sql)]
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def worst(self, limit=TOP_FINGERPRINTS):
+        """Các fingerprint tốn nhất: lặp nhiều lần nhất, rồi tổng thời gian"""
+        rows = sorted(self.fingerprints.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+        return rows[:limit]
+
+
+@contextmanager
+def record_queries(request, track_fingerprints=False):
+    """Recorder truy vấn dùng chung của request.
+
+    Chỉ middleware ngoài cùng (MetricsMiddleware hoặc QueryBudgetMiddleware) cài
+    execute_wrapper, middleware bên trong đọc cùng recorder qua request.query_recorder
+    để mỗi câu SQL chỉ bị bọc và đo thời gian một lần.
+    """
+    recorder = getattr(request, 'query_recorder', None)
+    if recorder is not None:
+        recorder.track_fingerprints = recorder.track_fingerprints or track_fingerprints
+        yield recorder
+        return
+    recorder = QueryRecorder(track_fingerprints)
+    request.query_recorder = recorder
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else request.path
+
+
+def budget_for(endpoint):
+    """(số truy vấn, thời gian database ms) cho phép của endpoint"""
+    queries, time_ms = settings.QUERY_BUDGET_DEFAULT, settings.QUERY_BUDGET_TIME_MS
+    override = settings.QUERY_BUDGETS.get(endpoint)
+    if isinstance(override, dict):
+        return override.get('queries', queries), override.get('time_ms', time_ms)
+    if override is not None:
+        return override, time_ms
+    return queries, time_ms
+
+
+class QueryBudgetMiddleware:
+    """Đếm truy vấn và thời gian database của mỗi request, ghi log khi vượt ngân sách.
+
+    Chỉ bật khi QUERY_BUDGET_ENABLED. Ngân sách mặc định QUERY_BUDGET_DEFAULT truy vấn
+    / QUERY_BUDGET_TIME_MS ms, ghi đè theo endpoint (view name) trong QUERY_BUDGETS.
+    Request vượt ngân sách được gắn header X-Query-Budget: exceeded và ghi vào
+    QUERY_BUDGET_LOG_FILE (xoay vòng) kèm các câu SQL lặp lại nhiều nhất.
+    Đặt đầu MIDDLEWARE để tính cả truy vấn của các middleware khác.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        directory = os.path.dirname(settings.QUERY_BUDGET_LOG_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries(request, track_fingerprints=True) as recorder:
+            response = self.get_response(request)
+
+        duration_ms = recorder.duration * 1000
+        response['X-DB-Queries'] = str(recorder.count)
+        response['X-DB-Time-Ms'] = f'{duration_ms:.1f}'
+
+        endpoint = endpoint_name(request)
+        max_queries, max_time_ms = budget_for(endpoint)
+        if recorder.count > max_queries or duration_ms > max_time_ms:
+            response['X-Query-Budget'] = 'exceeded'
+            self.report(request, response, endpoint, recorder, max_queries, max_time_ms)
+        return response
+
+    def report(self, request, response, endpoint, recorder, max_queries, max_time_ms):
+        lines = [
+            f'{request.method} {request.get_full_path()} [{endpoint}] -> {response.status_code}: '
+            f'{recorder.count} truy vấn (ngân sách {max_queries}), '
+            f'{recorder.duration * 1000:.1f} ms database (ngân sách {max_time_ms} ms)'
+        ]
+        for sql, (count, duration) in recorder.worst():
+            lines.append(f'  {count:>5}x {duration * 1000:>8.1f} ms  {sql[:500]}')
+        logger.warning('\n'.join(lines))
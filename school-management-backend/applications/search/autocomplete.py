@@ -0,0 +1,116 @@
+import threading
+from bisect import bisect_left
+
+from applications.caching import get_version
+from .utils import normalize_text
+
+
+class PrefixIndex:
+    """Chỉ mục tiền tố trong bộ nhớ: mảng khóa đã sắp xếp + bisect.
+
+    Mỗi mục được đánh chỉ mục theo họ tên đầy đủ, từng hậu tố bắt đầu tại mỗi từ của
+    họ tên (để "an" khớp "Nguyễn Văn An") và mã. Truy vấn top-k là một lần bisect rồi
+    quét tuần tự các khóa cùng tiền tố.
+    """
+
+    def __init__(self, entries):
+        pairs = []
+        self.entries = []
+        for keys, entry in entries:
+            position = len(self.entries)
+            self.entries.append(entry)
+            pairs.extend((key, position) for key in keys if key)
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.positions = [position for _, position in pairs]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, prefix, limit):
+        results = []
+        seen = set()
+        index = bisect_left(self.keys, prefix)
+        while index < len(self.keys) and len(results) < limit:
+            if not self.keys[index].startswith(prefix):
+                break
+            position = self.positions[index]
+            if position not in seen:
+                seen.add(position)
+                results.append(self.entries[position])
+            index += 1
+        return results
+
+
+def index_keys(name, code):
+    """Các khóa của một người: họ tên, các hậu tố theo từ của họ tên, mã"""
+    words = normalize_text(name).split()
+    keys = [' '.join(words[start:]) for start in range(len(words))]
+    keys.append(normalize_text(code))
+    return keys
+
+
+def _build_indexes():
+    from applications.student.models import Student
+    from applications.teacher.models import Teacher
+
+    students = {}
+    everyone = []
+    rows = Student.objects.values(
+        'id', 'student_code', 'classroom_id', 'user__first_name', 'user__last_name'
+    ).order_by('user__first_name', 'user__last_name')
+    for row in rows:
+        name = f"{row['user__first_name']} {row['user__last_name']}".strip()
+        keys = index_keys(name, row['student_code'])
+        entry = {'id': str(row['id']), 'code': row['student_code'], 'name': name}
+        students.setdefault(row['classroom_id'], []).append((keys, entry))
+        everyone.append((keys, dict(entry, classroom_id=str(row['classroom_id']))))
+
+    teachers = []
+    rows = Teacher.objects.values('id', 'teacher_code', 'user__first_name', 'user__last_name')
+    for row in rows:
+        name = f"{row['user__first_name']} {row['user__last_name']}".strip()
+        teachers.append((index_keys(name, row['teacher_code']), {
+            'id': str(row['id']), 'code': row['teacher_code'], 'name': name
+        }))
+
+    return {
+        'classrooms': {classroom_id: PrefixIndex(entries) for classroom_id, entries in students.items()},
+        'students': PrefixIndex(everyone),
+        'teachers': PrefixIndex(teachers),
+    }
+
+
+_state = {'version': None, 'indexes': None}
+_lock = threading.Lock()
+
+
+def get_indexes():
+    """Chỉ mục của process hiện tại, dựng lại khi version roster/teachers thay đổi"""
+    version = (get_version('roster'), get_version('teachers'))
+    if _state['version'] != version:
+        with _lock:
+            if _state['version'] != version:
+                _state['indexes'] = _build_indexes()
+                _state['version'] = version
+    return _state['indexes']
+
+
+def autocomplete(term, kind='student', classroom_ids=None, limit=10):
+    """Gợi ý theo tiền tố; classroom_ids: chỉ tìm học sinh trong các lớp này (None = toàn trường)"""
+    prefix = normalize_text(term)
+    if not prefix:
+        return []
+    indexes = get_indexes()
+    if kind == 'teacher':
+        return indexes['teachers'].search(prefix, limit)
+    if classroom_ids is None:
+        return indexes['students'].search(prefix, limit)
+    results = []
+    for classroom_id in classroom_ids:
+        index = indexes['classrooms'].get(classroom_id)
+        if index is not None:
+            results.extend(index.search(prefix, limit))
+    if len(classroom_ids) > 1:
+        results.sort(key=lambda entry: normalize_text(entry['name']))
+    return results[:limit]
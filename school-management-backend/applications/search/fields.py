@@ -0,0 +1,71 @@
+from django.db import models
+from django.db.models import Lookup
+
+
+class SearchTextField(models.CharField):
+    """Cột tìm kiếm đã chuẩn hóa (không dấu, chữ thường), tự tính khi lưu model"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', 255)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+
+class LongSearchTextField(models.TextField):
+    """Như SearchTextField nhưng không giới hạn độ dài (nội dung dài như mô tả vi phạm).
+
+    Không có chỉ mục B-tree (LIKE '%từ%' cũng không dùng được), tìm trên MySQL qua chỉ mục FULLTEXT.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+
+@SearchTextField.register_lookup
+@LongSearchTextField.register_lookup
+class FullTextMatch(Lookup):
+    """search_text__match='+nguyen* +van*' -> MATCH (...) AGAINST (... IN BOOLEAN MODE) trên MySQL.
+
+    Database khác không có FULLTEXT: mọi từ khóa phải xuất hiện (LIKE '%từ%'),
+    quét toàn bộ cột search_text, không dùng được chỉ mục.
+    """
+    lookup_name = 'match'
+
+    def as_mysql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'MATCH ({lhs}) AGAINST ({rhs} IN BOOLEAN MODE)', lhs_params + rhs_params
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        tokens = [token.strip('+-*"') for token in str(self.rhs).split()]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return '1 = 1', []
+        like = connection.operators['contains']
+        sql = ' AND '.join(f'{lhs} {like}' for _ in tokens)
+        params = []
+        for token in tokens:
+            params.extend(lhs_params)
+            params.append(f'%{connection.ops.prep_for_like_query(token)}%')
+        return f'({sql})', params
+
+
+def fulltext_index_operation(table, index_name, column='search_text'):
+    """Migration tạo chỉ mục FULLTEXT trên MySQL, bỏ qua với database khác"""
+    from django.db import migrations
+
+    def create(apps, schema_editor):
+        if schema_editor.connection.vendor == 'mysql':
+            schema_editor.execute(f'CREATE FULLTEXT INDEX {index_name} ON {table} ({column})')
+
+    def drop(apps, schema_editor):
+        if schema_editor.connection.vendor == 'mysql':
+            schema_editor.execute(f'DROP INDEX {index_name} ON {table}')
+
+    return migrations.RunPython(create, drop)
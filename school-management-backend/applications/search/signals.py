@@ -0,0 +1,83 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from applications.caching import bump_version
+from applications.classroom.models import Classroom
+from applications.grade.models import Grade
+from applications.student.models import Student, BehaviorRecord
+from applications.teacher.models import Teacher
+from applications.user_management.models import User
+
+
+# Các trường của User nằm trong search_text của học sinh/giáo viên
+USER_SEARCH_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=User)
+def user_search_text_changed(sender, instance, created, update_fields=None, **kwargs):
+    """Đổi tên/email -> cập nhật search_text của hồ sơ học sinh/giáo viên"""
+    if created or (update_fields is not None and not USER_SEARCH_FIELDS & set(update_fields)):
+        return
+    if instance.role == 'student':
+        model = Student
+    elif instance.role == 'teacher':
+        model = Teacher
+    else:
+        return
+
+    changed = False
+    for profile in model.objects.filter(user=instance):
+        profile.user = instance
+        search_text = profile.build_search_text()
+        if search_text != profile.search_text:
+            model.objects.filter(pk=profile.pk).update(search_text=search_text)
+            if model is Student:
+                refresh_behavior_search_text(profile)
+            changed = True
+    if changed:
+        bump_version('roster' if model is Student else 'teachers')
+
+
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+def teacher_list_changed(sender, instance, **kwargs):
+    """Danh sách giáo viên thay đổi -> dựng lại chỉ mục autocomplete giáo viên"""
+    bump_version('teachers')
+
+
+@receiver(post_save, sender=Grade)
+def grade_search_text_changed(sender, instance, created, **kwargs):
+    """Đổi tên khối -> cập nhật search_text của các lớp trong khối"""
+    if created:
+        return
+    changed = False
+    for classroom in Classroom.objects.filter(grade=instance):
+        classroom.grade = instance
+        search_text = classroom.build_search_text()
+        if search_text != classroom.search_text:
+            Classroom.objects.filter(pk=classroom.pk).update(search_text=search_text)
+            changed = True
+    if changed:
+        bump_version('roster')
+
+
+@receiver(post_save, sender=Student)
+def student_search_text_changed(sender, instance, created, **kwargs):
+    """Đổi mã học sinh -> cập nhật search_text các vi phạm của học sinh"""
+    if not created:
+        refresh_behavior_search_text(instance)
+
+
+def refresh_behavior_search_text(student):
+    """Tính lại search_text (chứa họ tên, mã học sinh) cho các vi phạm của học sinh"""
+    records = list(BehaviorRecord.objects.filter(student=student).only(
+        'id', 'violation_type', 'description', 'search_text'
+    ))
+    stale = []
+    for record in records:
+        search_text = record.build_search_text(student)
+        if search_text != record.search_text:
+            record.search_text = search_text
+            stale.append(record)
+    if stale:
+        BehaviorRecord.objects.bulk_update(stale, ['search_text'], batch_size=500)
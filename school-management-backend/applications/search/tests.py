@@ -0,0 +1,87 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from applications.classroom.models import Classroom
+from applications.grade.models import Grade
+from applications.student.models import Student
+from applications.teacher.models import Teacher
+from applications.user_management.models import User
+
+
+AUTOCOMPLETE_URL = '/api/v1/search/autocomplete'
+
+
+class AutocompletePeopleScopeTests(TestCase):
+    """Phạm vi của /search/autocomplete: học sinh - lớp mình, giáo viên - lớp chủ nhiệm, admin - tất cả"""
+
+    @classmethod
+    def setUpTestData(cls):
+        grade = Grade.objects.create(name='10')
+        cls.homeroom_teacher = User.objects.create(username='gvcn', role='teacher', first_name='Trần', last_name='Hoa')
+        cls.other_teacher = User.objects.create(username='gv2', role='teacher', first_name='Lê', last_name='Minh')
+        Teacher.objects.create(user=cls.homeroom_teacher, teacher_code='GV01', subject='Toán')
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.class_a = Classroom.objects.create(name='A1', grade=grade, homeroom_teacher=cls.homeroom_teacher)
+        cls.class_b = Classroom.objects.create(name='A2', grade=grade)
+        cls.student_a = cls._student('hs_a', 'HS01', cls.class_a)
+        cls.student_b = cls._student('hs_b', 'HS02', cls.class_b)
+
+    @staticmethod
+    def _student(username, code, classroom):
+        user = User.objects.create(username=username, role='student', first_name='Nguyễn', last_name=username)
+        return Student.objects.create(
+            user=user, student_code=code, classroom=classroom,
+            date_of_birth=date(2009, 1, 1), gender='male'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(AUTOCOMPLETE_URL, {'q': 'nguyen', **params})
+
+    def codes(self, response):
+        return sorted(item['code'] for item in response.data)
+
+    def test_student_sees_only_own_classroom(self):
+        response = self.get(self.student_a.user)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.codes(response), ['HS01'])
+
+    def test_student_cannot_pass_other_classroom(self):
+        response = self.get(self.student_a.user, classroom_id=str(self.class_b.id))
+        self.assertEqual(response.status_code, 403)
+
+    def test_student_cannot_search_teachers(self):
+        response = self.get(self.student_a.user, type='teacher', q='tran')
+        self.assertEqual(response.status_code, 403)
+
+    def test_teacher_defaults_to_homeroom_classrooms(self):
+        response = self.get(self.homeroom_teacher)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.codes(response), ['HS01'])
+
+    def test_teacher_cannot_pass_other_classroom(self):
+        response = self.get(self.homeroom_teacher, classroom_id=str(self.class_b.id))
+        self.assertEqual(response.status_code, 403)
+
+    def test_teacher_without_homeroom_is_forbidden(self):
+        response = self.get(self.other_teacher)
+        self.assertEqual(response.status_code, 403)
+
+    def test_teacher_cannot_search_teachers(self):
+        response = self.get(self.homeroom_teacher, type='teacher', q='tran')
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_sees_everything(self):
+        response = self.get(self.admin)
+        self.assertEqual(self.codes(response), ['HS01', 'HS02'])
+        response = self.get(self.admin, classroom_id=str(self.class_b.id))
+        self.assertEqual(self.codes(response), ['HS02'])
+        response = self.get(self.admin, type='teacher', q='tran')
+        self.assertEqual(self.codes(response), ['GV01'])
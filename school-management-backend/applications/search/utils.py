@@ -0,0 +1,57 @@
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+
+
+# InnoDB mặc định không đánh chỉ mục FULLTEXT cho từ ngắn hơn 3 ký tự (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+# Stopword mặc định của InnoDB trùng với từ không dấu tiếng Việt (VD: "Thế" -> "the")
+FULLTEXT_STOPWORDS = {
+    'about', 'are', 'com', 'for', 'from', 'how', 'that', 'the', 'this', 'und',
+    'was', 'what', 'when', 'where', 'who', 'will', 'with', 'www',
+}
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(value):
+    """Chuẩn hóa để tìm kiếm: bỏ dấu tiếng Việt (kể cả đ), chữ thường, chỉ giữ chữ và số.
+
+    VD: "Đặng Thị Ánh" -> "dang thi anh", "hs001@school.vn" -> "hs001 school vn"
+    """
+    if not value:
+        return ''
+    value = str(value).replace('đ', 'd').replace('Đ', 'D')
+    value = unicodedata.normalize('NFD', value)
+    value = ''.join(char for char in value if unicodedata.category(char) != 'Mn')
+    return _NON_WORD.sub(' ', value.lower()).strip()
+
+
+def build_search_text(*parts, max_length=255):
+    """Giá trị cột search_text từ các trường cần tìm (tên, mã, email...); max_length=None: không cắt"""
+    text = normalize_text(' '.join(str(part) for part in parts if part))
+    return text[:max_length] if max_length else text
+
+
+def search_q(term, field='search_text'):
+    """Điều kiện tìm kiếm trên cột search_text: mọi từ khóa phải xuất hiện.
+
+    Chỉ dùng chỉ mục FULLTEXT (MATCH ... AGAINST, khớp tiền tố từ) trên MySQL khi mọi từ
+    khóa đủ dài và không phải stopword. Các trường hợp khác (SQLite, từ dưới 3 ký tự,
+    stopword) dùng LIKE '%từ%' trên cột đã chuẩn hóa: không cần LOWER()/OR qua nhiều cột
+    nhưng vẫn quét toàn bảng, không dùng được chỉ mục.
+    """
+    tokens = normalize_text(term).split()
+    if not tokens:
+        return Q()
+    if connection.vendor == 'mysql' and all(
+        len(token) >= FULLTEXT_MIN_TOKEN_SIZE and token not in FULLTEXT_STOPWORDS for token in tokens
+    ):
+        return Q(**{f'{field}__match': ' '.join(f'+{token}*' for token in tokens)})
+    condition = Q()
+    for token in tokens:
+        condition &= Q(**{f'{field}__contains': token})
+    return condition
@@ -0,0 +1,183 @@
+import uuid
+
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.db.models import Q, Case, When, Value, IntegerField
+
+from applications.access_scope import get_scope
+from applications.classroom.models import Classroom
+from applications.student.models import Student
+from applications.teacher.models import Teacher
+from .autocomplete import autocomplete
+from .utils import normalize_text, search_q
+
+
+SEARCH_TYPES = ('student', 'teacher', 'classroom')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def _rank(code_field, term):
+    """Điểm xếp hạng: 3 = trùng mã, 2 = bắt đầu bằng từ khóa (họ tên/tên lớp), 1 = có chứa"""
+    return Case(
+        When(**{f'{code_field}__iexact': term}, then=Value(3)),
+        When(search_text__startswith=normalize_text(term), then=Value(2)),
+        default=Value(1),
+        output_field=IntegerField()
+    )
+
+
+def _search_students(scope, term, limit):
+    queryset = Student.objects.all()
+    if scope.role == 'student':
+        queryset = queryset.filter(id=scope.student_id) if scope.student_id else queryset.none()
+    elif scope.role == 'teacher':
+        queryset = scope.filter(queryset)
+    rows = queryset.filter(search_q(term)).annotate(rank=_rank('student_code', term)).order_by(
+        '-rank', 'search_text'
+    ).values(
+        'id', 'rank', 'student_code', 'user__first_name', 'user__last_name',
+        'classroom_id', 'classroom__name', 'classroom__grade__name'
+    )[:limit]
+    return [{
+        'type': 'student',
+        'id': row['id'],
+        'rank': row['rank'],
+        'label': f"{row['user__first_name']} {row['user__last_name']}".strip(),
+        'code': row['student_code'],
+        'detail': f"{row['classroom__grade__name']}{row['classroom__name']}",
+        'classroom_id': row['classroom_id'],
+    } for row in rows]
+
+
+def _search_teachers(scope, term, limit):
+    queryset = Teacher.objects.all()
+    if scope.role == 'teacher':
+        queryset = queryset.filter(user_id=scope.user_id)
+    rows = queryset.filter(search_q(term)).annotate(rank=_rank('teacher_code', term)).order_by(
+        '-rank', 'search_text'
+    ).values('id', 'rank', 'teacher_code', 'subject', 'user__first_name', 'user__last_name')[:limit]
+    return [{
+        'type': 'teacher',
+        'id': row['id'],
+        'rank': row['rank'],
+        'label': f"{row['user__first_name']} {row['user__last_name']}".strip(),
+        'code': row['teacher_code'],
+        'detail': row['subject'],
+    } for row in rows]
+
+
+def _search_classrooms(scope, term, limit):
+    queryset = Classroom.objects.all()
+    if scope.role == 'student':
+        queryset = queryset.filter(id=scope.classroom_id) if scope.classroom_id else queryset.none()
+    elif scope.role == 'teacher':
+        queryset = queryset.filter(Q(id__in=scope.homeroom_classroom_ids) | Q(homeroom_teacher__isnull=True))
+    rows = queryset.filter(search_q(term)).annotate(rank=_rank('name', term)).order_by(
+        '-rank', 'search_text'
+    ).values('id', 'rank', 'name', 'grade__name')[:limit]
+    return [{
+        'type': 'classroom',
+        'id': row['id'],
+        'rank': row['rank'],
+        'label': f"{row['grade__name']}{row['name']}",
+        'code': row['name'],
+        'detail': f"Khối {row['grade__name']}",
+    } for row in rows]
+
+
+SEARCHERS = {
+    'student': _search_students,
+    'teacher': _search_teachers,
+    'classroom': _search_classrooms,
+}
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def unified_search(request):
+    """API tìm kiếm chung học sinh, giáo viên, lớp học (không dấu, xếp hạng theo độ khớp)"""
+    term = request.query_params.get('q', '').strip()
+    if not normalize_text(term):
+        return Response(
+            {'error': 'Vui lòng nhập từ khóa tìm kiếm (q)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    types = request.query_params.get('types')
+    types = [item.strip() for item in types.split(',')] if types else list(SEARCH_TYPES)
+    invalid_types = [item for item in types if item not in SEARCH_TYPES]
+    if invalid_types:
+        return Response(
+            {'error': f'Loại không hợp lệ: {", ".join(invalid_types)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+
+    scope = get_scope(request)
+    results = []
+    for search_type in types:
+        results.extend(SEARCHERS[search_type](scope, term, limit))
+    results.sort(key=lambda item: (-item['rank'], normalize_text(item['label'])))
+
+    return Response({
+        'query': term,
+        'count': len(results[:limit]),
+        'results': results[:limit],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def autocomplete_people(request):
+    """API gợi ý học sinh/giáo viên theo tiền tố họ tên hoặc mã (chỉ mục trong bộ nhớ)"""
+    term = request.query_params.get('q', '')
+    kind = request.query_params.get('type', 'student')
+    if kind not in ('student', 'teacher'):
+        return Response(
+            {'error': 'type phải là student hoặc teacher'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Phạm vi như students_by_classroom: học sinh - lớp mình, giáo viên - lớp chủ nhiệm, admin - tất cả
+    scope = get_scope(request)
+    if kind == 'teacher' and not scope.is_admin:
+        return Response(
+            {'error': 'Không có quyền tìm kiếm giáo viên'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    classroom_ids = scope.classroom_ids
+    classroom_id = request.query_params.get('classroom_id')
+    if classroom_id:
+        try:
+            classroom_id = uuid.UUID(classroom_id)
+        except ValueError:
+            return Response(
+                {'error': 'classroom_id không hợp lệ'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not scope.can_access_classroom(classroom_id):
+            return Response(
+                {'error': 'Không có quyền truy cập lớp này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        classroom_ids = (classroom_id,)
+    elif kind == 'student' and classroom_ids is not None and not classroom_ids:
+        return Response(
+            {'error': 'Bạn không có lớp nào để tìm kiếm học sinh'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+
+    return Response(autocomplete(term, kind=kind, classroom_ids=classroom_ids, limit=limit))
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class StudentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'applications.student' 
\ No newline at end of file
+    name = 'applications.student'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,252 @@
+import logging
+from datetime import datetime
+
+import pandas as pd
+from django.db import transaction, IntegrityError
+
+from applications.caching import bump_version
+from applications.classroom.models import Classroom
+from applications.import_job.readers import cell_value as _cell
+from applications.import_job.validation import FrameErrors, dry_run_result, text_column
+from applications.user_management.models import User
+from applications.user_management.passwords import hash_account_passwords
+from .models import Student
+
+
+logger = logging.getLogger(__name__)
+
+# Số bản ghi mỗi lần bulk_create
+BATCH_SIZE = 500
+
+# Các cột bắt buộc trong file import học sinh
+REQUIRED_COLUMNS = [
+    'student_code', 'username', 'email', 'password',
+    'first_name', 'last_name', 'classroom_name',
+    'date_of_birth', 'gender'
+]
+
+
+def _parse_date(value):
+    """Parse ngày sinh, giống chế độ import từng dòng: lỗi/trống -> ngày hiện tại"""
+    try:
+        if value is None or pd.isna(value):
+            return datetime.now().date()
+        return pd.to_datetime(value).date()
+    except Exception:
+        return datetime.now().date()
+
+
+def _split_classroom_name(classroom_name):
+    """Tách tên lớp (VD: "12A1" -> ("12", "A1")), None nếu không hợp lệ"""
+    if len(classroom_name) < 3:
+        return None
+    return classroom_name[:-2], classroom_name[-2:]
+
+
+def import_students_bulk(df, initial_password=None):
+    """Import học sinh theo lô (set-based) từ DataFrame"""
+    rows = [(index + 2, record) for index, record in enumerate(df.to_dict('records'))]
+    return import_student_records(rows, initial_password)
+
+
+def import_student_records(rows, initial_password=None):
+    """Import học sinh theo lô (set-based) từ danh sách (số dòng Excel, dict).
+
+    Nạp trước lớp/khối vào dict, kiểm tra trùng student_code/username/email bằng
+    một truy vấn IN cho mỗi cột, sau đó tạo User/Student bằng bulk_create theo lô.
+    Báo cáo lỗi theo từng dòng giống chế độ import từng dòng. Mật khẩu được băm
+    song song (hoặc dùng chung initial_password, bắt buộc đổi khi đăng nhập).
+    """
+    rows = list(rows)
+
+    # Nạp trước lớp học theo (khối, tên lớp)
+    grade_names = set()
+    for _, record in rows:
+        parts = _split_classroom_name(_cell(record, 'classroom_name'))
+        if parts:
+            grade_names.add(parts[0])
+    classrooms = {
+        (item['grade__name'], item['name']): item['id']
+        for item in Classroom.objects.filter(grade__name__in=grade_names).values('id', 'name', 'grade__name')
+    }
+
+    # Kiểm tra trùng với dữ liệu hiện có: một truy vấn IN cho mỗi cột
+    codes = {_cell(record, 'student_code') for _, record in rows}
+    usernames = {_cell(record, 'username') for _, record in rows}
+    emails = {_cell(record, 'email') for _, record in rows}
+    existing_codes = set(Student.objects.filter(student_code__in=codes).values_list('student_code', flat=True))
+    existing_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    existing_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+    errors = []
+    pending = []  # (row_number, user, student)
+    raw_passwords = []
+    for row_number, record in rows:
+        classroom_name = _cell(record, 'classroom_name')
+        parts = _split_classroom_name(classroom_name)
+        classroom_id = classrooms.get(parts) if parts else None
+        if classroom_id is None:
+            errors.append({'row': row_number, 'error': f'Lớp "{classroom_name}" không tồn tại'})
+            continue
+
+        student_code = _cell(record, 'student_code')
+        username = _cell(record, 'username')
+        email = _cell(record, 'email')
+        if student_code in existing_codes:
+            errors.append({'row': row_number, 'error': f'Mã học sinh "{student_code}" đã tồn tại'})
+            continue
+        if username in existing_usernames:
+            errors.append({'row': row_number, 'error': f'Username "{username}" đã tồn tại'})
+            continue
+        if email in existing_emails:
+            errors.append({'row': row_number, 'error': f'Email "{email}" đã tồn tại'})
+            continue
+
+        # Các dòng sau trong file trùng với dòng này sẽ bị báo lỗi như khi import từng dòng
+        existing_codes.add(student_code)
+        existing_usernames.add(username)
+        existing_emails.add(email)
+
+        user = User(
+            username=username,
+            email=email,
+            first_name=_cell(record, 'first_name'),
+            last_name=_cell(record, 'last_name'),
+            role='student',
+            must_change_password=bool(initial_password)
+        )
+        student = Student(
+            user=user,
+            student_code=student_code,
+            classroom_id=classroom_id,
+            date_of_birth=_parse_date(record.get('date_of_birth')),
+            gender=_cell(record, 'gender').lower(),
+            address=_cell(record, 'address'),
+            parent_phone=_cell(record, 'parent_phone')
+        )
+        # bulk_create không gọi save() nên tính search_text trước
+        student.search_text = student.build_search_text()
+        pending.append((row_number, user, student))
+        raw_passwords.append(_cell(record, 'password'))
+
+    # Băm mật khẩu của các dòng hợp lệ (song song theo số core)
+    for (_, user, _), hashed in zip(pending, hash_account_passwords(raw_passwords, initial_password)):
+        user.password = hashed
+
+    success_count = 0
+    with transaction.atomic():
+        for start in range(0, len(pending), BATCH_SIZE):
+            batch = pending[start:start + BATCH_SIZE]
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user for _, user, _ in batch])
+                    Student.objects.bulk_create([student for _, _, student in batch])
+                success_count += len(batch)
+            except IntegrityError:
+                # Xung đột phát sinh trong lúc import: tạo lại từng dòng để biết dòng nào lỗi
+                success_count += _create_rows(batch, errors)
+
+    if success_count:
+        bump_version('roster')
+
+    errors.sort(key=lambda item: item['row'])
+    return {
+        'success_count': success_count,
+        'error_count': len(errors),
+        'errors': errors,
+    }
+
+
+def _create_rows(batch, errors):
+    """Tạo từng dòng trong lô bị lỗi, ghi nhận lỗi theo dòng"""
+    created = 0
+    for row_number, user, student in batch:
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+                student.user = user
+                student.save(force_insert=True)
+            created += 1
+        except IntegrityError:
+            # Không trả thông báo của driver (tên bảng/ràng buộc) cho client
+            logger.warning('Import học sinh: dòng %s vi phạm ràng buộc', row_number, exc_info=True)
+            errors.append({'row': row_number, 'error': _conflict_message(user, student)})
+    return created
+
+
+def _conflict_message(user, student):
+    """Thông báo lỗi theo dòng khi tạo học sinh vi phạm ràng buộc (trùng với bản ghi vừa được tạo)"""
+    if Student.objects.filter(student_code=student.student_code).exists():
+        return f'Mã học sinh "{student.student_code}" đã tồn tại'
+    if User.objects.filter(username=user.username).exists():
+        return f'Username "{user.username}" đã tồn tại'
+    if user.email and User.objects.filter(email=user.email).exists():
+        return f'Email "{user.email}" đã tồn tại'
+    return 'Không tạo được học sinh: dữ liệu không hợp lệ hoặc bị trùng'
+
+
+def validate_students_frame(df, initial_password=None):
+    """Dry run: kiểm tra toàn bộ DataFrame bằng các phép toán theo cột, không ghi database.
+
+    Kiểm tra ô trống, email, trùng trong file, ngày sinh, giới tính, lớp/khối tồn tại
+    (so khớp tập hợp) và trùng với dữ liệu hiện có bằng ba truy vấn IN.
+    """
+    errors = FrameErrors(df)
+    columns = [
+        'student_code', 'username', 'email', 'password', 'first_name', 'last_name',
+        'classroom_name', 'gender', 'date_of_birth'
+    ]
+    values = {column: text_column(df, column) for column in columns}
+
+    required = ['student_code', 'username', 'email', 'first_name', 'last_name', 'classroom_name']
+    if not initial_password:
+        required.append('password')
+    errors.require(required, values)
+    errors.email('email', values['email'])
+    errors.max_length('student_code', values['student_code'], 20)
+    errors.max_length('username', values['username'], 150)
+
+    # Trùng trong file
+    errors.duplicates('student_code', values['student_code'], 'Mã học sinh')
+    errors.duplicates('username', values['username'], 'Username')
+    errors.duplicates('email', values['email'], 'Email')
+
+    # Ngày sinh
+    has_date = df['date_of_birth'].notna() & (values['date_of_birth'] != '')
+    parsed = pd.to_datetime(df['date_of_birth'].where(has_date), errors='coerce', format='mixed')
+    errors.add(~has_date, 'date_of_birth', 'Không được để trống')
+    errors.add(has_date & parsed.isna(), 'date_of_birth', 'Ngày sinh không hợp lệ')
+
+    # Giới tính
+    gender = values['gender'].str.lower()
+    errors.add(~gender.isin(['male', 'female']), 'gender', 'Giới tính phải là male hoặc female')
+
+    # Lớp/khối: "12A1" -> khối "12", lớp "A1"; so khớp với tập (khối, lớp) hiện có
+    classroom_name = values['classroom_name']
+    grade_names = classroom_name.str[:-2]
+    class_names = classroom_name.str[-2:]
+    existing_classrooms = {
+        f"{item['grade__name']}|{item['name']}"
+        for item in Classroom.objects.filter(grade__name__in=set(grade_names)).values('name', 'grade__name')
+    }
+    unknown = (classroom_name.str.len() < 3) | ~(grade_names + '|' + class_names).isin(existing_classrooms)
+    errors.add((classroom_name != '') & unknown, 'classroom_name', 'Lớp "' + classroom_name + '" không tồn tại')
+
+    # Trùng với dữ liệu hiện có: một truy vấn IN cho mỗi cột
+    errors.existing(
+        'student_code', values['student_code'],
+        Student.objects.filter(student_code__in=set(values['student_code'])).values_list('student_code', flat=True),
+        'Mã học sinh'
+    )
+    errors.existing(
+        'username', values['username'],
+        User.objects.filter(username__in=set(values['username'])).values_list('username', flat=True),
+        'Username'
+    )
+    errors.existing(
+        'email', values['email'],
+        User.objects.filter(email__in=set(values['email'])).values_list('email', flat=True),
+        'Email'
+    )
+
+    return dry_run_result(df, errors)
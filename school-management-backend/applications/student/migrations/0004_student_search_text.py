@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-19 09:46
+
+import applications.search.fields
+from django.db import migrations
+
+from applications.search.fields import fulltext_index_operation
+from applications.search.utils import build_search_text
+
+
+def backfill_search_text(apps, schema_editor):
+    Student = apps.get_model('student', 'Student')
+    students = list(Student.objects.select_related('user'))
+    for student in students:
+        full_name = f"{student.user.first_name} {student.user.last_name}".strip()
+        student.search_text = build_search_text(full_name, student.student_code, student.user.email)
+    Student.objects.bulk_update(students, ['search_text'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0003_restore_student_event_permission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search_text',
+            field=applications.search.fields.SearchTextField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        fulltext_index_operation('students', 'students_search_text_ft'),
+    ]
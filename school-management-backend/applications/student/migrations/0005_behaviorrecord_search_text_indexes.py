@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-19 09:51
+
+import applications.search.fields
+from django.conf import settings
+from django.db import migrations, models
+
+from applications.search.fields import fulltext_index_operation
+from applications.search.utils import build_search_text
+
+
+def backfill_search_text(apps, schema_editor):
+    BehaviorRecord = apps.get_model('student', 'BehaviorRecord')
+    records = list(BehaviorRecord.objects.select_related('student__user'))
+    for record in records:
+        user = record.student.user
+        full_name = f"{user.first_name} {user.last_name}".strip()
+        record.search_text = build_search_text(
+            full_name, record.student.student_code, record.violation_type, record.description, max_length=None
+        )
+    BehaviorRecord.objects.bulk_update(records, ['search_text'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0004_student_search_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='behaviorrecord',
+            name='search_text',
+            field=applications.search.fields.LongSearchTextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='behaviorrecord',
+            index=models.Index(fields=['created_at', 'id'], name='behavior_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='behaviorrecord',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='behavior_status_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='behaviorrecord',
+            index=models.Index(fields=['student', 'created_at', 'id'], name='behavior_student_created_idx'),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        fulltext_index_operation('behavior_records', 'behavior_records_search_text_ft'),
+    ]
@@ -3,6 +3,8 @@ import uuid
 from django.contrib.auth.models import AbstractUser
 from applications.user_management.models import User
 from applications.classroom.models import Classroom
+from applications.search.fields import LongSearchTextField, SearchTextField
+from applications.search.utils import build_search_text
 
 
 class Student(models.Model):
@@ -15,6 +17,7 @@ class Student(models.Model):
     gender = models.CharField(max_length=10, choices=[('male', 'Nam'), ('female', 'Nữ')])
     address = models.TextField(blank=True, null=True)
     parent_phone = models.CharField(max_length=15, blank=True, null=True)
+    search_text = SearchTextField(db_index=True)  # Họ tên, mã, email không dấu
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -26,6 +29,15 @@ class Student(models.Model):
     def __str__(self):
         return f"{self.user.full_name} - {self.student_code}"
 
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'search_text'}
+        super().save(*args, **kwargs)
+
+    def build_search_text(self):
+        return build_search_text(self.user.full_name, self.student_code, self.user.email)
+
     @property
     def full_name(self):
         return self.user.full_name
@@ -52,12 +64,21 @@ class BehaviorRecord(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_violations')
     rejection_notes = models.TextField(blank=True, null=True)
+    search_text = LongSearchTextField()  # Họ tên, mã học sinh, loại và toàn bộ mô tả vi phạm không dấu
     
     class Meta:
         db_table = 'behavior_records'
         verbose_name = 'Behavior Record'
         verbose_name_plural = 'Behavior Records'
         ordering = ['-created_at']
+        indexes = [
+            # Mỗi ordering/bộ lọc trong behavior_record_list có index cùng chiều sắp xếp:
+            # created_at/-created_at dùng (created_at, id) quét xuôi/ngược; status dùng
+            # (status, -created_at, -id), cũng phục vụ lọc status + mới nhất trước
+            models.Index(fields=['created_at', 'id'], name='behavior_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='behavior_status_recent_idx'),
+            models.Index(fields=['student', 'created_at', 'id'], name='behavior_student_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.violation_type} ({self.get_status_display()})"
@@ -68,4 +89,16 @@ class BehaviorRecord(models.Model):
 
     @property
     def homeroom_teacher(self):
-        return self.student.classroom.homeroom_teacher 
\ No newline at end of file
+        return self.student.classroom.homeroom_teacher
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'search_text'}
+        super().save(*args, **kwargs)
+
+    def build_search_text(self, student=None):
+        student = student or self.student
+        return build_search_text(
+            student.full_name, student.student_code, self.violation_type, self.description, max_length=None
+        )
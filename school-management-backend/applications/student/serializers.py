@@ -2,6 +2,7 @@ from rest_framework import serializers
 from .models import Student, BehaviorRecord
 from applications.user_management.serializers import UserResponseSerializer
 from applications.classroom.serializers import ClassroomSerializer
+from applications.dynamic_fields import DynamicFieldsMixin
 
 class StudentSerializer(serializers.ModelSerializer):
     user = UserResponseSerializer(read_only=True)
@@ -9,9 +10,9 @@ class StudentSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Student
-        fields = '__all__'
+        exclude = ['search_text']
 
-class StudentListSerializer(serializers.ModelSerializer):
+class StudentListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserResponseSerializer(read_only=True)
     classroom = ClassroomSerializer(read_only=True)
     
@@ -19,6 +20,18 @@ class StudentListSerializer(serializers.ModelSerializer):
         model = Student
         fields = ['id', 'user', 'student_code', 'classroom', 'gender', 'date_of_birth', 'created_at']
 
+class StudentCompactSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Dòng học sinh dạng phẳng (compact): thông tin lớp trả về một lần ở cấp trên"""
+    username = serializers.CharField(source='user.username', read_only=True)
+    email = serializers.CharField(source='user.email', read_only=True)
+    first_name = serializers.CharField(source='user.first_name', read_only=True)
+    last_name = serializers.CharField(source='user.last_name', read_only=True)
+    classroom_id = serializers.UUIDField(read_only=True)
+    
+    class Meta:
+        model = Student
+        fields = ['id', 'student_code', 'username', 'email', 'first_name', 'last_name', 'gender', 'date_of_birth', 'classroom_id']
+
 class StudentCreateRequestSerializer(serializers.ModelSerializer):
     username = serializers.CharField(max_length=150)
     email = serializers.EmailField()
@@ -52,6 +65,12 @@ class StudentUpdateRequestSerializer(serializers.ModelSerializer):
 
 class StudentImportSerializer(serializers.Serializer):
     file = serializers.FileField()
+    # row: tạo từng dòng (mặc định), bulk: kiểm tra theo tập hợp và bulk_create theo lô
+    mode = serializers.ChoiceField(choices=['row', 'bulk'], default='row', required=False)
+    # Mật khẩu tạm dùng chung cho mọi tài khoản (bỏ qua cột password, bắt buộc đổi khi đăng nhập)
+    initial_password = serializers.CharField(required=False, allow_blank=True, min_length=6)
+    # Chỉ kiểm tra file và trả về báo cáo lỗi, không ghi database
+    dry_run = serializers.BooleanField(default=False, required=False)
 
 class StudentImportResultSerializer(serializers.ModelSerializer):
     user = UserResponseSerializer(read_only=True)
@@ -68,7 +87,7 @@ class BehaviorRecordSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = BehaviorRecord
-        fields = '__all__'
+        exclude = ['search_text']
 
 class BehaviorRecordCreateSerializer(serializers.ModelSerializer):
     student_id = serializers.UUIDField(required=False, allow_null=True)  # Thêm trường này để học sinh có thể tạo vi phạm cho người khác
@@ -88,6 +107,23 @@ class BehaviorRecordUpdateSerializer(serializers.ModelSerializer):
         model = BehaviorRecord
         fields = ['status', 'rejection_notes']
 
+class BehaviorRecordBulkModerationSerializer(serializers.Serializer):
+    """Duyệt/từ chối hàng loạt theo danh sách id hoặc theo bộ lọc (lớp, trạng thái, khoảng ngày)"""
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False, max_length=1000)
+    classroom_id = serializers.UUIDField(required=False)
+    status = serializers.ChoiceField(choices=BehaviorRecord.STATUS_CHOICES, required=False, default='pending')
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    rejection_notes = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if not attrs.get('ids') and not any(attrs.get(key) for key in ('classroom_id', 'date_from', 'date_to')):
+            raise serializers.ValidationError('Cần truyền ids hoặc ít nhất một bộ lọc (classroom_id, date_from, date_to)')
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError('date_from phải trước date_to')
+        return attrs
+
 class BehaviorRecordListSerializer(serializers.ModelSerializer):
     student = StudentListSerializer(read_only=True)
     approved_by = UserResponseSerializer(read_only=True)
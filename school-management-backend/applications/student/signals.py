@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from applications.caching import bump_version
+from applications.classroom.models import Classroom
+from .models import Student
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def student_roster_changed(sender, instance, **kwargs):
+    """Danh sách học sinh thay đổi -> vô hiệu hóa cache thống kê sĩ số"""
+    bump_version('roster')
+
+
+@receiver(post_save, sender=Classroom)
+@receiver(post_delete, sender=Classroom)
+def classroom_roster_changed(sender, instance, **kwargs):
+    """Lớp học thay đổi (tên, khối) -> vô hiệu hóa cache thống kê sĩ số"""
+    bump_version('roster')
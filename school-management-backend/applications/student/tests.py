@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from applications.classroom.models import Classroom
+from applications.event.models import Event, EventType
+from applications.grade.models import Grade
+from applications.student.models import BehaviorRecord, Student
+from applications.user_management.models import User
+
+
+# Số truy vấn của /students/<id>/profile: học sinh, sự kiện gần đây, vi phạm, thống kê điểm, xếp hạng lớp
+PROFILE_QUERY_BUDGET = 5
+
+
+class StudentProfileQueryTests(TestCase):
+    """Hồ sơ học sinh dùng số truy vấn cố định, không tăng theo số sự kiện/vi phạm"""
+
+    @classmethod
+    def setUpTestData(cls):
+        grade = Grade.objects.create(name='10')
+        cls.admin = User.objects.create(username='admin', role='admin')
+        teacher = User.objects.create(username='gvcn', role='teacher', first_name='Trần', last_name='Hoa')
+        classroom = Classroom.objects.create(name='A1', grade=grade, homeroom_teacher=teacher)
+        study = EventType.objects.create(name='Học tập')
+        discipline = EventType.objects.create(name='Nề nếp')
+        today = date.today()
+        cls.students = []
+        for index in range(4):
+            user = User.objects.create(username=f'hs{index}', role='student', first_name='Nguyễn', last_name=f'An {index}')
+            student = Student.objects.create(
+                user=user, student_code=f'HS{index:02d}', classroom=classroom,
+                date_of_birth=date(2009, 1, 1), gender='male'
+            )
+            cls.students.append(student)
+            for k in range(index * 5 + 1):
+                Event.objects.create(
+                    event_type=study if k % 2 else discipline, classroom=classroom, student=student,
+                    date=today - timedelta(days=k), points=5 if k % 3 else -2, recorded_by=teacher
+                )
+            for k in range(index + 1):
+                BehaviorRecord.objects.create(student=student, violation_type='Đi muộn', description=f'Lần {k}')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_profile_query_budget(self):
+        student = self.students[-1]
+        with self.assertNumQueries(PROFILE_QUERY_BUDGET):
+            response = self.client.get(f'/api/v1/students/{student.id}/profile')
+        self.assertEqual(response.status_code, 200)
+        expected_total = sum(Event.objects.filter(student=student).values_list('points', flat=True))
+        self.assertEqual(response.data['points']['total'], expected_total)
+        self.assertEqual(len(response.data['behavior_records']), 4)
+        self.assertEqual(response.data['class_rank']['class_size'], 4)
+
+    def test_profile_queries_do_not_grow_with_records(self):
+        for student in self.students:
+            with self.assertNumQueries(PROFILE_QUERY_BUDGET):
+                self.client.get(f'/api/v1/students/{student.id}/profile')
@@ -8,6 +8,7 @@ urlpatterns = [
     path('', views.student_list, name='student-list'),
     path('/create', views.student_create, name='student-create'),
     path('/<uuid:id>', views.student_detail, name='student-detail'),
+    path('/<uuid:id>/profile', views.student_profile, name='student-profile'),
     path('/<uuid:id>/update', views.student_update, name='student-update'),
     path('/<uuid:id>/delete', views.student_delete, name='student-delete'),
     
@@ -26,6 +27,7 @@ urlpatterns = [
     path('/behavior', views.behavior_record_list, name='behavior-record-list'),
     path('/behavior/stats', views.behavior_record_stats, name='behavior-record-stats'),
     path('/behavior/create', views.behavior_record_create, name='behavior-record-create'),
+    path('/behavior/bulk-moderate', views.behavior_record_bulk_moderate, name='behavior-record-bulk-moderate'),
     path('/behavior/<uuid:id>', views.behavior_record_detail, name='behavior-record-detail'),
     path('/behavior/<uuid:id>/update', views.behavior_record_update, name='behavior-record-update'),
     path('/behavior/<uuid:id>/delete', views.behavior_record_delete, name='behavior-record-delete'),
@@ -8,16 +8,19 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.contrib.auth.hashers import make_password
-from django.db.models import Q
+from django.db.models import Q, Count, Sum, FilteredRelation
+from django.db.models.functions import Coalesce, TruncWeek
 from django.utils import timezone
 import pandas as pd
 import io
 from datetime import datetime
 
 from .models import Student, BehaviorRecord
+from .importers import import_students_bulk, validate_students_frame, REQUIRED_COLUMNS
 from .serializers import (
     StudentSerializer, 
     StudentListSerializer,
+    StudentCompactSerializer,
     StudentCreateRequestSerializer,
     StudentUpdateRequestSerializer,
     StudentImportSerializer,
@@ -25,13 +28,23 @@ from .serializers import (
     BehaviorRecordSerializer,
     BehaviorRecordCreateSerializer,
     BehaviorRecordUpdateSerializer,
-    BehaviorRecordListSerializer
+    BehaviorRecordListSerializer,
+    BehaviorRecordBulkModerationSerializer
 )
 from applications.user_management.models import User
 from applications.classroom.models import Classroom
+from applications.event.models import Event
+from applications.event.school_year import school_year_of, school_year_range
+from applications.caching import get_or_set
+from applications.permissions import IsAdminOrTeacher
+from applications.access_scope import get_scope
+from applications.search.utils import search_q
+from applications.dynamic_fields import requested_fields, is_compact
+from applications.pagination import InvalidCursor, paginate_keyset, resolve_ordering
+from applications.user_management.passwords import hash_account_passwords
 from django.db import models
 
-from ..classroom.serializers import ClassroomSerializer
+from ..classroom.serializers import ClassroomSerializer, ClassroomCompactSerializer
 
 
 @api_view(['GET'])
@@ -40,14 +53,14 @@ def student_list(request):
     """API lấy danh sách học sinh"""
     # Filter theo role của user
     user = request.user
-    queryset = Student.objects.select_related('user', 'classroom', 'classroom__grade')
+    queryset = Student.objects.select_related('user', 'classroom', 'classroom__grade', 'classroom__homeroom_teacher')
     
     if user.role == 'student':
         # Học sinh chỉ thấy thông tin của mình
         queryset = queryset.filter(user=user)
     elif user.role == 'teacher':
-        # Giáo viên thấy học sinh trong lớp mình chủ nhiệm
-        queryset = queryset.filter(classroom__homeroom_teacher=user)
+        # Giáo viên thấy học sinh trong lớp mình chủ nhiệm (classroom_id IN, không join)
+        queryset = get_scope(request).filter(queryset)
     # Admin thấy tất cả
     
     # Apply filters
@@ -57,12 +70,8 @@ def student_list(request):
     
     search = request.query_params.get('search')
     if search:
-        queryset = queryset.filter(
-            Q(user__first_name__icontains=search) |
-            Q(user__last_name__icontains=search) |
-            Q(student_code__icontains=search) |
-            Q(user__email__icontains=search)
-        )
+        # Tìm trên cột search_text (họ tên, mã, email không dấu)
+        queryset = queryset.filter(search_q(search))
     
     gender = request.query_params.get('gender')
     if gender:
@@ -87,14 +96,18 @@ def student_list(request):
     end = start + page_size
     items = list(queryset[start:end])
 
-    serializer = StudentListSerializer(items, many=True)
-    return Response({
-        'results': serializer.data,
+    response_data = {
+        'results': _student_rows(request, items),
         'total': total,
         'page': page,
         'page_size': page_size,
         'total_pages': (total + page_size - 1) // page_size,
-    })
+    }
+    if is_compact(request):
+        # Mỗi lớp chỉ trả về một lần, các dòng học sinh tham chiếu qua classroom_id
+        classrooms = {item.classroom_id: item.classroom for item in items}
+        response_data['classrooms'] = ClassroomCompactSerializer(classrooms.values(), many=True).data
+    return Response(response_data)
 
 
 @api_view(['GET'])
@@ -120,6 +133,115 @@ def student_detail(request, id):
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def student_profile(request, id):
+    """API hồ sơ học sinh: thông tin, sự kiện gần đây, vi phạm, điểm theo loại/tuần và xếp hạng trong lớp.
+
+    Tối đa 5 truy vấn: học sinh, sự kiện gần đây, vi phạm gần đây, điểm nhóm theo
+    loại sự kiện x tuần, tổng điểm các học sinh trong lớp (để xếp hạng).
+    """
+    student = get_object_or_404(
+        Student.objects.select_related('user', 'classroom__grade', 'classroom__homeroom_teacher'),
+        id=id
+    )
+    
+    # Check permissions (giống student_detail)
+    user = request.user
+    if user.role == 'student' and student.user_id != user.id:
+        return Response(
+            {'error': 'Không có quyền truy cập'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    elif user.role == 'teacher' and student.classroom.homeroom_teacher_id != user.id:
+        return Response(
+            {'error': 'Không có quyền truy cập'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    try:
+        school_year = int(request.query_params.get('school_year', school_year_of()))
+    except ValueError:
+        school_year = school_year_of()
+    start_date, end_date = school_year_range(school_year)
+    try:
+        limit = max(1, min(100, int(request.query_params.get('limit', '20'))))
+    except ValueError:
+        limit = 20
+    
+    student_events = Event.objects.filter(student=student, date__range=(start_date, end_date))
+    
+    # Sự kiện gần đây (values, không dùng serializer lồng)
+    recent_events = list(student_events.order_by('-date', '-created_at').values(
+        'id', 'date', 'period', 'points', 'description', 'created_at',
+        'event_type_id', 'event_type__name', 'recorded_by__first_name', 'recorded_by__last_name'
+    )[:limit])
+    
+    # Vi phạm gần đây
+    behavior_records = list(BehaviorRecord.objects.filter(student=student).order_by('-created_at').values(
+        'id', 'violation_type', 'description', 'points_deducted', 'status', 'created_at', 'approved_at'
+    )[:limit])
+    
+    # Điểm nhóm theo loại sự kiện x tuần trong một truy vấn; tổng theo loại/tuần tính từ kết quả
+    grouped = student_events.annotate(week=TruncWeek('date')).values(
+        'event_type_id', 'event_type__name', 'week'
+    ).annotate(
+        positive=Coalesce(Sum('points', filter=Q(points__gt=0)), 0),
+        negative=Coalesce(Sum('points', filter=Q(points__lt=0)), 0),
+        total=Sum('points'),
+        count=Count('id')
+    ).order_by('week')
+    by_type = {}
+    by_week = {}
+    total_points = positive_points = negative_points = 0
+    for row in grouped:
+        item = by_type.setdefault(row['event_type_id'], {
+            'event_type_id': row['event_type_id'],
+            'event_type_name': row['event_type__name'],
+            'points': 0,
+            'count': 0,
+        })
+        item['points'] += row['total']
+        item['count'] += row['count']
+        week = row['week'].date() if hasattr(row['week'], 'date') else row['week']
+        week_item = by_week.setdefault(week, {'week_start': week, 'points': 0, 'count': 0})
+        week_item['points'] += row['total']
+        week_item['count'] += row['count']
+        total_points += row['total']
+        positive_points += row['positive']
+        negative_points += row['negative']
+    
+    # Xếp hạng trong lớp theo tổng điểm năm học (học sinh chưa có sự kiện = 0 điểm)
+    # Đọc từ bảng tổng điểm theo năm học thay vì cộng lại toàn bộ sự kiện của lớp
+    class_totals = Student.objects.filter(classroom_id=student.classroom_id).annotate(
+        year_total=FilteredRelation('point_totals', condition=Q(point_totals__school_year=school_year))
+    ).annotate(
+        total=Coalesce('year_total__net_points', 0)
+    ).values_list('id', 'total')
+    totals = dict(class_totals)
+    my_total = totals.get(student.id, 0)
+    rank = 1 + sum(1 for value in totals.values() if value > my_total)
+    
+    return Response({
+        'student': StudentSerializer(student).data,
+        'school_year': school_year,
+        'recent_events': recent_events,
+        'behavior_records': behavior_records,
+        'points': {
+            'total': total_points,
+            'positive': positive_points,
+            'negative': negative_points,
+            'by_event_type': sorted(by_type.values(), key=lambda item: -item['points']),
+            'by_week': list(by_week.values()),
+        },
+        'class_rank': {
+            'rank': rank,
+            'class_size': len(totals),
+            'total_points': my_total,
+        },
+    })
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def student_create(request):
@@ -262,11 +384,11 @@ def student_import_excel(request):
                 df = pd.read_excel(file, engine='xlrd')
             
             # Validate columns (address, parent_phone are optional)
-            required_columns = [
-                'student_code', 'username', 'email', 'password',
-                'first_name', 'last_name', 'classroom_name',
-                'date_of_birth', 'gender'
-            ]
+            required_columns = list(REQUIRED_COLUMNS)
+            initial_password = serializer.validated_data.get('initial_password')
+            if initial_password:
+                # Dùng mật khẩu tạm chung, không cần cột password
+                required_columns.remove('password')
             
             missing_columns = [col for col in required_columns if col not in df.columns]
             if missing_columns:
@@ -274,12 +396,31 @@ def student_import_excel(request):
                     'error': f'Thiếu các cột: {", ".join(missing_columns)}'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
+            if serializer.validated_data.get('dry_run'):
+                # Chỉ kiểm tra toàn bộ file, không ghi database
+                return Response(validate_students_frame(df, initial_password), status=status.HTTP_200_OK)
+            
+            if serializer.validated_data.get('mode') == 'bulk':
+                result = import_students_bulk(df, initial_password=initial_password)
+                success_count = result['success_count']
+                error_count = result['error_count']
+                return Response({
+                    'success_count': success_count,
+                    'error_count': error_count,
+                    'errors': result['errors'][:10],  # Limit to first 10 errors
+                    'message': f'Import thành công {success_count} học sinh, {error_count} lỗi'
+                }, status=status.HTTP_200_OK)
+            
             success_count = 0
             error_count = 0
             errors = []
             
+            # Băm trước mật khẩu của mọi dòng (song song theo số core)
+            raw_passwords = df['password'].astype(str) if 'password' in df.columns else [''] * len(df)
+            hashed_passwords = hash_account_passwords(raw_passwords, initial_password)
+            
             with transaction.atomic():
-                for index, row in df.iterrows():
+                for position, (index, row) in enumerate(df.iterrows()):
                     try:
                         # Validate classroom
                         classroom_name = str(row['classroom_name']).strip()
@@ -344,10 +485,11 @@ def student_import_excel(request):
                         user = User.objects.create(
                             username=username,
                             email=email,
-                            password=make_password(str(row['password'])),
+                            password=hashed_passwords[position],
                             first_name=str(row['first_name']).strip(),
                             last_name=str(row['last_name']).strip(),
-                            role='student'
+                            role='student',
+                            must_change_password=bool(initial_password)
                         )
                         
                         # Create student
@@ -430,7 +572,7 @@ def students_by_classroom(request, classroom_id):
     """API lấy danh sách học sinh theo lớp"""
     # Kiểm tra xem lớp có tồn tại không
     try:
-        classroom = Classroom.objects.get(id=classroom_id)
+        classroom = Classroom.objects.select_related('grade', 'homeroom_teacher').get(id=classroom_id)
     except Classroom.DoesNotExist:
         return Response(
             {'error': 'Lớp học không tồn tại'},
@@ -441,21 +583,20 @@ def students_by_classroom(request, classroom_id):
     user = request.user
     if user.role == 'student':
         # Học sinh chỉ có thể xem thông tin lớp của mình
-        try:
-            student = Student.objects.get(user=user)
-            if str(student.classroom.id) != str(classroom_id):
-                return Response(
-                    {'error': 'Không có quyền truy cập lớp này'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-        except Student.DoesNotExist:
+        scope = get_scope(request)
+        if scope.student_id is None:
             return Response(
                 {'error': 'Không tìm thấy thông tin học sinh'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        if not scope.can_access_classroom(classroom_id):
+            return Response(
+                {'error': 'Không có quyền truy cập lớp này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
     elif user.role == 'teacher':
         # Giáo viên chỉ có thể xem học sinh trong lớp mình chủ nhiệm
-        if classroom.homeroom_teacher != user:
+        if classroom.homeroom_teacher_id != user.id:
             return Response(
                 {'error': 'Bạn không phải giáo viên chủ nhiệm của lớp này'},
                 status=status.HTTP_403_FORBIDDEN
@@ -463,26 +604,22 @@ def students_by_classroom(request, classroom_id):
     # Admin có thể xem tất cả
     
     # Base queryset for class-wide stats (unfiltered)
-    base_students = Student.objects.filter(classroom_id=classroom_id).select_related(
-        'user', 'classroom', 'classroom__grade'
-    )
-    # Display queryset (filtered/sorted)
-    students = base_students.order_by('user__first_name', 'user__last_name')
+    base_students = Student.objects.filter(classroom_id=classroom_id)
     
-    # Apply search filter if provided
+    # Điều kiện lọc hiển thị (search, gender)
+    display_filter = Q()
     search = request.query_params.get('search')
     if search:
-        students = students.filter(
-            Q(user__first_name__icontains=search) |
-            Q(user__last_name__icontains=search) |
-            Q(student_code__icontains=search) |
-            Q(user__email__icontains=search)
-        )
+        display_filter &= search_q(search)
     
-    # Apply gender filter if provided
     gender = request.query_params.get('gender')
     if gender:
-        students = students.filter(gender=gender)
+        display_filter &= Q(gender=gender)
+    
+    # Display queryset (filtered/sorted)
+    students = base_students.filter(display_filter).select_related(
+        'user', 'classroom', 'classroom__grade', 'classroom__homeroom_teacher'
+    ).order_by('user__first_name', 'user__last_name')
     
     # Pagination (on filtered display queryset)
     try:
@@ -494,27 +631,27 @@ def students_by_classroom(request, classroom_id):
     page = max(1, page)
     page_size = max(1, min(100, page_size))
 
-    total = students.count()
+    # Sĩ số lớp và tổng số sau lọc trong cùng một truy vấn
+    counts = _roster_counts(base_students, display_filter)
+    total = counts['total']
     start = (page - 1) * page_size
     end = start + page_size
     items = list(students[start:end])
 
-    serializer = StudentListSerializer(items, many=True)
-    
     # Thêm thông tin lớp học
     classroom_serializer = ClassroomSerializer(classroom)
     
     response_data = {
         'classroom': classroom_serializer.data,
-        'results': serializer.data,
+        'results': _student_rows(request, items),
         'total': total,
         'page': page,
         'page_size': page_size,
         'total_pages': (total + page_size - 1) // page_size,
         # Class-wide fixed stats (not affected by filters)
-        'class_total': base_students.count(),
-        'class_male_count': base_students.filter(gender='male').count(),
-        'class_female_count': base_students.filter(gender='female').count(),
+        'class_total': counts['class_total'],
+        'class_male_count': counts['class_male_count'],
+        'class_female_count': counts['class_female_count'],
     }
     
     return Response(response_data)
@@ -529,12 +666,17 @@ def students_of_my_classroom(request):
         return Response({'error': 'Chỉ áp dụng cho học sinh'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
-        student = Student.objects.select_related('classroom', 'classroom__grade').get(user=user)
+        student = Student.objects.select_related(
+            'classroom', 'classroom__grade', 'classroom__homeroom_teacher'
+        ).get(user=user)
     except Student.DoesNotExist:
         return Response({'error': 'Không tìm thấy thông tin học sinh'}, status=status.HTTP_404_NOT_FOUND)
 
     classroom = student.classroom
-    students = Student.objects.filter(classroom=classroom).select_related('user', 'classroom', 'classroom__grade').order_by('user__first_name', 'user__last_name')
+    base_students = Student.objects.filter(classroom=classroom)
+    students = base_students.select_related(
+        'user', 'classroom', 'classroom__grade', 'classroom__homeroom_teacher'
+    ).order_by('user__first_name', 'user__last_name')
 
     # Pagination
     try:
@@ -546,105 +688,171 @@ def students_of_my_classroom(request):
     page = max(1, page)
     page_size = max(1, min(100, page_size))
 
-    total = students.count()
+    counts = _roster_counts(base_students)
+    total = counts['total']
     start = (page - 1) * page_size
     end = start + page_size
     items = list(students[start:end])
 
-    serializer = StudentListSerializer(items, many=True)
     classroom_serializer = ClassroomSerializer(classroom)
 
     return Response({
         'classroom': classroom_serializer.data,
-        'results': serializer.data,
+        'results': _student_rows(request, items),
         'total': total,
         'page': page,
         'page_size': page_size,
         'total_pages': (total + page_size - 1) // page_size,
-        'male_count': students.filter(gender='male').count(),
-        'female_count': students.filter(gender='female').count(),
+        'male_count': counts['class_male_count'],
+        'female_count': counts['class_female_count'],
     })
 
+
+# Thứ tự sắp xếp cho phép của behavior_record_list -> các trường ORDER BY (trường cuối là khóa duy nhất).
+# Chiều sắp xếp khớp index: (created_at, id) quét xuôi/ngược, (status, -created_at, -id);
+# lọc theo học sinh dùng (student, created_at, id)
+BEHAVIOR_RECORD_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    'created_at': ('created_at', 'id'),
+    'status': ('status', '-created_at', '-id'),
+}
+
+
+def _student_rows(request, items):
+    """Serialize danh sách học sinh theo ?fields= và ?compact= (dòng phẳng, không lặp lại lớp)"""
+    fields = requested_fields(request)
+    if is_compact(request):
+        return StudentCompactSerializer(items, many=True, fields=fields).data
+    return StudentListSerializer(items, many=True, fields=fields).data
+
+
+def _roster_counts(base_students, display_filter=None):
+    """Đếm sĩ số lớp (tổng, nam, nữ) và số học sinh sau lọc bằng một truy vấn aggregate"""
+    aggregates = {
+        'class_total': Count('id'),
+        'class_male_count': Count('id', filter=Q(gender='male')),
+        'class_female_count': Count('id', filter=Q(gender='female')),
+    }
+    if display_filter:
+        aggregates['total'] = Count('id', filter=display_filter)
+    counts = base_students.aggregate(**aggregates)
+    counts.setdefault('total', counts['class_total'])
+    return counts
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def student_stats(request):
     """API lấy thống kê học sinh"""
-    total_students = Student.objects.count()
-    male_students = Student.objects.filter(gender='male').count()
-    female_students = Student.objects.filter(gender='female').count()
+    # Cache theo phiên bản roster, chỉ tính lại khi Student/Classroom thay đổi
+    stats = get_or_set('student_stats', ['roster'], _compute_student_stats)
+    return Response(stats)
+
+
+def _compute_student_stats():
+    """Tính thống kê học sinh: 1 truy vấn tổng + 1 truy vấn theo lớp"""
+    totals = Student.objects.aggregate(
+        total_students=Count('id'),
+        male_students=Count('id', filter=Q(gender='male')),
+        female_students=Count('id', filter=Q(gender='female')),
+    )
     
-    # Thống kê theo lớp
-    classroom_stats = []
-    classrooms = Classroom.objects.all()
-    for classroom in classrooms:
-        student_count = classroom.students.count()
-        if student_count > 0:
-            classroom_stats.append({
-                'classroom_name': classroom.full_name,
-                'student_count': student_count
-            })
+    # Thống kê theo lớp (join grade để lấy tên lớp, không gọi full_name từng lớp)
+    classrooms = Classroom.objects.annotate(
+        student_count=Count('students'),
+        male_count=Count('students', filter=Q(students__gender='male')),
+        female_count=Count('students', filter=Q(students__gender='female')),
+    ).filter(student_count__gt=0).values(
+        'name', 'grade__name', 'student_count', 'male_count', 'female_count'
+    ).order_by('grade__name', 'name')
     
-    stats = {
-        'total_students': total_students,
-        'male_students': male_students,
-        'female_students': female_students,
+    classroom_stats = [
+        {
+            'classroom_name': f"{item['grade__name']}{item['name']}",
+            'student_count': item['student_count'],
+            'male_count': item['male_count'],
+            'female_count': item['female_count'],
+        }
+        for item in classrooms
+    ]
+    
+    return {
+        'total_students': totals['total_students'],
+        'male_students': totals['male_students'],
+        'female_students': totals['female_students'],
         'classroom_stats': classroom_stats
     }
-    
-    return Response(stats) 
 
 # Behavior Record Views
+def _scope_behavior_records(request, queryset):
+    """Lọc vi phạm theo phạm vi (get_scope): học sinh - của mình, giáo viên - lớp chủ nhiệm.
+
+    Trả về (queryset, None) hoặc (None, Response lỗi).
+    """
+    scope = get_scope(request)
+    if scope.role == 'student':
+        if scope.student_id is None:
+            return None, Response({'error': 'Không tìm thấy thông tin học sinh'}, status=status.HTTP_404_NOT_FOUND)
+        return queryset.filter(student_id=scope.student_id), None
+    if scope.role == 'teacher':
+        if not scope.homeroom_classroom_ids:
+            return None, Response(
+                {'error': 'Bạn không phải giáo viên chủ nhiệm lớp nào'}, status=status.HTTP_403_FORBIDDEN
+            )
+        return scope.filter(queryset, 'student__classroom_id'), None
+    # Admin thấy tất cả
+    return queryset, None
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def behavior_record_list(request):
-    """API lấy danh sách vi phạm nề nết"""
-    user = request.user
-    queryset = BehaviorRecord.objects.select_related('student__user', 'student__classroom', 'approved_by')
+    """API lấy danh sách vi phạm nề nết, luôn phân trang theo cursor.
+
+    page_size mặc định 20 (tối đa 100); trang sau lấy bằng cursor=<next_cursor>.
+    """
+    queryset = BehaviorRecord.objects.select_related(
+        'student__user', 'student__classroom__grade', 'student__classroom__homeroom_teacher', 'approved_by'
+    )
     
     # Filter theo quyền
-    if user.role == 'student':
-        # Học sinh chỉ thấy vi phạm của mình
-        try:
-            student = Student.objects.get(user=user)
-            queryset = queryset.filter(student=student)
-        except Student.DoesNotExist:
-            return Response({'error': 'Không tìm thấy thông tin học sinh'}, status=status.HTTP_404_NOT_FOUND)
-    
-    elif user.role == 'teacher':
-        # Giáo viên thấy vi phạm của lớp mình chủ nhiệm
-        homeroom_classrooms = user.homeroom_classrooms.all()
-        if homeroom_classrooms:
-            queryset = queryset.filter(student__classroom__in=homeroom_classrooms)
-        else:
-            return Response({'error': 'Bạn không phải giáo viên chủ nhiệm lớp nào'}, status=status.HTTP_403_FORBIDDEN)
-    
-    # Admin thấy tất cả
+    queryset, error = _scope_behavior_records(request, queryset)
+    if error:
+        return error
     
     # Apply filters
     classroom_id = request.query_params.get('classroom_id')
     if classroom_id and classroom_id != 'all':
         queryset = queryset.filter(student__classroom_id=classroom_id)
     
+    student_id = request.query_params.get('student_id')
+    if student_id:
+        queryset = queryset.filter(student_id=student_id)
+    
     status_filter = request.query_params.get('status')
     if status_filter and status_filter != 'all':
         queryset = queryset.filter(status=status_filter)
     
     search = request.query_params.get('search')
     if search:
-        queryset = queryset.filter(
-            Q(student__user__first_name__icontains=search) |
-            Q(student__user__last_name__icontains=search) |
-            Q(student__student_code__icontains=search) |
-            Q(violation_type__icontains=search) |
-            Q(description__icontains=search)
+        # Tìm trên cột search_text (họ tên, mã học sinh, loại và mô tả vi phạm không dấu)
+        queryset = queryset.filter(search_q(search))
+    
+    # Ordering: chỉ nhận các thứ tự có index
+    ordering = resolve_ordering(request, BEHAVIOR_RECORD_ORDERINGS, '-created_at')
+    if ordering is None:
+        return Response(
+            {'error': f'ordering phải là một trong: {", ".join(BEHAVIOR_RECORD_ORDERINGS)}'},
+            status=status.HTTP_400_BAD_REQUEST
         )
+    ordering = BEHAVIOR_RECORD_ORDERINGS[ordering]
     
-    # Ordering
-    ordering = request.query_params.get('ordering', '-created_at')
-    queryset = queryset.order_by(ordering)
+    try:
+        items, page = paginate_keyset(queryset, request, ordering)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = BehaviorRecordListSerializer(queryset, many=True)
-    return Response(serializer.data)
+    serializer = BehaviorRecordListSerializer(items, many=True)
+    return Response({'results': serializer.data, **page})
 
 
 @api_view(['GET'])
@@ -654,8 +862,8 @@ def behavior_record_detail(request, id):
     behavior_record = get_object_or_404(BehaviorRecord, id=id)
     
     # Check permissions
-    user = request.user
-    if user.role == 'student' and behavior_record.student.user != user:
+    scope = get_scope(request)
+    if scope.role == 'student' and behavior_record.student_id != scope.student_id:
         return Response(
             {'error': 'Không có quyền truy cập'},
             status=status.HTTP_403_FORBIDDEN
@@ -675,24 +883,23 @@ def behavior_record_create(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Lấy thông tin học sinh tạo vi phạm
-    try:
-        current_student = Student.objects.get(user=request.user)
-    except Student.DoesNotExist:
+    # Học sinh và lớp của người tạo lấy từ phạm vi truy cập
+    scope = get_scope(request)
+    if scope.student_id is None:
         return Response(
             {'error': 'Không tìm thấy thông tin học sinh'},
             status=status.HTTP_404_NOT_FOUND
         )
     
     # Kiểm tra xem học sinh có được phân công vào lớp không
-    if not hasattr(current_student, 'classroom') or not current_student.classroom:
+    if not scope.classroom_id:
         return Response(
             {'error': 'Bạn chưa được phân công vào lớp học nào'},
             status=status.HTTP_403_FORBIDDEN
         )
     
     # Kiểm tra xem lớp có giáo viên chủ nhiệm không
-    if not hasattr(current_student.classroom, 'homeroom_teacher') or not current_student.classroom.homeroom_teacher:
+    if not Classroom.objects.filter(id=scope.classroom_id, homeroom_teacher__isnull=False).exists():
         return Response(
             {'error': 'Lớp của bạn chưa có giáo viên chủ nhiệm'},
             status=status.HTTP_403_FORBIDDEN
@@ -702,25 +909,22 @@ def behavior_record_create(request):
     if serializer.is_valid():
         try:
             with transaction.atomic():
-                # Xác định học sinh bị vi phạm
-                target_student = current_student  # Mặc định là chính mình
+                # Xác định học sinh bị vi phạm: mặc định là chính mình
+                target_id = serializer.validated_data.get('student_id') or scope.student_id
+                try:
+                    target_student = Student.objects.select_related('user').get(id=target_id)
+                except Student.DoesNotExist:
+                    return Response(
+                        {'error': 'Không tìm thấy học sinh được chọn'},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
                 
-                # Nếu có student_id trong request, kiểm tra xem có phải học sinh trong cùng lớp không
-                if 'student_id' in serializer.validated_data and serializer.validated_data['student_id']:
-                    try:
-                        target_student = Student.objects.get(id=serializer.validated_data['student_id'])
-                        
-                        # Kiểm tra xem học sinh có trong cùng lớp không
-                        if target_student.classroom.id != current_student.classroom.id:
-                            return Response(
-                                {'error': 'Bạn chỉ có thể tạo vi phạm cho học sinh trong cùng lớp'},
-                                status=status.HTTP_403_FORBIDDEN
-                            )
-                    except Student.DoesNotExist:
-                        return Response(
-                            {'error': 'Không tìm thấy học sinh được chọn'},
-                            status=status.HTTP_404_NOT_FOUND
-                        )
+                # Kiểm tra xem học sinh có trong cùng lớp không
+                if target_student.classroom_id != scope.classroom_id:
+                    return Response(
+                        {'error': 'Bạn chỉ có thể tạo vi phạm cho học sinh trong cùng lớp'},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
                 
                 behavior_record = BehaviorRecord.objects.create(
                     student=target_student,
@@ -757,7 +961,7 @@ def behavior_record_update(request, id):
     
     if user.role == 'teacher':
         # Kiểm tra xem có phải giáo viên chủ nhiệm của lớp không
-        if not user.homeroom_classrooms.filter(id=behavior_record.student.classroom.id).exists():
+        if not get_scope(request).can_access_classroom(behavior_record.student.classroom_id):
             return Response(
                 {'error': 'Bạn không phải giáo viên chủ nhiệm của lớp này'},
                 status=status.HTTP_403_FORBIDDEN
@@ -789,6 +993,68 @@ def behavior_record_update(request, id):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdminOrTeacher])
+def behavior_record_bulk_moderate(request):
+    """API duyệt/từ chối vi phạm hàng loạt bằng một câu UPDATE, trả kết quả theo từng id"""
+    user = request.user
+    serializer = BehaviorRecordBulkModerationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+    
+    # Phạm vi được phép: giáo viên chỉ duyệt vi phạm của lớp mình chủ nhiệm
+    scope = BehaviorRecord.objects.all()
+    homeroom_ids = None
+    if user.role == 'teacher':
+        homeroom_ids = set(get_scope(request).homeroom_classroom_ids)
+        scope = scope.filter(student__classroom_id__in=homeroom_ids)
+    
+    ids = data.get('ids')
+    if ids:
+        targets = BehaviorRecord.objects.filter(id__in=ids)
+    else:
+        targets = scope.filter(status=data['status'])
+        if data.get('classroom_id'):
+            targets = targets.filter(student__classroom_id=data['classroom_id'])
+        if data.get('date_from'):
+            targets = targets.filter(created_at__date__gte=data['date_from'])
+        if data.get('date_to'):
+            targets = targets.filter(created_at__date__lte=data['date_to'])
+    
+    new_status = 'approved' if data['action'] == 'approve' else 'rejected'
+    now = timezone.now()
+    changes = {'status': new_status, 'updated_at': now}
+    if new_status == 'approved':
+        changes.update(approved_at=now, approved_by=user)
+    else:
+        changes['rejection_notes'] = data.get('rejection_notes', '')
+    
+    results = {}
+    with transaction.atomic():
+        rows = targets.select_for_update().values_list('id', 'status', 'student__classroom_id')
+        to_update = []
+        for record_id, current_status, classroom_id in rows:
+            if homeroom_ids is not None and classroom_id not in homeroom_ids:
+                results[record_id] = 'forbidden'
+            elif current_status == new_status:
+                results[record_id] = 'unchanged'
+            else:
+                results[record_id] = new_status
+                to_update.append(record_id)
+        
+        updated_count = scope.filter(id__in=to_update).update(**changes) if to_update else 0
+    
+    for record_id in ids or []:
+        results.setdefault(record_id, 'not_found')
+    
+    return Response({
+        'action': data['action'],
+        'updated_count': updated_count,
+        'results': [{'id': record_id, 'outcome': outcome} for record_id, outcome in results.items()],
+    })
+
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def behavior_record_delete(request, id):
@@ -798,7 +1064,7 @@ def behavior_record_delete(request, id):
     
     # Check permissions
     if user.role == 'student':
-        if behavior_record.student.user != user:
+        if behavior_record.student_id != get_scope(request).student_id:
             return Response(
                 {'error': 'Bạn chỉ có thể xóa vi phạm của mình'},
                 status=status.HTTP_403_FORBIDDEN
@@ -825,49 +1091,45 @@ def behavior_record_delete(request, id):
 def behavior_record_stats(request):
     """API lấy thống kê vi phạm nề nết"""
     user = request.user
-    queryset = BehaviorRecord.objects.select_related('student__classroom')
     
     # Filter theo quyền
-    if user.role == 'student':
-        try:
-            student = Student.objects.get(user=user)
-            queryset = queryset.filter(student=student)
-        except Student.DoesNotExist:
-            return Response({'error': 'Không tìm thấy thông tin học sinh'}, status=status.HTTP_404_NOT_FOUND)
+    queryset, error = _scope_behavior_records(request, BehaviorRecord.objects.all())
+    if error:
+        return error
     
-    elif user.role == 'teacher':
-        homeroom_classrooms = user.homeroom_classrooms.all()
-        if homeroom_classrooms:
-            queryset = queryset.filter(student__classroom__in=homeroom_classrooms)
-        else:
-            return Response({'error': 'Bạn không phải giáo viên chủ nhiệm lớp nào'}, status=status.HTTP_403_FORBIDDEN)
-    
-    # Tính toán thống kê
-    total_violations = queryset.count()
-    pending_violations = queryset.filter(status='pending').count()
-    approved_violations = queryset.filter(status='approved').count()
-    rejected_violations = queryset.filter(status='rejected').count()
-    total_points_deducted = queryset.filter(status='approved').aggregate(
-        total=models.Sum('points_deducted')
-    )['total'] or 0
-    
-    # Thống kê theo lớp
+    # Tính toán thống kê: số lượng theo trạng thái và tổng điểm trừ trong một truy vấn
+    totals = queryset.aggregate(
+        total_violations=Count('id'),
+        pending_violations=Count('id', filter=Q(status='pending')),
+        approved_violations=Count('id', filter=Q(status='approved')),
+        rejected_violations=Count('id', filter=Q(status='rejected')),
+        total_points_deducted=models.Sum('points_deducted', filter=Q(status='approved')),
+    )
+    
+    # Thống kê theo lớp: nhóm theo classroom_id, lấy tên lớp sau
     classroom_stats = []
     if user.role in ['admin', 'teacher']:
-        classroom_stats = queryset.values('student__classroom__full_name').annotate(
-            count=models.Count('id')
-        ).order_by('-count')[:10]
+        counts = list(
+            queryset.values('student__classroom_id').annotate(count=Count('id')).order_by('-count')[:10]
+        )
+        labels = {
+            item['id']: f"{item['grade__name']}{item['name']}"
+            for item in Classroom.objects.filter(
+                id__in=[row['student__classroom_id'] for row in counts]
+            ).values('id', 'name', 'grade__name')
+        }
+        classroom_stats = [
+            {'classroom_name': labels.get(row['student__classroom_id']), 'count': row['count']}
+            for row in counts
+        ]
     
     stats = {
-        'total_violations': total_violations,
-        'pending_violations': pending_violations,
-        'approved_violations': approved_violations,
-        'rejected_violations': rejected_violations,
-        'total_points_deducted': total_points_deducted,
-        'classroom_stats': [
-            {'classroom_name': item['student__classroom__full_name'], 'count': item['count']}
-            for item in classroom_stats
-        ]
+        'total_violations': totals['total_violations'],
+        'pending_violations': totals['pending_violations'],
+        'approved_violations': totals['approved_violations'],
+        'rejected_violations': totals['rejected_violations'],
+        'total_points_deducted': totals['total_points_deducted'] or 0,
+        'classroom_stats': classroom_stats
     }
     
     return Response(stats) 
\ No newline at end of file
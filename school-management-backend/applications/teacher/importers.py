@@ -0,0 +1,322 @@
+import re
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from applications.caching import bump_version
+from applications.import_job.readers import cell_value
+from applications.import_job.validation import EMAIL_PATTERN, FrameErrors, dry_run_result, text_column
+from applications.user_management.models import User
+from applications.user_management.passwords import hash_account_passwords
+from .models import Teacher
+from .serializers import TeacherImportSerializer
+
+
+# Các cột bắt buộc trong file import giáo viên
+REQUIRED_COLUMNS = ['username', 'email', 'password', 'first_name', 'last_name', 'teacher_code']
+
+# Trường được so sánh/cập nhật khi upsert (mật khẩu của giáo viên đã có không bị ghi đè)
+UPSERT_USER_FIELDS = ['username', 'email', 'first_name', 'last_name']
+# subject không bắt buộc: file không có cột subject thì giữ nguyên môn dạy hiện có
+UPSERT_TEACHER_FIELDS = ['subject']
+SUBJECT_MAX_LENGTH = Teacher._meta.get_field('subject').max_length
+MAX_LENGTHS = {
+    'username': 150, 'first_name': 30, 'last_name': 30, 'teacher_code': 20, 'subject': SUBJECT_MAX_LENGTH
+}
+
+# Số bản ghi mỗi lệnh bulk_create/bulk_update
+BATCH_SIZE = 500
+
+
+def import_teacher_records(rows, initial_password=None):
+    """Import giáo viên từ danh sách (số dòng Excel, dict), kiểm tra từng dòng.
+
+    Mật khẩu được băm trước cho mọi dòng (song song theo số core) hoặc dùng chung
+    initial_password (bắt buộc đổi khi đăng nhập).
+    """
+    rows = list(rows)
+    success_count = 0
+    error_count = 0
+    errors = []
+    success_data = []
+
+    raw_passwords = [cell_value(record, 'password') for _, record in rows]
+    hashed_passwords = hash_account_passwords(raw_passwords, initial_password)
+
+    for position, (row_number, record) in enumerate(rows):
+        try:
+            # Prepare data
+            data = {
+                'username': cell_value(record, 'username'),
+                'email': cell_value(record, 'email'),
+                'password': initial_password or raw_passwords[position],
+                'first_name': cell_value(record, 'first_name'),
+                'last_name': cell_value(record, 'last_name'),
+                'teacher_code': cell_value(record, 'teacher_code'),
+                'subject': cell_value(record, 'subject')
+            }
+
+            # Validate data
+            serializer = TeacherImportSerializer(data=data)
+            if serializer.is_valid():
+                with transaction.atomic():
+                    user = User.objects.create(
+                        username=data['username'],
+                        email=data['email'],
+                        password=hashed_passwords[position],
+                        first_name=data['first_name'],
+                        last_name=data['last_name'],
+                        role='teacher',
+                        must_change_password=bool(initial_password)
+                    )
+                    Teacher.objects.create(
+                        user=user,
+                        teacher_code=data['teacher_code'],
+                        subject=data['subject']
+                    )
+
+                success_count += 1
+                success_data.append({
+                    'row': row_number,
+                    'username': data['username'],
+                    'teacher_code': data['teacher_code'],
+                    'full_name': f"{data['first_name']} {data['last_name']}"
+                })
+            else:
+                error_count += 1
+                errors.append({
+                    'row': row_number,
+                    'errors': serializer.errors
+                })
+
+        except Exception as e:
+            error_count += 1
+            errors.append({
+                'row': row_number,
+                'errors': {'general': f'Lỗi xử lý: {str(e)}'}
+            })
+
+    return {
+        'success_count': success_count,
+        'error_count': error_count,
+        'errors': errors,
+        'success_data': success_data
+    }
+
+
+def validate_teachers_frame(df, initial_password=None):
+    """Dry run: kiểm tra toàn bộ DataFrame bằng các phép toán theo cột, không ghi database.
+
+    Kiểm tra ô trống, độ dài, email, trùng trong file và trùng với dữ liệu hiện có
+    bằng ba truy vấn IN.
+    """
+    errors = FrameErrors(df)
+    columns = ['username', 'email', 'password', 'first_name', 'last_name', 'teacher_code', 'subject']
+    values = {column: text_column(df, column) for column in columns}
+
+    required = ['username', 'email', 'first_name', 'last_name', 'teacher_code']
+    if not initial_password:
+        required.append('password')
+    errors.require(required, values)
+    errors.email('email', values['email'])
+    errors.max_length('username', values['username'], 150)
+    errors.max_length('first_name', values['first_name'], 30)
+    errors.max_length('last_name', values['last_name'], 30)
+    errors.max_length('teacher_code', values['teacher_code'], 20)
+    errors.max_length('subject', values['subject'], SUBJECT_MAX_LENGTH)
+
+    # Trùng trong file
+    errors.duplicates('teacher_code', values['teacher_code'], 'Mã giáo viên')
+    errors.duplicates('username', values['username'], 'Username')
+    errors.duplicates('email', values['email'], 'Email')
+
+    # Trùng với dữ liệu hiện có: một truy vấn IN cho mỗi cột
+    errors.existing(
+        'teacher_code', values['teacher_code'],
+        Teacher.objects.filter(teacher_code__in=set(values['teacher_code'])).values_list('teacher_code', flat=True),
+        'Mã giáo viên'
+    )
+    errors.existing(
+        'username', values['username'],
+        User.objects.filter(username__in=set(values['username'])).values_list('username', flat=True),
+        'Username'
+    )
+    errors.existing(
+        'email', values['email'],
+        User.objects.filter(email__in=set(values['email'])).values_list('email', flat=True),
+        'Email'
+    )
+
+    return dry_run_result(df, errors)
+
+
+def _row_errors(data, is_new, initial_password):
+    """Kiểm tra một dòng upsert trong bộ nhớ (không truy vấn database)"""
+    errors = {}
+    required = ['username', 'email', 'first_name', 'last_name', 'teacher_code']
+    if is_new and not initial_password:
+        required.append('password')
+    for field in required:
+        if not data[field]:
+            errors.setdefault(field, []).append('Không được để trống')
+    if data['email'] and not re.match(EMAIL_PATTERN, data['email']):
+        errors.setdefault('email', []).append('Email không hợp lệ')
+    for field, limit in MAX_LENGTHS.items():
+        if len(data[field]) > limit:
+            errors.setdefault(field, []).append(f'Tối đa {limit} ký tự')
+    return errors
+
+
+def new_upsert_state():
+    """Mã/username/email đã gặp trong file (giá trị -> số dòng), dùng chung giữa các lô của một file"""
+    return {'teacher_code': {}, 'username': {}, 'email': {}}
+
+
+def upsert_teacher_records(rows, initial_password=None, commit=True, seen=None):
+    """Import giáo viên theo teacher_code: tạo mới, cập nhật hoặc giữ nguyên.
+
+    Giáo viên và user hiện có của các mã trong file được lấy bằng một truy vấn,
+    so sánh trong bộ nhớ, rồi ghi bằng bulk_create/bulk_update theo lô. Mỗi dòng
+    được báo cáo là created, updated, unchanged hoặc failed. commit=False chỉ
+    trả về báo cáo (dry run), không ghi database.
+
+    Khi file được xử lý theo nhiều lô (import job), truyền cùng một seen
+    (new_upsert_state()) cho mọi lô để dòng trùng với dòng ở lô trước vẫn bị
+    báo lỗi thay vì ghi đè bản ghi vừa tạo.
+    """
+    rows = list(rows)
+    # Các dòng cùng tiêu đề: chỉ so sánh/ghi subject khi file có cột này
+    teacher_fields = UPSERT_TEACHER_FIELDS if any('subject' in record for _, record in rows) else []
+    parsed = []
+    for row_number, record in rows:
+        data = {
+            field: cell_value(record, field) or ''
+            for field in ['username', 'email', 'password', 'first_name', 'last_name', 'teacher_code', 'subject']
+        }
+        parsed.append((row_number, data))
+
+    codes = {data['teacher_code'] for _, data in parsed if data['teacher_code']}
+    existing = {
+        teacher.teacher_code: teacher
+        for teacher in Teacher.objects.select_related('user').filter(teacher_code__in=codes)
+    }
+
+    # Username/email đang thuộc về user khác (một truy vấn cho cả file)
+    usernames = {data['username'] for _, data in parsed if data['username']}
+    emails = {data['email'] for _, data in parsed if data['email']}
+    taken_usernames = {}
+    taken_emails = {}
+    for user_id, username, email in User.objects.filter(
+        Q(username__in=usernames) | Q(email__in=emails)
+    ).values_list('id', 'username', 'email'):
+        taken_usernames[username] = user_id
+        taken_emails[email] = user_id
+
+    report = []
+    errors = []
+    to_create = []  # (vị trí trong report, data)
+    users_to_update = []
+    teachers_to_update = []
+    if seen is None:
+        seen = new_upsert_state()
+
+    for row_number, data in parsed:
+        teacher = existing.get(data['teacher_code'])
+        row_errors = _row_errors(data, teacher is None, initial_password)
+        owner_id = teacher.user_id if teacher else None
+
+        for field, label, taken in [
+            ('teacher_code', 'Mã giáo viên', None),
+            ('username', 'Username', taken_usernames),
+            ('email', 'Email', taken_emails),
+        ]:
+            value = data[field]
+            if not value:
+                continue
+            if value in seen[field]:
+                row_errors.setdefault(field, []).append(
+                    f'{label} "{value}" bị trùng với dòng {seen[field][value]}'
+                )
+            elif taken is not None and value in taken and taken[value] != owner_id:
+                row_errors.setdefault(field, []).append(f'{label} "{value}" đã tồn tại')
+
+        if row_errors:
+            errors.append({'row': row_number, 'errors': row_errors})
+            report.append({'row': row_number, 'teacher_code': data['teacher_code'], 'status': 'failed'})
+            continue
+        # Chỉ dòng hợp lệ mới giữ mã/username/email trong file
+        for field in seen:
+            seen[field][data[field]] = row_number
+
+        if teacher is None:
+            to_create.append((len(report), data))
+            report.append({'row': row_number, 'teacher_code': data['teacher_code'], 'status': 'created'})
+            continue
+
+        # So sánh trong bộ nhớ, chỉ ghi các trường thay đổi
+        changed = [field for field in UPSERT_USER_FIELDS if getattr(teacher.user, field) != data[field]]
+        changed += [field for field in teacher_fields if getattr(teacher, field) != data[field]]
+        if not changed:
+            report.append({'row': row_number, 'teacher_code': data['teacher_code'], 'status': 'unchanged'})
+            continue
+        for field in UPSERT_USER_FIELDS:
+            setattr(teacher.user, field, data[field])
+        for field in teacher_fields:
+            setattr(teacher, field, data[field])
+        if set(changed) & set(UPSERT_USER_FIELDS):
+            users_to_update.append(teacher.user)
+        teachers_to_update.append(teacher)
+        report.append({
+            'row': row_number, 'teacher_code': data['teacher_code'], 'status': 'updated', 'changed_fields': changed
+        })
+
+    if commit and (to_create or teachers_to_update):
+        now = timezone.now()
+        hashed_passwords = hash_account_passwords([data['password'] for _, data in to_create], initial_password)
+        new_users = []
+        new_teachers = []
+        for (_, data), password in zip(to_create, hashed_passwords):
+            user = User(
+                username=data['username'],
+                email=data['email'],
+                password=password,
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                role='teacher',
+                must_change_password=bool(initial_password)
+            )
+            teacher = Teacher(user=user, teacher_code=data['teacher_code'], subject=data['subject'])
+            # bulk_create không gọi save() nên tự tính search_text
+            teacher.search_text = teacher.build_search_text()
+            new_users.append(user)
+            new_teachers.append(teacher)
+        for user in users_to_update:
+            user.updated_at = now
+        for teacher in teachers_to_update:
+            teacher.search_text = teacher.build_search_text()
+            teacher.updated_at = now
+
+        with transaction.atomic():
+            User.objects.bulk_create(new_users, batch_size=BATCH_SIZE)
+            Teacher.objects.bulk_create(new_teachers, batch_size=BATCH_SIZE)
+            User.objects.bulk_update(users_to_update, UPSERT_USER_FIELDS + ['updated_at'], batch_size=BATCH_SIZE)
+            Teacher.objects.bulk_update(
+                teachers_to_update, teacher_fields + ['search_text', 'updated_at'], batch_size=BATCH_SIZE
+            )
+        bump_version('teachers')
+
+    counts = {status: 0 for status in ('created', 'updated', 'unchanged', 'failed')}
+    for item in report:
+        counts[item['status']] += 1
+    return {
+        'mode': 'upsert',
+        'dry_run': not commit,
+        'created_count': counts['created'],
+        'updated_count': counts['updated'],
+        'unchanged_count': counts['unchanged'],
+        'success_count': len(report) - counts['failed'],
+        'error_count': counts['failed'],
+        'errors': errors,
+        'rows': report,
+    }
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-19 09:46
+
+import applications.search.fields
+from django.db import migrations
+
+from applications.search.fields import fulltext_index_operation
+from applications.search.utils import build_search_text
+
+
+def backfill_search_text(apps, schema_editor):
+    Teacher = apps.get_model('teacher', 'Teacher')
+    teachers = list(Teacher.objects.select_related('user'))
+    for teacher in teachers:
+        full_name = f"{teacher.user.first_name} {teacher.user.last_name}".strip()
+        teacher.search_text = build_search_text(full_name, teacher.teacher_code, teacher.user.email, teacher.subject)
+    Teacher.objects.bulk_update(teachers, ['search_text'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teacher', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacher',
+            name='search_text',
+            field=applications.search.fields.SearchTextField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        fulltext_index_operation('teachers', 'teachers_search_text_ft'),
+    ]
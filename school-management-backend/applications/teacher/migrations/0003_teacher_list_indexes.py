@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 09:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teacher', '0002_teacher_search_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['created_at', 'id'], name='teacher_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['subject', 'id'], name='teacher_subject_idx'),
+        ),
+    ]
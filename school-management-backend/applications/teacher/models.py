@@ -1,6 +1,9 @@
 from django.db import models
 import uuid
 
+from applications.search.fields import SearchTextField
+from applications.search.utils import build_search_text
+
 
 class Teacher(models.Model):
     """Giáo viên"""
@@ -8,6 +11,7 @@ class Teacher(models.Model):
     user = models.OneToOneField('user_management.User', on_delete=models.CASCADE, related_name='teacher_profile')
     teacher_code = models.CharField(max_length=20, unique=True)  # Mã giáo viên
     subject = models.CharField(max_length=100, blank=True)  # Môn dạy
+    search_text = SearchTextField(db_index=True)  # Họ tên, mã, email, môn không dấu
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -15,6 +19,20 @@ class Teacher(models.Model):
         db_table = 'teachers'
         verbose_name = 'Giáo viên'
         verbose_name_plural = 'Giáo viên'
+        indexes = [
+            # Các ordering của teacher_list (teacher_code đã có unique index)
+            models.Index(fields=['created_at', 'id'], name='teacher_created_idx'),
+            models.Index(fields=['subject', 'id'], name='teacher_subject_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.teacher_code} - {self.user.get_full_name()}" 
\ No newline at end of file
+        return f"{self.teacher_code} - {self.user.get_full_name()}"
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'search_text'}
+        super().save(*args, **kwargs)
+
+    def build_search_text(self):
+        return build_search_text(self.user.full_name, self.teacher_code, self.user.email, self.subject)
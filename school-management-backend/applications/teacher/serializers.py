@@ -122,9 +122,22 @@ class TeacherListSerializer(serializers.ModelSerializer):
         }
 
     def get_homeroom_class_count(self, obj):
+        # Dùng giá trị teacher_list đã tính sẵn cho cả trang nếu có
+        if hasattr(obj, 'homeroom_class_count'):
+            return obj.homeroom_class_count
         return obj.user.homeroom_classrooms.count()
 
 
+class TeacherImportRequestSerializer(serializers.Serializer):
+    """Tham số import giáo viên từ Excel (file được kiểm tra riêng)"""
+    # create: chỉ tạo mới, upsert: tạo mới hoặc cập nhật theo teacher_code
+    mode = serializers.ChoiceField(choices=['create', 'upsert'], default='create', required=False)
+    # Mật khẩu tạm dùng chung cho mọi tài khoản (bỏ qua cột password, bắt buộc đổi khi đăng nhập)
+    initial_password = serializers.CharField(required=False, allow_blank=True, min_length=6)
+    # Chỉ kiểm tra file và trả về báo cáo lỗi, không ghi database
+    dry_run = serializers.BooleanField(default=False, required=False)
+
+
 class TeacherImportSerializer(serializers.Serializer):
     """Serializer cho import Teacher từ Excel"""
     username = serializers.CharField(max_length=150)
@@ -133,7 +146,9 @@ class TeacherImportSerializer(serializers.Serializer):
     first_name = serializers.CharField(max_length=30)
     last_name = serializers.CharField(max_length=30)
     teacher_code = serializers.CharField(max_length=20)
-    subject = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    subject = serializers.CharField(
+        max_length=Teacher._meta.get_field('subject').max_length, required=False, allow_blank=True
+    )
 
     def validate_username(self, value):
         if User.objects.filter(username=value).exists():
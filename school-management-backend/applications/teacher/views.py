@@ -5,28 +5,62 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.contrib.auth.hashers import make_password
-from django.db.models import Q
+from django.db.models import Q, Count, Exists, OuterRef
 from django.http import HttpResponse
 import pandas as pd
 import io
 from datetime import datetime
 
 from .models import Teacher
+from .importers import import_teacher_records, upsert_teacher_records, validate_teachers_frame, REQUIRED_COLUMNS
 from .serializers import (
     TeacherSerializer, 
     TeacherListSerializer,
     TeacherCreateRequestSerializer,
     TeacherUpdateRequestSerializer,
-    TeacherImportSerializer,
+    TeacherImportRequestSerializer,
     TeacherImportResultSerializer
 )
 from applications.user_management.models import User
+from applications.classroom.models import Classroom
+from applications.search.utils import search_q
+from applications.pagination import resolve_ordering, paginate_keyset, InvalidCursor
+
+
+# Ordering cho phép trong teacher_list -> các trường sắp xếp thật (trường cuối là khóa duy nhất),
+# mỗi ordering đều có index và chỉ một chiều để quét index xuôi/ngược: teacher_code (unique),
+# (created_at, id), (subject, id). Sắp theo tên dùng đúng thứ tự của user_name_idx trên users
+# (last_name, first_name, id): database quét users theo index rồi join teachers theo user_id.
+TEACHER_ORDERINGS = {
+    'teacher_code': ('teacher_code',),
+    '-teacher_code': ('-teacher_code',),
+    'name': ('user__last_name', 'user__first_name', 'user__id'),
+    '-name': ('-user__last_name', '-user__first_name', '-user__id'),
+    'created_at': ('created_at', 'id'),
+    '-created_at': ('-created_at', '-id'),
+    'subject': ('subject', 'id'),
+}
+
+
+def _attach_homeroom_counts(teachers):
+    """Số lớp chủ nhiệm của các giáo viên trong trang: một truy vấn GROUP BY trên classrooms.
+
+    Không annotate Count vào truy vấn danh sách vì GROUP BY làm mất quét theo index của ordering.
+    """
+    teachers = list(teachers)
+    counts = dict(
+        Classroom.objects.filter(homeroom_teacher_id__in=[teacher.user_id for teacher in teachers])
+        .values_list('homeroom_teacher_id').annotate(count=Count('id')).order_by()
+    )
+    for teacher in teachers:
+        teacher.homeroom_class_count = counts.get(teacher.user_id, 0)
+    return teachers
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def teacher_list(request):
-    """API lấy danh sách giáo viên"""
+    """API lấy danh sách giáo viên, phân trang theo cursor (page_size mặc định 20, tối đa 100)"""
     # Filter theo role của user
     user = request.user
     queryset = Teacher.objects.select_related('user')
@@ -39,24 +73,29 @@ def teacher_list(request):
     # Apply filters
     search = request.query_params.get('search')
     if search:
-        queryset = queryset.filter(
-            Q(user__first_name__icontains=search) |
-            Q(user__last_name__icontains=search) |
-            Q(teacher_code__icontains=search) |
-            Q(user__email__icontains=search) |
-            Q(subject__icontains=search)
-        )
+        # Tìm trên cột search_text (họ tên, mã, email, môn không dấu)
+        queryset = queryset.filter(search_q(search))
     
     subject = request.query_params.get('subject')
     if subject:
         queryset = queryset.filter(subject__icontains=subject)
     
-    # Ordering
-    ordering = request.query_params.get('ordering', 'user__first_name')
-    queryset = queryset.order_by(ordering)
+    # Ordering (chỉ nhận các giá trị trong whitelist)
+    ordering = resolve_ordering(request, TEACHER_ORDERINGS, 'teacher_code')
+    if ordering is None:
+        return Response(
+            {'error': f'ordering phải là một trong: {", ".join(TEACHER_ORDERINGS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    ordering = TEACHER_ORDERINGS[ordering]
+    
+    try:
+        items, page = paginate_keyset(queryset, request, ordering)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = TeacherListSerializer(queryset, many=True)
-    return Response(serializer.data)
+    serializer = TeacherListSerializer(_attach_homeroom_counts(items), many=True)
+    return Response({'results': serializer.data, **page})
 
 
 @api_view(['GET'])
@@ -179,28 +218,25 @@ def teacher_delete(request, id):
 @permission_classes([IsAuthenticated])
 def teacher_stats(request):
     """API lấy thống kê giáo viên"""
-    total_teachers = Teacher.objects.count()
-    teachers_with_classes = Teacher.objects.filter(user__homeroom_classrooms__isnull=False).distinct().count()
-    
-    # Thống kê theo môn học
-    subject_stats = []
-    subjects = Teacher.objects.values_list('subject', flat=True).distinct()
-    for subject in subjects:
-        if subject:  # Skip empty subjects
-            count = Teacher.objects.filter(subject=subject).count()
-            subject_stats.append({
-                'subject': subject,
-                'count': count
-            })
+    # Tổng số và số giáo viên có lớp chủ nhiệm trong một truy vấn (EXISTS thay cho join + distinct)
+    has_classes = Exists(Classroom.objects.filter(homeroom_teacher_id=OuterRef('user_id')))
+    counts = Teacher.objects.annotate(has_classes=has_classes).aggregate(
+        total=Count('id'),
+        with_classes=Count('id', filter=Q(has_classes=True))
+    )
+    total_teachers = counts['total']
+    teachers_with_classes = counts['with_classes']
     
-    # Sắp xếp theo số lượng giảm dần
-    subject_stats.sort(key=lambda x: x['count'], reverse=True)
+    # Thống kê theo môn học: một GROUP BY, sắp xếp theo số lượng giảm dần
+    subject_stats = Teacher.objects.exclude(subject='').values('subject').annotate(
+        count=Count('id')
+    ).order_by('-count', 'subject')[:10]  # Top 10 subjects
     
     stats = {
         'total_teachers': total_teachers,
         'teachers_with_classes': teachers_with_classes,
         'teachers_without_classes': total_teachers - teachers_with_classes,
-        'subject_stats': subject_stats[:10]  # Top 10 subjects
+        'subject_stats': list(subject_stats)
     }
     
     return Response(stats)
@@ -225,6 +261,15 @@ def teacher_import_excel(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    serializer = TeacherImportRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    # mode=upsert: tạo mới hoặc cập nhật theo teacher_code thay vì chỉ tạo mới
+    mode = serializer.validated_data['mode']
+    dry_run = serializer.validated_data['dry_run']
+    # Mật khẩu tạm dùng chung (bỏ qua cột password, bắt buộc đổi khi đăng nhập)
+    initial_password = serializer.validated_data.get('initial_password') or None
+    
     try:
         # Read Excel file
         if file.name.endswith('.xlsx'):
@@ -233,7 +278,10 @@ def teacher_import_excel(request):
             df = pd.read_excel(file, engine='xlrd')
         
         # Validate required columns
-        required_columns = ['username', 'email', 'password', 'first_name', 'last_name', 'teacher_code']
+        required_columns = list(REQUIRED_COLUMNS)
+        # Upsert: password chỉ cần cho giáo viên mới (kiểm tra theo từng dòng)
+        if initial_password or mode == 'upsert':
+            required_columns.remove('password')
         missing_columns = [col for col in required_columns if col not in df.columns]
         
         if missing_columns:
@@ -242,77 +290,16 @@ def teacher_import_excel(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Process data
-        success_count = 0
-        error_count = 0
-        errors = []
-        success_data = []
+        # Process data (row number = index + 2: 1-based, +1 for header)
+        rows = [(index + 2, record) for index, record in enumerate(df.to_dict('records'))]
+        if mode == 'upsert':
+            return Response(upsert_teacher_records(rows, initial_password, commit=not dry_run))
         
-        for index, row in df.iterrows():
-            row_number = index + 2  # Excel row number (1-based, +1 for header)
-            
-            try:
-                # Prepare data
-                data = {
-                    'username': str(row['username']).strip(),
-                    'email': str(row['email']).strip(),
-                    'password': str(row['password']).strip(),
-                    'first_name': str(row['first_name']).strip(),
-                    'last_name': str(row['last_name']).strip(),
-                    'teacher_code': str(row['teacher_code']).strip(),
-                    'subject': str(row.get('subject', '')).strip()
-                }
-                
-                # Validate data
-                serializer = TeacherImportSerializer(data=data)
-                if serializer.is_valid():
-                    with transaction.atomic():
-                        # Create user
-                        user_data = {
-                            'username': data['username'],
-                            'email': data['email'],
-                            'password': make_password(data['password']),
-                            'first_name': data['first_name'],
-                            'last_name': data['last_name'],
-                            'role': 'teacher'
-                        }
-                        user = User.objects.create(**user_data)
-                        
-                        # Create teacher
-                        teacher_data = {
-                            'user': user,
-                            'teacher_code': data['teacher_code'],
-                            'subject': data['subject']
-                        }
-                        teacher = Teacher.objects.create(**teacher_data)
-                    
-                    success_count += 1
-                    success_data.append({
-                        'row': row_number,
-                        'username': data['username'],
-                        'teacher_code': data['teacher_code'],
-                        'full_name': f"{data['first_name']} {data['last_name']}"
-                    })
-                else:
-                    error_count += 1
-                    errors.append({
-                        'row': row_number,
-                        'errors': serializer.errors
-                    })
-                    
-            except Exception as e:
-                error_count += 1
-                errors.append({
-                    'row': row_number,
-                    'errors': {'general': f'Lỗi xử lý: {str(e)}'}
-                })
+        # Dry run: chỉ kiểm tra toàn bộ file, không ghi database
+        if dry_run:
+            return Response(validate_teachers_frame(df, initial_password))
         
-        result = {
-            'success_count': success_count,
-            'error_count': error_count,
-            'errors': errors,
-            'success_data': success_data
-        }
+        result = import_teacher_records(rows, initial_password)
         
         return Response(result)
         
@@ -19,6 +19,12 @@ urlpatterns = [
     # Teacher app
     path('/teachers', include('applications.teacher.urls')),
     
+    # Import Job app
+    path('/imports', include('applications.import_job.urls')),
+    
+    # Search app
+    path('/search', include('applications.search.urls')),
+    
     # path('api/', include('applications.grade.urls')),
     # path('api/', include('applications.notification.urls')),
     # path('api/', include('applications.point_rule.urls')),
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class UserManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'applications.user_management' 
\ No newline at end of file
+    name = 'applications.user_management'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,99 @@
+import uuid
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import PermissionDenied
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+from .tokens import (
+    get_token_state, ROLE_CLAIM, USERNAME_CLAIM, TOKEN_VERSION_CLAIM, SCOPE_VERSION_CLAIM,
+    STUDENT_CLAIM, CLASSROOM_CLAIM, HOMEROOM_CLAIM, MUST_CHANGE_PASSWORD_CLAIM
+)
+
+
+# Các API (url name) vẫn dùng được khi user chưa đổi mật khẩu tạm
+PASSWORD_CHANGE_ALLOWED_VIEWS = {
+    'auth_login', 'auth_refresh', 'auth_logout', 'auth_change_password', 'user_profile',
+}
+
+
+class PasswordChangeRequired(PermissionDenied):
+    default_code = 'password_change_required'
+
+    def __init__(self):
+        super().__init__({
+            'error': 'Bạn cần đổi mật khẩu tạm trước khi sử dụng hệ thống',
+            'code': self.default_code,
+        })
+
+
+def _uuid(value):
+    return uuid.UUID(value) if value else None
+
+
+def _user_from_claims(values):
+    """User với các trường có trong claim, các trường còn lại để deferred (tải khi cần)"""
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    user = User.from_db('default', field_names, [values[name] for name in field_names])
+    user._from_token_claims = True
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Xác thực JWT không truy vấn bảng users.
+
+    User được dựng từ claim (id, username, role) bằng User.from_db: là instance
+    User thật (gán được vào ForeignKey, dùng được trong filter), các trường khác
+    được Django tải lười khi truy cập. Phiên bản token được so với bảng
+    TokenVersion (có cache) để thu hồi token.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        # Tài khoản có mật khẩu tạm (import): chặn mọi API trừ đổi mật khẩu/đăng xuất/profile
+        if result is not None and result[0].must_change_password:
+            match = getattr(request._request, 'resolver_match', None)
+            if match is None or match.url_name not in PASSWORD_CHANGE_ALLOWED_VIEWS:
+                raise PasswordChangeRequired()
+        return result
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+            role = validated_token[ROLE_CLAIM]
+        except KeyError:
+            # Token cũ chưa có claim: xác thực theo cách cũ (truy vấn user)
+            return super().get_user(validated_token)
+
+        state = get_token_state(user_id)
+        # Không có TokenVersion = user đã bị xóa, coi như token đã bị thu hồi
+        if state is None or validated_token.get(TOKEN_VERSION_CLAIM) != state[0]:
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+        values = {
+            'id': uuid.UUID(str(user_id)),
+            'username': validated_token.get(USERNAME_CLAIM, ''),
+            'role': role,
+            'is_active': True,
+        }
+        # Token cấp trước khi có claim này: must_change_password được tải từ database khi cần
+        if MUST_CHANGE_PASSWORD_CLAIM in validated_token:
+            values['must_change_password'] = validated_token[MUST_CHANGE_PASSWORD_CLAIM]
+        try:
+            user = _user_from_claims(values)
+        except ValueError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        # Claim phạm vi chỉ dùng khi chưa có thay đổi lớp/lớp chủ nhiệm kể từ lúc cấp token
+        if validated_token.get(SCOPE_VERSION_CLAIM) == state[1]:
+            from applications.access_scope import AccessScope
+            user.token_scope = AccessScope(
+                user_id=user.pk,
+                role=role,
+                student_id=_uuid(validated_token.get(STUDENT_CLAIM)),
+                classroom_id=_uuid(validated_token.get(CLASSROOM_CLAIM)),
+                homeroom_classroom_ids=tuple(_uuid(value) for value in validated_token.get(HOMEROOM_CLAIM) or ()),
+            )
+        return user
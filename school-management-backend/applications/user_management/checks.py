@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+
+# TTL tối đa (giây) chấp nhận được khi cache phiên bản token/phạm vi truy cập nằm riêng trong từng process
+LOCAL_CACHE_MAX_TTL = 5
+
+CLAIMS_AUTHENTICATION = 'applications.user_management.authentication.ClaimsJWTAuthentication'
+
+
+def _local_cache_ttl_check(setting_name, default, consequence, check_number):
+    """Cache riêng từng process (LocMemCache) với TTL dài: worker khác dùng dữ liệu phân quyền cũ"""
+    if not settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        return []
+    ttl = getattr(settings, setting_name, default)
+    if ttl <= LOCAL_CACHE_MAX_TTL:
+        return []
+    message = f'{setting_name}={ttl} với LocMemCache: {consequence} ở các worker khác tối đa {ttl} giây.'
+    hint = f'Dùng cache dùng chung (CACHE_BACKEND=Redis/Memcached) hoặc đặt {setting_name} <= {LOCAL_CACHE_MAX_TTL}.'
+    # Production (DEBUG=False) bắt buộc sửa, môi trường dev chỉ cảnh báo
+    if settings.DEBUG:
+        return [Warning(message, hint=hint, id=f'user_management.W{check_number:03d}')]
+    return [Error(message, hint=hint, id=f'user_management.E{check_number:03d}')]
+
+
+@register()
+def token_version_cache_check(app_configs, **kwargs):
+    """Thu hồi token (TokenVersion) cần cache dùng chung giữa các worker hoặc TTL ngắn"""
+    authentication_classes = settings.REST_FRAMEWORK.get('DEFAULT_AUTHENTICATION_CLASSES', ())
+    if CLAIMS_AUTHENTICATION not in authentication_classes:
+        return []
+    return _local_cache_ttl_check('TOKEN_VERSION_CACHE_TTL', 300, 'token đã thu hồi vẫn dùng được', 1)
+
+
+@register()
+def access_scope_cache_check(app_configs, **kwargs):
+    """Phạm vi truy cập (lớp, lớp chủ nhiệm) cache theo user cần cache dùng chung hoặc TTL ngắn"""
+    return _local_cache_ttl_check(
+        'ACCESS_SCOPE_TTL', 60, 'sau khi đổi lớp/lớp chủ nhiệm, quyền truy cập lớp cũ vẫn còn', 2
+    )
@@ -0,0 +1,108 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """Gom các lần cập nhật last_login trong process và ghi xuống database theo lô.
+
+    Mỗi user chỉ giữ thời điểm đăng nhập mới nhất. Request chỉ ghi vào buffer;
+    một thread nền (khởi động ở lần đăng nhập đầu tiên của process) ghi buffer
+    bằng một câu UPDATE (bulk_update) mỗi LAST_LOGIN_FLUSH_INTERVAL giây, hoặc
+    sớm hơn khi đủ LAST_LOGIN_FLUSH_SIZE user, và khi process dừng. Vì vậy
+    last_login trong database chậm tối đa LAST_LOGIN_FLUSH_INTERVAL giây; nếu
+    process bị kill đột ngột thì mất phần chưa ghi (last_login chỉ mang tính thống kê).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, user_id, when):
+        with self._lock:
+            previous = self._pending.get(user_id)
+            if previous is None or when > previous:
+                self._pending[user_id] = when
+            self._ensure_flusher()
+            full = len(self._pending) >= settings.LAST_LOGIN_FLUSH_SIZE
+        if full:
+            # Đủ lô: đánh thức thread nền ghi ngay, request không phải chờ database
+            self._wakeup.set()
+
+    def _ensure_flusher(self):
+        """Khởi động thread ghi nền nếu chưa có (kể cả trong worker vừa fork)"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.LAST_LOGIN_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Lỗi khi ghi last_login')
+            finally:
+                # Thread nền không nằm trong vòng đời request: tự trả kết nối database
+                close_old_connections()
+
+    def flush(self):
+        """Ghi các last_login đang chờ, trả về số user đã cập nhật"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            # Chỉ cập nhật cột last_login (không đụng updated_at, không chạy signal của User)
+            User.objects.bulk_update(
+                [User(pk=user_id, last_login=when) for user_id, when in pending.items()],
+                ['last_login'],
+                batch_size=500,
+            )
+        except Exception:
+            logger.exception('Không ghi được last_login của %d user', len(pending))
+            # Trả lại buffer để lần sau ghi tiếp, giữ thời điểm mới hơn nếu đã có
+            with self._lock:
+                for user_id, when in pending.items():
+                    if user_id not in self._pending or when > self._pending[user_id]:
+                        self._pending[user_id] = when
+            return 0
+        return len(pending)
+
+
+last_login_buffer = LastLoginBuffer()
+atexit.register(last_login_buffer.flush)
+
+
+def record_login(user):
+    """Ghi nhận lần đăng nhập của user (thay cho update_last_login của simplejwt).
+
+    LAST_LOGIN_FLUSH_SIZE <= 1 thì ghi ngay như trước, ngược lại đưa vào buffer.
+    """
+    if not api_settings.UPDATE_LAST_LOGIN:
+        return
+    user.last_login = timezone.now()
+    if settings.LAST_LOGIN_FLUSH_SIZE <= 1:
+        User.objects.filter(pk=user.pk).update(last_login=user.last_login)
+        return
+    last_login_buffer.record(user.pk, user.last_login)
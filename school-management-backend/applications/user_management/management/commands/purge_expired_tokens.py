@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from applications.user_management.tokens import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Xóa refresh token đã hết hạn (outstanding và blacklisted) theo từng lô'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Số token xóa mỗi lô (mặc định 1000)')
+        parser.add_argument('--pause', type=float, default=0, help='Số giây nghỉ giữa các lô để giảm tải database')
+
+    def handle(self, *args, **options):
+        purged, blacklisted = purge_expired_tokens(options['batch_size'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Đã xóa {purged} token hết hạn và {blacklisted} bản ghi blacklist'
+        ))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-19 10:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def create_token_versions(apps, schema_editor):
+    """Tạo dòng version 0 cho mọi user hiện có (token đang dùng vẫn hợp lệ, không ai bị khóa)"""
+    User = apps.get_model('user_management', 'User')
+    TokenVersion = apps.get_model('user_management', 'TokenVersion')
+    user_ids = User.objects.values_list('id', flat=True).iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for user_id in user_ids:
+        batch.append(TokenVersion(user_id=user_id))
+        if len(batch) >= BATCH_SIZE:
+            TokenVersion.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    TokenVersion.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0002_user_must_change_password'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='token_version', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('scope_version', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Phiên bản token',
+                'verbose_name_plural': 'Phiên bản token',
+                'db_table': 'user_token_versions',
+            },
+        ),
+        migrations.RunPython(create_token_versions, migrations.RunPython.noop),
+    ]
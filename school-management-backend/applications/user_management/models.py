@@ -15,6 +15,7 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='student')
     phone = models.CharField(max_length=15, blank=True)
     is_active = models.BooleanField(default=True)
+    must_change_password = models.BooleanField(default=False)  # Bắt buộc đổi mật khẩu tạm ở lần đăng nhập đầu
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -22,10 +23,39 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'Người dùng'
         verbose_name_plural = 'Người dùng'
+        indexes = [
+            # Thứ tự và cursor của user_list, có/không lọc theo role
+            models.Index(fields=['last_name', 'first_name', 'id'], name='user_name_idx'),
+            models.Index(fields=['role', 'last_name', 'first_name', 'id'], name='user_role_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} - {self.get_full_name()}"
 
     @property
     def full_name(self):
-        return f"{self.first_name} {self.last_name}".strip() 
\ No newline at end of file
+        return f"{self.first_name} {self.last_name}".strip()
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # User dựng từ claim JWT: lần đầu cần trường chưa có thì tải mọi trường còn thiếu trong một truy vấn
+        if fields is not None and getattr(self, '_from_token_claims', False):
+            fields = set(fields) | self.get_deferred_fields()
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+
+class TokenVersion(models.Model):
+    """Phiên bản token của user, so với claim trong JWT (có cache).
+
+    version tăng khi đổi mật khẩu/vai trò/khóa tài khoản -> mọi token cũ bị thu hồi.
+    scope_version tăng khi lớp/lớp chủ nhiệm thay đổi -> claim phạm vi trong token
+    cũ không còn được dùng (phạm vi được tính lại từ database).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='token_version')
+    version = models.PositiveIntegerField(default=0)
+    scope_version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_token_versions'
+        verbose_name = 'Phiên bản token'
+        verbose_name_plural = 'Phiên bản token'
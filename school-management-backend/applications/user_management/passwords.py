@@ -0,0 +1,98 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+
+
+# Số mật khẩu mỗi worker xử lý trong một lần gửi
+CHUNK_SIZE = 64
+
+# Pool dùng lại giữa các lần gọi (theo số worker), tạo khi cần
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def available_cores():
+    """Số CPU process hiện tại được phép dùng"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(settings_module):
+    """Khởi tạo Django trong worker (spawn không kế thừa settings đã nạp)"""
+    if settings_module:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def hash_chunk(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def _get_pool(workers):
+    """Pool băm mật khẩu dùng chung của process, khởi tạo ở lần dùng đầu tiên.
+
+    Worker được tạo bằng spawn, không fork: fork một web process nhiều thread có thể
+    khiến process con kẹt ở lock mà thread khác đang giữ (logging, driver DB, cache).
+    """
+    with _pools_lock:
+        pool, pid = _pools.get(workers, (None, None))
+        # Pool tạo trước khi process bị fork (VD: gunicorn --preload) không dùng được ở process con
+        if pool is None or pid != os.getpid():
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'),)
+            )
+            _pools[workers] = (pool, os.getpid())
+        return pool
+
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        for pool, pid in _pools.values():
+            if pid == os.getpid():
+                pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def hash_passwords(passwords, workers=None, chunk_size=CHUNK_SIZE):
+    """Băm danh sách mật khẩu song song bằng ProcessPoolExecutor dùng chung.
+
+    Trả về danh sách hash theo đúng thứ tự đầu vào. Danh sách nhỏ (ít hơn 2 chunk)
+    hoặc máy chỉ có 1 core được băm tuần tự, không cần đến pool.
+    """
+    passwords = list(passwords)
+    workers = workers or available_cores()
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    if workers <= 1 or len(chunks) < 2:
+        return hash_chunk(passwords)
+
+    executor = _get_pool(workers)
+    return [hashed for chunk in executor.map(hash_chunk, chunks) for hashed in chunk]
+
+
+class HashedPassword(str):
+    """Mật khẩu tạm đã băm sẵn (VD: lưu trong ImportJob.options), dùng thẳng không băm lại"""
+
+
+def hash_account_passwords(passwords, initial_password=None, workers=None):
+    """Băm mật khẩu cho tạo tài khoản hàng loạt.
+
+    Nếu có initial_password (mật khẩu tạm dùng chung), chỉ băm một lần và dùng lại
+    cho mọi tài khoản; tài khoản phải đổi mật khẩu ở lần đăng nhập đầu tiên.
+    """
+    passwords = list(passwords)
+    if initial_password:
+        if not isinstance(initial_password, HashedPassword):
+            initial_password = make_password(initial_password)
+        return [initial_password] * len(passwords)
+    return hash_passwords(passwords, workers=workers)
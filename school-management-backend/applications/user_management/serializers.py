@@ -66,8 +66,8 @@ class ChangePasswordRequestSerializer(serializers.Serializer):
 class UserResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 'phone', 'is_active', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 'phone', 'is_active', 'must_change_password', 'created_at']
+        read_only_fields = ['id', 'must_change_password', 'created_at']
 
 
 class LoginResponseSerializer(serializers.Serializer):
@@ -83,4 +83,7 @@ class RegisterResponseSerializer(serializers.Serializer):
 
 
 class ChangePasswordResponseSerializer(serializers.Serializer):
-    message = serializers.CharField() 
\ No newline at end of file
+    message = serializers.CharField()
+    # Token cũ bị thu hồi khi đổi mật khẩu: trả cặp token mới
+    access_token = serializers.CharField(required=False)
+    refresh_token = serializers.CharField(required=False)
\ No newline at end of file
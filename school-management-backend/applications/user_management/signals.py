@@ -0,0 +1,64 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import User
+from .tokens import revoke_tokens, invalidate_scope_claims, create_token_versions, forget_token_state
+
+
+# Đổi các trường này -> thu hồi token đã cấp (claim vai trò/bắt buộc đổi mật khẩu không còn đúng)
+REVOKING_FIELDS = ('password', 'role', 'is_active', 'must_change_password')
+
+
+@receiver(pre_save, sender=User)
+def remember_credentials(sender, instance, raw=False, **kwargs):
+    instance._revoke_tokens = False
+    if raw or instance._state.adding:
+        return
+    previous = User.objects.filter(pk=instance.pk).values(*REVOKING_FIELDS).first()
+    if previous and any(previous[field] != getattr(instance, field) for field in REVOKING_FIELDS):
+        instance._revoke_tokens = True
+
+
+@receiver(post_save, sender=User)
+def revoke_changed_credentials(sender, instance, created, raw=False, **kwargs):
+    """Đổi mật khẩu, vai trò, khóa tài khoản hoặc yêu cầu đổi mật khẩu -> token cũ không dùng được nữa"""
+    if created and not raw:
+        # Token chỉ hợp lệ khi có dòng TokenVersion (xem get_token_state)
+        create_token_versions(instance.pk)
+    elif getattr(instance, '_revoke_tokens', False):
+        revoke_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    """Xóa user -> TokenVersion bị xóa theo (CASCADE), bỏ bản cache để token cũ bị từ chối ngay"""
+    forget_token_state(instance.pk)
+
+
+@receiver(post_save, sender='student.Student')
+@receiver(post_delete, sender='student.Student')
+def student_scope_changed(sender, instance, **kwargs):
+    """Học sinh đổi lớp -> claim lớp trong token cũ không còn đúng"""
+    invalidate_scope_claims(instance.user_id)
+
+
+@receiver(pre_save, sender='classroom.Classroom')
+def remember_homeroom_teacher(sender, instance, raw=False, **kwargs):
+    instance._previous_homeroom_teacher_id = None
+    if not raw and not instance._state.adding:
+        instance._previous_homeroom_teacher_id = type(instance).objects.filter(
+            pk=instance.pk
+        ).values_list('homeroom_teacher_id', flat=True).first()
+
+
+@receiver(post_save, sender='classroom.Classroom')
+def homeroom_scope_changed(sender, instance, created, raw=False, **kwargs):
+    """Đổi giáo viên chủ nhiệm -> claim lớp chủ nhiệm của giáo viên cũ/mới không còn đúng"""
+    previous = getattr(instance, '_previous_homeroom_teacher_id', None)
+    if created or previous != instance.homeroom_teacher_id:
+        invalidate_scope_claims(previous, instance.homeroom_teacher_id)
+
+
+@receiver(post_delete, sender='classroom.Classroom')
+def homeroom_scope_deleted(sender, instance, **kwargs):
+    invalidate_scope_claims(instance.homeroom_teacher_id)
@@ -0,0 +1,136 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import TokenVersion
+
+
+# Tên claim trong JWT
+ROLE_CLAIM = 'role'
+USERNAME_CLAIM = 'username'
+TOKEN_VERSION_CLAIM = 'tv'
+SCOPE_VERSION_CLAIM = 'sv'
+STUDENT_CLAIM = 'sid'
+CLASSROOM_CLAIM = 'cid'
+HOMEROOM_CLAIM = 'hcs'
+MUST_CHANGE_PASSWORD_CLAIM = 'mcp'
+
+
+def _state_key(user_id):
+    return f'token_version:{user_id}'
+
+
+def get_token_state(user_id):
+    """(version, scope_version) hiện tại của user, cache để xác thực không cần truy vấn.
+
+    Trả về None khi không có dòng TokenVersion (user đã bị xóa): token phải bị từ chối.
+    """
+    key = _state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = TokenVersion.objects.filter(user_id=user_id).values_list('version', 'scope_version').first()
+        # () = không có dòng, cũng được cache để token của user đã xóa không truy vấn lại mỗi request
+        state = tuple(row) if row else ()
+        cache.set(key, state, getattr(settings, 'TOKEN_VERSION_CACHE_TTL', 300))
+    return state or None
+
+
+def create_token_versions(*user_ids):
+    """Tạo dòng TokenVersion (nếu chưa có) cho user mới"""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    TokenVersion.objects.bulk_create([TokenVersion(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+    forget_token_state(*user_ids)
+
+
+def forget_token_state(*user_ids):
+    """Xóa phiên bản token trong cache (user mới tạo/bị xóa)"""
+    keys = [_state_key(user_id) for user_id in user_ids if user_id]
+    cache.delete_many(keys)
+    # Xóa lại sau commit để không giữ giá trị cũ được đọc trong lúc transaction chưa xong
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _bump(user_ids, field):
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    # Không tạo dòng mới: user không có TokenVersion (đã/đang bị xóa) thì token đã bị từ chối
+    TokenVersion.objects.filter(user_id__in=user_ids).update(**{field: F(field) + 1})
+    forget_token_state(*user_ids)
+
+
+def revoke_tokens(*user_ids):
+    """Thu hồi mọi access/refresh token đã cấp cho các user"""
+    _bump(user_ids, 'version')
+
+
+def invalidate_scope_claims(*user_ids):
+    """Claim phạm vi (lớp, lớp chủ nhiệm) trong token đã cấp không còn đúng"""
+    _bump(user_ids, 'scope_version')
+
+
+class SchoolRefreshToken(RefreshToken):
+    """Refresh token kèm claim vai trò, phạm vi truy cập và phiên bản token.
+
+    Access token sinh từ refresh token được copy các claim này, nên các API đọc
+    có thể phân quyền mà không truy vấn bảng users/students/classrooms.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        from applications.access_scope import _compute_scope
+
+        token = super().for_user(user)
+        state = get_token_state(user.pk)
+        if state is None:
+            # User tạo trước khi có TokenVersion hoặc nạp bằng fixture (raw)
+            create_token_versions(user.pk)
+            state = get_token_state(user.pk)
+        version, scope_version = state
+        scope = _compute_scope(user)
+        token[ROLE_CLAIM] = user.role
+        token[USERNAME_CLAIM] = user.username
+        token[MUST_CHANGE_PASSWORD_CLAIM] = user.must_change_password
+        token[TOKEN_VERSION_CLAIM] = version
+        token[SCOPE_VERSION_CLAIM] = scope_version
+        token[STUDENT_CLAIM] = str(scope.student_id) if scope.student_id else None
+        token[CLASSROOM_CLAIM] = str(scope.classroom_id) if scope.classroom_id else None
+        token[HOMEROOM_CLAIM] = [str(classroom_id) for classroom_id in scope.homeroom_classroom_ids]
+        return token
+
+
+def purge_expired_tokens(batch_size=1000, pause=0, now=None):
+    """Xóa refresh token đã hết hạn (outstanding + blacklisted) theo từng lô.
+
+    Mỗi lô lấy batch_size id nhỏ nhất đã hết hạn (token cũ nằm đầu khóa chính
+    nên không cần index trên expires_at) rồi xóa trong một transaction ngắn,
+    tránh khóa bảng lâu như flushexpiredtokens của simplejwt.
+    Trả về (số outstanding, số blacklisted) đã xóa.
+    """
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    now = now or timezone.now()
+    purged = blacklisted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            _, deleted = OutstandingToken.objects.filter(id__in=ids).delete()
+        purged += deleted.get(OutstandingToken._meta.label, 0)
+        blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return purged, blacklisted
@@ -3,14 +3,19 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 
 from .models import User
+from .last_login import record_login
+from .tokens import SchoolRefreshToken, get_token_state, TOKEN_VERSION_CLAIM
 from .serializers import (
     LoginRequestSerializer, RegisterRequestSerializer, ChangePasswordRequestSerializer,
     UserResponseSerializer, LoginResponseSerializer, RegisterResponseSerializer, 
     ChangePasswordResponseSerializer
 )
+from applications.pagination import InvalidCursor, paginate_keyset
 from applications.permissions import IsAdminUser
 
 User = get_user_model()
@@ -24,7 +29,8 @@ def login(request):
     serializer = LoginRequestSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
+        record_login(user)
+        refresh = SchoolRefreshToken.for_user(user)
         
         response_data = {
             'access_token': str(refresh.access_token),
@@ -57,7 +63,7 @@ def register(request):
         )
         
         # Tạo token
-        refresh = RefreshToken.for_user(user)
+        refresh = SchoolRefreshToken.for_user(user)
         
         response_data = {
             'access_token': str(refresh.access_token),
@@ -79,12 +85,23 @@ def refresh_token(request):
     try:
         refresh_token = request.data.get('refresh_token')
         refresh = RefreshToken(refresh_token)
-        return Response({
-            'access_token': str(refresh.access_token),
-            'refresh_token': str(refresh)
-        })
+        user = User.objects.get(pk=refresh[api_settings.USER_ID_CLAIM], is_active=True)
     except Exception:
         return Response({'error': 'Invalid refresh token'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Token đã bị thu hồi (đổi mật khẩu, vai trò, khóa tài khoản)
+    state = get_token_state(user.pk)
+    if state is None or refresh.get(TOKEN_VERSION_CLAIM, 0) != state[0]:
+        return Response({'error': 'Invalid refresh token'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Xoay vòng: refresh token cũ bị đưa vào blacklist, cấp cặp token mới với claim vai trò/phạm vi cập nhật
+    if api_settings.BLACKLIST_AFTER_ROTATION:
+        refresh.blacklist()
+    refresh = SchoolRefreshToken.for_user(user)
+    return Response({
+        'access_token': str(refresh.access_token),
+        'refresh_token': str(refresh)
+    })
 
 
 @api_view(['POST'])
@@ -109,9 +126,16 @@ def change_password(request):
         user = request.user
         if user.check_password(serializer.validated_data['old_password']):
             user.set_password(serializer.validated_data['new_password'])
+            user.must_change_password = False
             user.save()
             
-            response_data = {'message': 'Đổi mật khẩu thành công'}
+            # Token cũ đã bị thu hồi (TokenVersion): cấp cặp token mới cho phiên hiện tại
+            refresh = SchoolRefreshToken.for_user(user)
+            response_data = {
+                'message': 'Đổi mật khẩu thành công',
+                'access_token': str(refresh.access_token),
+                'refresh_token': str(refresh)
+            }
             response_serializer = ChangePasswordResponseSerializer(data=response_data)
             response_serializer.is_valid()
             return Response(response_serializer.data)
@@ -122,19 +146,51 @@ def change_password(request):
 
 
 # User Views
+# Thứ tự của user_list (có index user_name_idx / user_role_name_idx), trường cuối là khóa duy nhất
+USER_LIST_ORDERING = ('last_name', 'first_name', 'id')
+
+# Các cột trả về trong user_list (đọc bằng values(), không dựng model/serializer)
+USER_LIST_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'is_active')
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def user_list(request):
-    """Danh sách users (Admin only)"""
+    """Danh sách users (Admin only), phân trang theo cursor: trang sau lấy bằng cursor=<next_cursor>"""
     users = User.objects.all()
     
     # Filter theo role
     role = request.query_params.get('role', None)
     if role:
+        if role not in dict(User.ROLE_CHOICES):
+            return Response(
+                {'error': f'role phải là một trong: {", ".join(dict(User.ROLE_CHOICES))}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         users = users.filter(role=role)
     
-    serializer = UserResponseSerializer(users, many=True)
-    return Response(serializer.data)
+    # Filter theo trạng thái
+    is_active = request.query_params.get('is_active', None)
+    if is_active is not None:
+        users = users.filter(is_active=is_active.lower() in ('true', '1'))
+    
+    # Tìm theo username, email, họ tên: mọi từ khóa phải khớp một trong các cột
+    search = request.query_params.get('search', '')
+    for term in search.split():
+        users = users.filter(
+            Q(username__icontains=term) | Q(email__icontains=term)
+            | Q(first_name__icontains=term) | Q(last_name__icontains=term)
+        )
+    
+    users = users.values(*USER_LIST_FIELDS)
+    
+    # Luôn phân trang theo cursor (page_size mặc định 20, tối đa 100)
+    try:
+        items, page = paginate_keyset(users, request, USER_LIST_ORDERING)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({'results': items, **page})
 
 
 @api_view(['GET'])
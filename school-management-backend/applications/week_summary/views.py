@@ -11,26 +11,17 @@ from .models import WeekSummary
 from .serializers import WeekSummarySerializer
 from applications.classroom.models import Classroom
 from applications.event.models import Event
+from applications.access_scope import get_scope
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def week_summary_list(request):
     """API lấy danh sách tổng kết tuần"""
-    # Filter theo role của user
-    user = request.user
     queryset = WeekSummary.objects.select_related('classroom', 'approved_by')
     
-    if user.role == 'student':
-        # Học sinh chỉ thấy lớp của mình
-        if hasattr(user, 'student'):
-            queryset = queryset.filter(classroom=user.student.classroom)
-        else:
-            queryset = queryset.none()
-    elif user.role == 'teacher':
-        # Giáo viên thấy lớp mình chủ nhiệm
-        queryset = queryset.filter(classroom__homeroom_teacher=user)
-    # Admin thấy tất cả
+    # Học sinh: lớp của mình, giáo viên: lớp chủ nhiệm, admin: tất cả (lọc classroom_id IN, không join)
+    queryset = get_scope(request).filter(queryset)
     
     # Apply filters
     classroom_id = request.query_params.get('classroom_id')
@@ -91,20 +82,10 @@ def week_summary_approve(request, id):
 @permission_classes([IsAuthenticated])
 def dashboard_rankings(request):
     """API lấy bảng xếp hạng cho dashboard"""
-    # Filter theo role của user
-    user = request.user
     queryset = WeekSummary.objects.select_related('classroom', 'approved_by')
     
-    if user.role == 'student':
-        # Học sinh chỉ thấy lớp của mình
-        if hasattr(user, 'student'):
-            queryset = queryset.filter(classroom=user.student.classroom)
-        else:
-            queryset = queryset.none()
-    elif user.role == 'teacher':
-        # Giáo viên thấy lớp mình chủ nhiệm
-        queryset = queryset.filter(classroom__homeroom_teacher=user)
-    # Admin thấy tất cả
+    # Học sinh: lớp của mình, giáo viên: lớp chủ nhiệm, admin: tất cả (lọc classroom_id IN, không join)
+    queryset = get_scope(request).filter(queryset)
     
     # Get current week and year
     week_number = request.query_params.get('week_number')
@@ -130,17 +111,10 @@ def dashboard_rankings(request):
 @permission_classes([IsAuthenticated])
 def class_rankings(request):
     """API lấy bảng xếp hạng lớp học"""
-    user = request.user
     queryset = WeekSummary.objects.select_related('classroom', 'approved_by')
     
-    # Filter theo role
-    if user.role == 'student':
-        if hasattr(user, 'student'):
-            queryset = queryset.filter(classroom=user.student.classroom)
-        else:
-            queryset = queryset.none()
-    elif user.role == 'teacher':
-        queryset = queryset.filter(classroom__homeroom_teacher=user)
+    # Filter theo role (classroom_id IN theo phạm vi truy cập, không join)
+    queryset = get_scope(request).filter(queryset)
     
     # Apply filters
     week_number = request.query_params.get('week_number')
@@ -169,7 +143,6 @@ def class_rankings(request):
 @permission_classes([IsAuthenticated])
 def monthly_rankings(request):
     """API lấy bảng xếp hạng theo tháng"""
-    user = request.user
     month = request.query_params.get('month')
     year = request.query_params.get('year')
     
@@ -193,14 +166,8 @@ def monthly_rankings(request):
         year=int(year)
     )
     
-    # Filter theo role
-    if user.role == 'student':
-        if hasattr(user, 'student'):
-            queryset = queryset.filter(classroom=user.student.classroom)
-        else:
-            queryset = queryset.none()
-    elif user.role == 'teacher':
-        queryset = queryset.filter(classroom__homeroom_teacher=user)
+    # Filter theo role (classroom_id IN theo phạm vi truy cập, không join)
+    queryset = get_scope(request).filter(queryset)
     
     # Aggregate by classroom
     from django.db.models import Sum
@@ -244,7 +211,6 @@ def monthly_rankings(request):
 @permission_classes([IsAuthenticated])
 def yearly_rankings(request):
     """API lấy bảng xếp hạng theo năm"""
-    user = request.user
     year = request.query_params.get('year')
     
     if not year:
@@ -257,14 +223,8 @@ def yearly_rankings(request):
         year=int(year)
     )
     
-    # Filter theo role
-    if user.role == 'student':
-        if hasattr(user, 'student'):
-            queryset = queryset.filter(classroom=user.student.classroom)
-        else:
-            queryset = queryset.none()
-    elif user.role == 'teacher':
-        queryset = queryset.filter(classroom__homeroom_teacher=user)
+    # Filter theo role (classroom_id IN theo phạm vi truy cập, không join)
+    queryset = get_scope(request).filter(queryset)
     
     # Aggregate by classroom
     from django.db.models import Sum, Avg
@@ -313,7 +273,6 @@ def yearly_rankings(request):
 @permission_classes([IsAuthenticated])
 def realtime_rankings(request):
     """Compute rankings in real-time from events for a given week/year or date range."""
-    user = request.user
     week_number = request.query_params.get('week_number')
     year = request.query_params.get('year')
     start_date_str = request.query_params.get('start_date')
@@ -345,14 +304,8 @@ def realtime_rankings(request):
         date__lte=end_dt.date(),
     )
 
-    # Role-based filtering (align with other endpoints)
-    if user.role == 'student':
-        if hasattr(user, 'student'):
-            events = events.filter(classroom=user.student.classroom)
-        else:
-            events = events.none()
-    elif user.role == 'teacher':
-        events = events.filter(classroom__homeroom_teacher=user)
+    # Role-based filtering (align with other endpoints; classroom_id IN, no join)
+    events = get_scope(request).filter(events)
 
     # Aggregate by classroom using conditional sums
     aggregated = events.values('classroom').annotate(
@@ -414,7 +367,6 @@ def realtime_rankings(request):
 @permission_classes([IsAuthenticated])
 def top_performers(request):
     """API lấy top performers"""
-    user = request.user
     week_number = request.query_params.get('week_number')
     year = request.query_params.get('year')
     
@@ -430,14 +382,8 @@ def top_performers(request):
         year=year
     ).order_by('-total_points')
     
-    # Filter by role
-    if user.role == 'student':
-        if hasattr(user, 'student'):
-            current_rankings = current_rankings.filter(classroom=user.student.classroom)
-        else:
-            current_rankings = current_rankings.none()
-    elif user.role == 'teacher':
-        current_rankings = current_rankings.filter(classroom__homeroom_teacher=user)
+    # Filter by role (classroom_id IN theo phạm vi truy cập, không join)
+    current_rankings = get_scope(request).filter(current_rankings)
     
     # Get previous week for comparison
     prev_week = int(week_number) - 1
@@ -451,14 +397,8 @@ def top_performers(request):
         year=prev_year
     )
     
-    # Filter previous rankings by role
-    if user.role == 'student':
-        if hasattr(user, 'student'):
-            previous_rankings = previous_rankings.filter(classroom=user.student.classroom)
-        else:
-            previous_rankings = previous_rankings.none()
-    elif user.role == 'teacher':
-        previous_rankings = previous_rankings.filter(classroom__homeroom_teacher=user)
+    # Filter previous rankings by role (classroom_id IN theo phạm vi truy cập, không join)
+    previous_rankings = get_scope(request).filter(previous_rankings)
     
     # Calculate top performers
     best_class = current_rankings.first()
@@ -484,14 +424,8 @@ def top_performers(request):
         year=year
     )
     
-    # Filter by role
-    if user.role == 'student':
-        if hasattr(user, 'student'):
-            yearly_rankings = yearly_rankings.filter(classroom=user.student.classroom)
-        else:
-            yearly_rankings = yearly_rankings.none()
-    elif user.role == 'teacher':
-        yearly_rankings = yearly_rankings.filter(classroom__homeroom_teacher=user)
+    # Filter by role (classroom_id IN theo phạm vi truy cập, không join)
+    yearly_rankings = get_scope(request).filter(yearly_rankings)
     
     # Aggregate by classroom for consistent performers
     consistent_data = yearly_rankings.values('classroom').annotate(
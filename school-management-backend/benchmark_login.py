@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Script đo thông lượng đăng nhập: ghi last_login ngay từng lần và gom theo lô
+
+Tạo tạm các tài khoản bench_login_*, gọi /api/v1/auth/login lần lượt rồi xóa.
+Dùng --fast-hasher để bỏ qua chi phí băm mật khẩu, chỉ đo phần database.
+
+Truy vấn của thread nền ghi last_login (kết nối database riêng) cũng được đếm.
+Cột INSERT token là số dòng OutstandingToken (token_blacklist) ghi thêm mỗi lần
+đăng nhập; mỗi lần refresh còn ghi thêm một OutstandingToken và một BlacklistedToken.
+
+Ví dụ:
+    python3 benchmark_login.py --users 50 --logins 500
+    python3 benchmark_login.py --users 50 --logins 2000 --fast-hasher
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import django
+
+# Setup Django
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'school_management.settings')
+django.setup()
+
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from applications.user_management.last_login import last_login_buffer
+from applications.user_management.models import User
+
+PREFIX = 'bench_login_'
+PASSWORD = 'Bench@123456'
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def create_users(count):
+    users = [
+        User(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@bench.local', role='teacher',
+             first_name='Bench', last_name=str(i))
+        for i in range(count)
+    ]
+    for user in users:
+        user.set_password(PASSWORD)
+    User.objects.bulk_create(users, batch_size=500)
+    return [user.username for user in users]
+
+
+def cleanup():
+    OutstandingToken.objects.filter(user__username__startswith=PREFIX).delete()
+    User.objects.filter(username__startswith=PREFIX).delete()
+
+
+class FlushQueryCounter:
+    """Ghi lại truy vấn của các lần flush last_login chạy trên thread nền.
+
+    CaptureQueriesContext chỉ thấy kết nối của thread hiện tại (và không dùng lồng
+    nhau giữa các thread được), còn thread nền ghi last_login bằng kết nối riêng.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        original = self.buffer.flush
+
+        def flush():
+            if threading.current_thread() is threading.main_thread():
+                return original()
+            with connection.execute_wrapper(self._record):
+                return original()
+
+        self.buffer.flush = flush
+        return self
+
+    def __exit__(self, *exc):
+        del self.buffer.flush
+
+    def _record(self, execute, sql, params, many, context):
+        with self._lock:
+            self.queries.append({'sql': sql})
+        return execute(sql, params, many, context)
+
+
+def run_logins(usernames, logins):
+    """Đăng nhập xoay vòng qua các tài khoản, trả về (số giây, số truy vấn, số UPDATE users, số INSERT token)"""
+    client = APIClient(SERVER_NAME='localhost')
+    reset_queries()
+    with FlushQueryCounter(last_login_buffer) as background, CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        for i in range(logins):
+            response = client.post(
+                '/api/v1/auth/login',
+                {'username': usernames[i % len(usernames)], 'password': PASSWORD},
+                format='json',
+            )
+            assert response.status_code == 200, response.content
+        # Ghi phần còn lại trong buffer ngay trên thread này thay vì chờ thread nền
+        last_login_buffer.flush()
+        elapsed = time.perf_counter() - start
+    queries = ctx.captured_queries + background.queries
+    users_table = connection.ops.quote_name(User._meta.db_table)
+    tokens_table = connection.ops.quote_name(OutstandingToken._meta.db_table)
+    updates = sum(1 for query in queries if query['sql'].startswith(f'UPDATE {users_table}'))
+    inserts = sum(1 for query in queries if query['sql'].startswith(f'INSERT INTO {tokens_table}'))
+    return elapsed, len(queries), updates, inserts
+
+
+def report(label, logins, result):
+    elapsed, queries, updates, inserts = result
+    print(f"  {label:<24} {logins / elapsed:>9.1f} lượt/s  {queries / logins:>6.2f} truy vấn/lượt"
+          f"  {updates:>6} UPDATE users  {inserts:>6} INSERT token")
+
+
+def run_benchmark(user_count, logins):
+    cleanup()
+    usernames = create_users(user_count)
+    try:
+        print(f"👤 {user_count} tài khoản, {logins} lượt đăng nhập")
+        print()
+        # Làm nóng (kết nối, cache phiên bản token)
+        run_logins(usernames, min(logins, user_count))
+
+        with override_settings(LAST_LOGIN_FLUSH_SIZE=1):
+            report('Ghi ngay (trước)', logins, run_logins(usernames, logins))
+        with override_settings(LAST_LOGIN_FLUSH_SIZE=user_count, LAST_LOGIN_FLUSH_INTERVAL=3600):
+            report('Gom theo lô (sau)', logins, run_logins(usernames, logins))
+    finally:
+        cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark đăng nhập và ghi last_login')
+    parser.add_argument('--users', type=int, default=50, help='Số tài khoản tạm (mặc định 50)')
+    parser.add_argument('--logins', type=int, default=500, help='Số lượt đăng nhập mỗi chế độ (mặc định 500)')
+    parser.add_argument('--fast-hasher', action='store_true', help='Dùng hasher MD5 để chỉ đo phần database')
+    args = parser.parse_args()
+    if args.fast_hasher:
+        with override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+            run_benchmark(args.users, args.logins)
+    else:
+        run_benchmark(args.users, args.logins)
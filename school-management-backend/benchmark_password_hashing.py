@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Script đo thông lượng băm mật khẩu khi tạo tài khoản hàng loạt
+
+Ví dụ:
+    python3 benchmark_password_hashing.py --count 5000
+    python3 benchmark_password_hashing.py --count 5000 --serial-sample 200 --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+import django
+
+# Setup Django
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'school_management.settings')
+django.setup()
+
+from django.conf import settings
+from applications.user_management.passwords import (
+    CHUNK_SIZE, available_cores, hash_passwords, hash_account_passwords, hash_chunk
+)
+
+
+def report(label, count, seconds):
+    print(f"  {label:<28} {count:>6} tài khoản  {seconds:>8.2f}s  {count / seconds:>9.1f} tài khoản/s")
+
+
+def run_benchmark(count, serial_sample, workers):
+    """Đo tuần tự, song song và mật khẩu tạm dùng chung"""
+    passwords = [f'password{i}' for i in range(count)]
+    workers = workers or available_cores()
+    print(f"🔐 Hasher: {settings.PASSWORD_HASHERS[0]}")
+    print(f"🖥️  Số core: {available_cores()}, workers: {workers}")
+    print()
+
+    # Tuần tự: đo trên mẫu rồi ngoại suy cho toàn bộ để không phải chờ quá lâu
+    sample = passwords[:min(serial_sample, count)]
+    start = time.perf_counter()
+    hash_chunk(sample)
+    elapsed = time.perf_counter() - start
+    report('Tuần tự (mẫu)', len(sample), elapsed)
+    estimated = elapsed / len(sample) * count
+    print(f"  {'Tuần tự (ước tính)':<28} {count:>6} tài khoản  {estimated:>8.2f}s")
+
+    # Khởi động pool dùng chung (spawn + django.setup) trước khi đo, như process đã chạy sẵn
+    hash_passwords(passwords[:CHUNK_SIZE * workers], workers=workers)
+    start = time.perf_counter()
+    hashed = hash_passwords(passwords, workers=workers)
+    elapsed = time.perf_counter() - start
+    assert len(hashed) == count
+    report('Song song (ProcessPool)', count, elapsed)
+    print(f"  {'Tăng tốc':<28} x{estimated / elapsed:.1f}")
+
+    start = time.perf_counter()
+    hash_account_passwords(passwords, initial_password='Temp@123456')
+    elapsed = time.perf_counter() - start
+    report('Mật khẩu tạm dùng chung', count, elapsed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark băm mật khẩu hàng loạt')
+    parser.add_argument('--count', type=int, default=5000, help='Số tài khoản (mặc định 5000)')
+    parser.add_argument('--serial-sample', type=int, default=100, help='Số mật khẩu đo tuần tự để ngoại suy')
+    parser.add_argument('--workers', type=int, default=None, help='Số process (mặc định bằng số core)')
+    args = parser.parse_args()
+    run_benchmark(args.count, args.serial_sample, args.workers)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
@@ -41,6 +42,9 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
+    # Thu hồi refresh token (logout, xoay vòng). Mỗi lần đăng nhập ghi thêm một dòng OutstandingToken,
+    # mỗi lần refresh ghi một OutstandingToken và một BlacklistedToken; dọn bằng purge_expired_tokens
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'applications.user_management',
     'applications.event',
@@ -51,15 +55,20 @@ INSTALLED_APPS = [
     'applications.week_summary',
     'applications.notification',
     'applications.point_rule',
+    'applications.import_job',
+    'applications.search',
 ]
 
 MIDDLEWARE = [
+    'applications.metrics.MetricsMiddleware',
+    'applications.query_budget.QueryBudgetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'applications.access_scope.AccessScopeMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -103,6 +112,18 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Dùng cache dùng chung (Redis/Memcached) khi chạy nhiều worker để version key đồng bộ
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='school-management'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -139,6 +160,95 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (file import Excel của các job import)
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+
+# Import jobs: 'thread' = xử lý bằng thread pool trong process web,
+# 'command' = chạy riêng bằng `python manage.py run_import_jobs`
+IMPORT_JOB_RUNNER = config('IMPORT_JOB_RUNNER', default='thread')
+IMPORT_JOB_WORKERS = config('IMPORT_JOB_WORKERS', default=2, cast=int)
+# Job running không ghi tiến độ quá số giây này bị coi là đã dừng (process chết) và được
+# run_import_jobs đánh dấu thất bại. Với IMPORT_JOB_RUNNER='thread' có thể chạy lệnh này
+# định kỳ (không --loop) để dọn job của process web đã restart.
+IMPORT_JOB_STALE_AFTER = config('IMPORT_JOB_STALE_AFTER', default=900, cast=int)
+
+# Thời gian cache phạm vi truy cập (vai trò, lớp, lớp chủ nhiệm) của mỗi user (giây).
+# Đổi lớp/lớp chủ nhiệm chỉ làm mới cache của worker đang xử lý request; với LocMemCache các
+# worker khác vẫn cấp quyền theo lớp cũ tới khi hết TTL, nên mặc định chỉ vài giây
+# (xem check user_management.E002/W002).
+ACCESS_SCOPE_TTL = config(
+    'ACCESS_SCOPE_TTL',
+    default=5 if CACHES['default']['BACKEND'].endswith('LocMemCache') else 60,
+    cast=int,
+)
+
+# Thời gian cache phiên bản token (thu hồi token) của mỗi user (giây).
+# Thu hồi token chỉ xóa cache của worker đang xử lý request; với LocMemCache (cache riêng
+# từng process) các worker khác vẫn nhận token cũ tới khi hết TTL, nên mặc định chỉ vài giây.
+# Chạy nhiều worker với TTL dài phải dùng cache dùng chung (Redis/Memcached), xem check
+# user_management.E001/W001 (applications/user_management/checks.py).
+TOKEN_VERSION_CACHE_TTL = config(
+    'TOKEN_VERSION_CACHE_TTL',
+    default=5 if CACHES['default']['BACKEND'].endswith('LocMemCache') else 300,
+    cast=int,
+)
+
+# Gom cập nhật last_login khi đăng nhập: thread nền ghi theo lô mỗi LAST_LOGIN_FLUSH_INTERVAL giây
+# (độ trễ tối đa của last_login) hoặc sớm hơn khi đủ LAST_LOGIN_FLUSH_SIZE user (<= 1 = ghi ngay trong request)
+LAST_LOGIN_FLUSH_SIZE = config('LAST_LOGIN_FLUSH_SIZE', default=100, cast=int)
+LAST_LOGIN_FLUSH_INTERVAL = config('LAST_LOGIN_FLUSH_INTERVAL', default=30, cast=int)
+
+# Ngân sách truy vấn mỗi request (QueryBudgetMiddleware): vượt số truy vấn hoặc thời gian database thì ghi log
+QUERY_BUDGET_ENABLED = config('QUERY_BUDGET_ENABLED', default=False, cast=bool)
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=30, cast=int)
+QUERY_BUDGET_TIME_MS = config('QUERY_BUDGET_TIME_MS', default=500, cast=int)
+QUERY_BUDGET_LOG_FILE = config('QUERY_BUDGET_LOG_FILE', default=str(BASE_DIR / 'logs' / 'query_budget.log'))
+
+# Ngân sách riêng theo endpoint (view name): số truy vấn hoặc {'queries': ..., 'time_ms': ...}
+QUERY_BUDGETS = {
+    'student:student-import-excel': {'queries': 100, 'time_ms': 5000},
+    'teacher:teacher-import-excel': {'queries': 100, 'time_ms': 5000},
+    'event_export': {'time_ms': 3000},
+}
+
+# Prometheus (/metrics): mặc định bị từ chối (403). Scraper được truy cập khi gửi
+# Authorization: Bearer <METRICS_TOKEN> hoặc có IP (REMOTE_ADDR) nằm trong METRICS_ALLOWED_IPS
+# (IP hoặc dải CIDR, cách nhau bởi dấu phẩy, VD: 127.0.0.1,10.0.0.0/8)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+
+# Chạy nhiều worker (gunicorn): thư mục chung để gom số liệu, phải được xóa trống trước khi khởi động
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default='')
+if PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'query_budget': {'format': '%(asctime)s %(message)s'},
+    },
+    'handlers': {
+        'query_budget': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': QUERY_BUDGET_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'encoding': 'utf-8',
+            'formatter': 'query_budget',
+        },
+    },
+    'loggers': {
+        'applications.query_budget': {
+            'handlers': ['query_budget'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -150,7 +260,7 @@ AUTH_USER_MODEL = 'user_management.User'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'applications.user_management.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -17,6 +17,9 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from applications.metrics import metrics_view
+
 urlpatterns = [
     path('api/v1', include('applications.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -17,6 +17,7 @@ import EventDetailByDate from "./pages/EventDetailByDate";
 import StudentCreateEvent from "./pages/StudentCreateEvent";
 import Rankings from "./pages/Rankings";
 import Login from "./pages/Login";
+import ChangePassword from "./pages/ChangePassword";
 import NotFound from "./pages/NotFound";
 
 const queryClient = new QueryClient();
@@ -30,6 +31,7 @@ const App = () => (
         <AuthProvider>
           <Routes>
             <Route path="/login" element={<Login />} />
+            <Route path="/change-password" element={<ChangePassword />} />
             <Route path="/" element={<Navigate to="/events" replace />} />
             <Route path="/*" element={
               <ProtectedRoute>
@@ -26,6 +26,11 @@ export function ProtectedRoute({ children, allowedRoles }: ProtectedRouteProps)
     return <Navigate to="/login" replace />;
   }
 
+  // Mật khẩu tạm (tài khoản import): phải đổi trước khi vào các trang khác
+  if (user?.must_change_password) {
+    return <Navigate to="/change-password" replace />;
+  }
+
   if (allowedRoles && user && !allowedRoles.includes(user.role)) {
     // Redirect to dashboard if user doesn't have permission
     return <Navigate to="/dashboard" replace />;
@@ -50,6 +50,14 @@ export default function StudentBehavior() {
   const [students, setStudents] = useState<Student[]>([]);
   const [classrooms, setClassrooms] = useState<Classroom[]>([]);
   const [behaviorRecords, setBehaviorRecords] = useState<BehaviorRecord[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [stats, setStats] = useState({
+    total_violations: 0,
+    pending_violations: 0,
+    approved_violations: 0,
+    total_points_deducted: 0,
+  });
   const [violationTypes, setViolationTypes] = useState<ViolationType[]>([]);
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState({
@@ -80,10 +88,11 @@ export default function StudentBehavior() {
       console.log('Loading data...');
       
       // Load data
-      const [studentsData, classroomsData, recordsData, typesData] = await Promise.all([
+      const [studentsData, classroomsData, recordsPage, statsData, typesData] = await Promise.all([
         apiService.getStudents(),
         apiService.getClassrooms(),
         apiService.getBehaviorRecords(filters),
+        apiService.getBehaviorRecordStats(),
         Promise.resolve([ // Placeholder violation types
           { id: '1', name: 'Đi muộn', points_deducted: 2, description: 'Đi học muộn' },
           { id: '2', name: 'Nói chuyện riêng', points_deducted: 1, description: 'Nói chuyện trong giờ học' },
@@ -92,11 +101,13 @@ export default function StudentBehavior() {
         ])
       ]);
       
-      console.log('Data loaded:', { studentsData, classroomsData, recordsData, typesData });
+      console.log('Data loaded:', { studentsData, classroomsData, recordsPage, statsData, typesData });
       
       setStudents(studentsData);
       setClassrooms(classroomsData);
-      setBehaviorRecords(recordsData);
+      setBehaviorRecords(recordsPage.results);
+      setNextCursor(recordsPage.next_cursor);
+      setStats(statsData);
       setViolationTypes(typesData);
     } catch (error) {
       console.error('Error loading data:', error);
@@ -110,6 +121,26 @@ export default function StudentBehavior() {
     }
   };
 
+  // Tải trang vi phạm tiếp theo (phân trang theo cursor)
+  const loadMoreRecords = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await apiService.getBehaviorRecords({ ...filters, cursor: nextCursor });
+      setBehaviorRecords(prev => [...prev, ...page.results]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error loading more behavior records:', error);
+      toast({
+        title: 'Lỗi',
+        description: 'Không thể tải thêm vi phạm',
+        variant: 'destructive',
+      });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleAddViolation = async () => {
     console.log('Adding violation:', newViolation);
     
@@ -297,7 +328,7 @@ export default function StudentBehavior() {
             <div className="flex items-center justify-between">
               <div>
                 <p className="text-sm font-medium text-blue-600">Tổng vi phạm</p>
-                <p className="text-3xl font-bold text-blue-700">{behaviorRecords.length}</p>
+                <p className="text-3xl font-bold text-blue-700">{stats.total_violations}</p>
               </div>
               <div className="h-12 w-12 bg-blue-500 rounded-full flex items-center justify-center">
                 <AlertTriangle className="h-6 w-6 text-white" />
@@ -312,7 +343,7 @@ export default function StudentBehavior() {
               <div>
                 <p className="text-sm font-medium text-yellow-600">Chờ duyệt</p>
                 <p className="text-3xl font-bold text-yellow-700">
-                  {behaviorRecords.filter(r => r.status === 'pending').length}
+                  {stats.pending_violations}
                 </p>
               </div>
               <div className="h-12 w-12 bg-yellow-500 rounded-full flex items-center justify-center">
@@ -328,7 +359,7 @@ export default function StudentBehavior() {
               <div>
                 <p className="text-sm font-medium text-green-600">Đã duyệt</p>
                 <p className="text-3xl font-bold text-green-700">
-                  {behaviorRecords.filter(r => r.status === 'approved').length}
+                  {stats.approved_violations}
                 </p>
               </div>
               <div className="h-12 w-12 bg-green-500 rounded-full flex items-center justify-center">
@@ -344,10 +375,7 @@ export default function StudentBehavior() {
               <div>
                 <p className="text-sm font-medium text-red-600">Tổng điểm trừ</p>
                 <p className="text-3xl font-bold text-red-700">
-                  {behaviorRecords
-                    .filter(r => r.status === 'approved')
-                    .reduce((sum, r) => sum + r.points_deducted, 0)
-                  }
+                  {stats.total_points_deducted}
                 </p>
               </div>
               <div className="h-12 w-12 bg-red-500 rounded-full flex items-center justify-center">
@@ -705,6 +733,13 @@ export default function StudentBehavior() {
                   ))}
                 </TableBody>
               </Table>
+              {nextCursor && (
+                <div className="flex justify-center pt-4">
+                  <Button variant="outline" onClick={loadMoreRecords} disabled={loadingMore}>
+                    {loadingMore ? 'Đang tải...' : 'Tải thêm'}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
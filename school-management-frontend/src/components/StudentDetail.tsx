@@ -75,10 +75,9 @@ export default function StudentDetail({ onDelete }: StudentDetailProps) {
     if (!studentId) return;
     
     try {
-      // Filter behavior records by student ID
-      const data = await apiService.getBehaviorRecords();
-      const filteredRecords = data.filter(record => record.student.id === studentId);
-      setBehaviorRecords(filteredRecords);
+      // Lọc theo học sinh ở server, lấy tối đa 100 vi phạm mới nhất
+      const data = await apiService.getBehaviorRecords({ student_id: studentId, page_size: 100 });
+      setBehaviorRecords(data.results);
     } catch (error) {
       console.error('Error loading behavior records:', error);
     }
@@ -103,7 +103,13 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
 
   const changePassword = async (data: ChangePasswordRequest) => {
     try {
-      await apiService.changePassword(data);
+      const response = await apiService.changePassword(data);
+      // Token cũ bị thu hồi khi đổi mật khẩu: lưu cặp token mới
+      if (response.access_token && response.refresh_token) {
+        localStorage.setItem('access_token', response.access_token);
+        localStorage.setItem('refresh_token', response.refresh_token);
+      }
+      setUser(prev => (prev ? { ...prev, must_change_password: false } : prev));
     } catch (error) {
       console.error('Change password failed:', error);
       throw error;
@@ -0,0 +1,139 @@
+import React, { useState } from 'react';
+import { Navigate, useNavigate } from 'react-router-dom';
+import { useAuth } from '../contexts/AuthContext';
+import { Button } from '../components/ui/button';
+import { Input } from '../components/ui/input';
+import { Label } from '../components/ui/label';
+import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../components/ui/card';
+import { Alert, AlertDescription } from '../components/ui/alert';
+import { Loader2 } from 'lucide-react';
+import { toast } from 'sonner';
+
+// Đổi mật khẩu tạm (tài khoản import) trước khi dùng hệ thống
+const ChangePassword: React.FC = () => {
+  const navigate = useNavigate();
+  const { user, isAuthenticated, isLoading, changePassword, logout } = useAuth();
+  const [submitting, setSubmitting] = useState(false);
+  const [error, setError] = useState('');
+  const [formData, setFormData] = useState({
+    old_password: '',
+    new_password: '',
+    confirm_new_password: '',
+  });
+
+  if (isLoading) {
+    return (
+      <div className="min-h-screen flex items-center justify-center">
+        <div className="flex items-center gap-2">
+          <Loader2 className="h-6 w-6 animate-spin" />
+          <span>Đang tải...</span>
+        </div>
+      </div>
+    );
+  }
+
+  if (!isAuthenticated) {
+    return <Navigate to="/login" replace />;
+  }
+
+  const handleSubmit = async (e: React.FormEvent) => {
+    e.preventDefault();
+    setError('');
+
+    if (formData.new_password !== formData.confirm_new_password) {
+      setError('Mật khẩu xác nhận không khớp');
+      return;
+    }
+
+    try {
+      setSubmitting(true);
+      await changePassword(formData);
+      toast.success('Đổi mật khẩu thành công!');
+      navigate('/events', { replace: true });
+    } catch (error: any) {
+      const data = error.response?.data;
+      setError(data?.error || data?.new_password?.[0] || data?.non_field_errors?.[0] || 'Đổi mật khẩu thất bại');
+    } finally {
+      setSubmitting(false);
+    }
+  };
+
+  const handleInputChange = (field: string, value: string) => {
+    setFormData(prev => ({ ...prev, [field]: value }));
+  };
+
+  return (
+    <div className="min-h-screen flex items-center justify-center bg-gradient-to-br from-blue-50 to-indigo-100 p-4">
+      <Card className="w-full max-w-md">
+        <CardHeader className="text-center">
+          <CardTitle className="text-2xl font-bold text-gray-900">
+            Đổi mật khẩu
+          </CardTitle>
+          <CardDescription>
+            {user?.must_change_password
+              ? 'Tài khoản đang dùng mật khẩu tạm, vui lòng đổi mật khẩu để tiếp tục'
+              : 'Nhập mật khẩu hiện tại và mật khẩu mới'}
+          </CardDescription>
+        </CardHeader>
+        <CardContent>
+          <form onSubmit={handleSubmit} className="space-y-4">
+            <div className="space-y-2">
+              <Label htmlFor="old_password">Mật khẩu hiện tại</Label>
+              <Input
+                id="old_password"
+                type="password"
+                value={formData.old_password}
+                onChange={(e) => handleInputChange('old_password', e.target.value)}
+                required
+              />
+            </div>
+
+            <div className="space-y-2">
+              <Label htmlFor="new_password">Mật khẩu mới</Label>
+              <Input
+                id="new_password"
+                type="password"
+                value={formData.new_password}
+                onChange={(e) => handleInputChange('new_password', e.target.value)}
+                required
+              />
+            </div>
+
+            <div className="space-y-2">
+              <Label htmlFor="confirm_new_password">Xác nhận mật khẩu mới</Label>
+              <Input
+                id="confirm_new_password"
+                type="password"
+                value={formData.confirm_new_password}
+                onChange={(e) => handleInputChange('confirm_new_password', e.target.value)}
+                required
+              />
+            </div>
+
+            {error && (
+              <Alert variant="destructive">
+                <AlertDescription>{error}</AlertDescription>
+              </Alert>
+            )}
+
+            <Button type="submit" className="w-full" disabled={submitting}>
+              {submitting ? (
+                <>
+                  <Loader2 className="mr-2 h-4 w-4 animate-spin" />
+                  Đang lưu...
+                </>
+              ) : (
+                'Đổi mật khẩu'
+              )}
+            </Button>
+            <Button type="button" variant="ghost" className="w-full" onClick={() => logout()}>
+              Đăng xuất
+            </Button>
+          </form>
+        </CardContent>
+      </Card>
+    </div>
+  );
+};
+
+export default ChangePassword;
@@ -57,6 +57,15 @@ apiClient.interceptors.response.use(
       }
     }
 
+    // Tài khoản còn mật khẩu tạm: backend chặn mọi API cho đến khi đổi mật khẩu
+    if (
+      error.response?.status === 403 &&
+      error.response?.data?.code === 'password_change_required' &&
+      window.location.pathname !== '/change-password'
+    ) {
+      window.location.href = '/change-password';
+    }
+
     return Promise.reject(error);
   }
 );
@@ -75,6 +84,14 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+// Phân trang theo cursor: trang sau lấy bằng cursor=next_cursor
+export interface CursorPage<T> {
+  results: T[];
+  next_cursor: string | null;
+  has_more: boolean;
+  page_size: number;
+}
+
 // User Types
 export interface User {
   id: string;
@@ -85,11 +102,15 @@ export interface User {
   role: 'admin' | 'teacher' | 'student';
   phone?: string;
   is_active: boolean;
+  must_change_password?: boolean;
   created_at: string;
   updated_at: string;
   full_name: string;
 }
 
+// Dòng trong danh sách users (GET /users): chỉ các cột cần hiển thị
+export type UserListItem = Pick<User, 'id' | 'username' | 'email' | 'first_name' | 'last_name' | 'role' | 'is_active'>;
+
 // Authentication Types
 export interface LoginRequest {
   username: string;
@@ -311,15 +332,21 @@ class ApiService {
     return response.data as { message: string };
   }
 
-  async changePassword(data: ChangePasswordRequest): Promise<{ message: string }> {
+  async changePassword(data: ChangePasswordRequest): Promise<{ message: string; access_token?: string; refresh_token?: string }> {
     const response = await apiClient.post('/auth/change_password', data);
-    return response.data as { message: string };
+    return response.data as { message: string; access_token?: string; refresh_token?: string };
   }
 
   // User APIs
-  async getUsers(params?: { role?: string }): Promise<User[]> {
+  async getUsers(params?: {
+    role?: string;
+    is_active?: boolean;
+    search?: string;
+    cursor?: string;
+    page_size?: number;
+  }): Promise<CursorPage<UserListItem>> {
     const response = await apiClient.get('/users', { params });
-    return response.data as User[];
+    return response.data as CursorPage<UserListItem>;
   }
 
   async getUserProfile(): Promise<User> {
@@ -855,12 +882,15 @@ class ApiService {
   // Behavior Record APIs
   async getBehaviorRecords(params?: { 
     classroom_id?: string; 
+    student_id?: string;
     status?: string; 
     search?: string;
     ordering?: string;
-  }): Promise<BehaviorRecord[]> {
+    cursor?: string;
+    page_size?: number;
+  }): Promise<CursorPage<BehaviorRecord>> {
     const response = await apiClient.get('/students/behavior', { params });
-    return response.data as BehaviorRecord[];
+    return response.data as CursorPage<BehaviorRecord>;
   }
 
   async getBehaviorRecord(id: string): Promise<BehaviorRecord> {